@@ -0,0 +1,124 @@
+"""Benchmark of :class:`distconfig.config.Config` lookups."""
+from distconfig import config
+from distconfig.config import Config, _build_index, _split_path
+from distconfig.settings import Field, Settings
+
+from common import bench, bench_setup, memory, report
+
+
+class _NoPathCache(object):
+
+    def get(self, path):
+        return tuple(_split_path(path))
+
+
+def _nested(depth, leaf='value'):
+    data = leaf
+    for i in reversed(range(depth)):
+        data = {'key%d' % i: data}
+    return data
+
+
+def _deep_path(depth):
+    return '/'.join('key%d' % i for i in range(depth))
+
+
+def _tree(depth, width):
+    if depth == 0:
+        return 'value'
+    return dict(('key%d' % i, _tree(depth - 1, width)) for i in range(width))
+
+
+def bench_path_cache():
+    cfg = Config(dict(_nested(8), **{'esca/ped': {'in/ner': {'key': 1}}}))
+    paths = [
+        ('depth 1', 'key0'),
+        ('depth 8', _deep_path(8)),
+        ('escaped', 'esca\\/ped/in\\/ner/key'),
+    ]
+    rows = []
+    for name, path in paths:
+        config._PATH_CACHE = _NoPathCache()
+        uncached = bench(lambda: cfg.get(path))
+        config._PATH_CACHE = config._PathCache()
+        cached = bench(lambda: cfg.get(path))
+        rows.append(('Config.get %s (no cache)' % name, uncached))
+        rows.append(('Config.get %s (cache)' % name, cached))
+    report('Path cache', rows)
+
+
+def bench_index():
+    # depth x width: 4 x 10 gives 10000 leaves and 11110 indexed paths.
+    data = dict(_tree(4, 10), **_nested(8))
+    walk = Config(data)
+    indexed = Config(data, index=True)
+    rows = [
+        ('build index', bench(lambda: _build_index(data), number=10)),
+        ('Config.__init__', bench(lambda: Config(data), number=10)),
+        ('Config.__init__ (index)', bench(lambda: Config(data, index=True), number=10)),
+    ]
+    for name, path in [('depth 4', 'key1/key2/key3/key4'), ('depth 8', _deep_path(8))]:
+        rows.append(('Config.get %s (walk)' % name, bench(lambda: walk.get(path))))
+        rows.append(('Config.get %s (index)' % name, bench(lambda: indexed.get(path))))
+    report('Flat path index', rows)
+    report('Flat path index memory', [('build index', memory(lambda: _build_index(data)))], unit='KiB')
+
+
+def bench_get_config():
+    data = _tree(4, 10)
+    cfg = Config(data)
+    rows = []
+    for name, path in [('depth 1', 'key1'), ('depth 3', 'key1/key2/key3')]:
+        inner = cfg.get_config(path)  # noqa: keep the inner config alive to stay cached.
+        rows.append(('Config.get_config %s (cached)' % name, bench(lambda: cfg.get_config(path))))
+        rows.append(('Config.get_config %s (uncached)' % name, bench(lambda: Config(data).get_config(path))))
+        del inner
+    rows.append(('Config.snapshot', bench(cfg.snapshot)))
+    report('Inner config cache', rows)
+
+
+def bench_invalidate(inner_configs=1000):
+    # depth x width: 4 x 10 gives 10000 leaves.
+    old, changed = _tree(4, 10), _tree(4, 10)
+    changed['key1']['key2']['key3']['key4'] = 'changed'
+    paths = ['key%d/key%d/key%d' % (i % 10, i // 10 % 10, i // 100 % 10) for i in range(inner_configs)]
+
+    def setup(data, inner):
+        cfg = Config(old)
+        inners = [cfg.get_config(path) for path in paths[:inner]]
+
+        def invalidate():
+            cfg._invalidate(data)
+            return inners
+        return invalidate
+
+    rows = []
+    for inner in (0, inner_configs):
+        for name, data in [('unchanged', _tree(4, 10)), ('one change', changed)]:
+            rows.append(('Config._invalidate %s, %d inner configs' % (name, inner),
+                         bench_setup(lambda: setup(data, inner))))
+    report('Invalidate (10000 leaves)', rows)
+
+
+class _Settings(Settings):
+    timeout = Field('http/client/timeout', float)
+    retries = Field('http/client/retries', int)
+
+
+def bench_settings():
+    cfg = Config({'http': {'client': {'timeout': 1.5, 'retries': 3}}})
+    settings = _Settings.bind(cfg)
+    current = settings.current
+    report('Typed settings', [
+        ('Config.get_int', bench(lambda: cfg.get_int('http/client/retries'))),
+        ('BoundSettings.current.retries', bench(lambda: settings.current.retries)),
+        ('Settings.retries', bench(lambda: current.retries)),
+    ])
+
+
+if __name__ == '__main__':
+    bench_path_cache()
+    bench_index()
+    bench_get_config()
+    bench_invalidate()
+    bench_settings()
@@ -0,0 +1,44 @@
+"""Benchmark of the overhead of :mod:`distconfig.instrumentation`."""
+import itertools
+
+from distconfig import instrumentation
+from distconfig.backends.execution_context import ExecutionContext
+from distconfig.backends.memory import MemoryBackend
+from distconfig.config import Config
+from distconfig.instrumentation import MemoryInstrumentation
+
+from common import bench, report
+
+
+class _NoopExecutionContext(ExecutionContext):
+
+    def run(self, func, *args, **kwargs):
+        pass
+
+
+def _noop(value):
+    pass
+
+
+def bench_instrumentation():
+    cfg = Config({'key0': {'key1': {'key2': 'value'}}})
+    backend = MemoryBackend({'/service/config': '{"key": 1}'}, execution_context=_NoopExecutionContext())
+    for _ in range(100):
+        backend.add_listener(_noop, '/service/config')
+    values = itertools.cycle(['{"key": 1}', '{"key": 2}'])
+    rows = []
+    for name, instr in [('disabled', None), ('memory', MemoryInstrumentation())]:
+        previous = instrumentation.set_instrumentation(instr)
+        try:
+            rows.append(('Config.get (%s)' % name, bench(lambda: cfg.get('key0/key1/key2'))))
+            rows.append(('Config.get miss (%s)' % name, bench(lambda: cfg.get('key0/missing'))))
+            rows.append(('backend.get (%s)' % name, bench(lambda: backend.get('/service/config'))))
+            rows.append(('notify 100 listeners (%s)' % name,
+                         bench(lambda: backend._notify_listeners(next(values), '/service/config'), number=1000)))
+        finally:
+            instrumentation.set_instrumentation(previous)
+    report('Instrumentation overhead', rows)
+
+
+if __name__ == '__main__':
+    bench_instrumentation()
@@ -0,0 +1,85 @@
+"""Benchmark of change notification fan-out to listeners."""
+import itertools
+import json
+
+from distconfig.api import Proxy
+from distconfig.backends.execution_context import ExecutionContext
+from distconfig.backends.memory import MemoryBackend
+from distconfig.config import Config
+
+from common import bench, report
+
+
+class _NoopExecutionContext(ExecutionContext):
+
+    def run(self, func, *args, **kwargs):
+        pass
+
+
+class _SyncExecutionContext(ExecutionContext):
+
+    def run(self, func, *args, **kwargs):
+        func(*args, **kwargs)
+
+
+def _noop(value):
+    pass
+
+
+def bench_backend_fanout(counts=(1, 100, 1000, 10000)):
+    # Alternate between two values so that unchanged values aren't skipped.
+    values = itertools.cycle(['{"key": 1}', '{"key": 2}'])
+    rows = []
+    for count in counts:
+        backend = MemoryBackend(execution_context=_NoopExecutionContext())
+        for i in range(count):
+            backend.add_listener(_noop, '/service/config')
+            # Listeners of other paths must not slow down notifications.
+            backend.add_listener(_noop, '/service/other%d' % i)
+        number = max(10, 100000 // count)
+        rows.append(('notify %d listeners' % count,
+                     bench(lambda: backend._notify_listeners(next(values), '/service/config'), number=number)))
+    backend = MemoryBackend(execution_context=_NoopExecutionContext())
+    backend.add_listener(_noop, '/service/config')
+    rows.append(('notify unchanged value', bench(lambda: backend._notify_listeners('{"key": 1}', '/service/config'))))
+    report('Backend notification fan-out', rows)
+
+
+def bench_config_fanout(counts=(1, 100, 1000, 10000)):
+    values = itertools.cycle([{'key': 1}, {'key': 2}])
+    rows = []
+    for count in counts:
+        cfg = Config({'key': 0})
+        for _ in range(count):
+            cfg.add_listener(_noop)
+        number = max(10, 100000 // count)
+        rows.append(('Config._invalidate %d listeners' % count,
+                     bench(lambda: cfg._invalidate(next(values)), number=number)))
+    report('Config listener fan-out', rows)
+
+
+def bench_proxy_updates(keys=5000):
+    paths = ['/service/config%d' % i for i in range(keys)]
+    data = dict((path, json.dumps({'key': 0, 'other': list(range(10))})) for path in paths)
+    backend = MemoryBackend(data, execution_context=_SyncExecutionContext())
+    proxy = Proxy(backend)
+    configs = proxy.get_configs(paths)  # noqa: keep configs alive.
+    counter = itertools.count(1)
+
+    def update_one():
+        backend.set(paths[0], json.dumps({'key': next(counter), 'other': list(range(10))}))
+
+    def update_all():
+        value = next(counter)
+        backend.update(dict((path, json.dumps({'key': value, 'other': list(range(10))})) for path in paths))
+
+    report('Proxy updates (%d watched keys)' % keys, [('set one key', bench(update_one, number=1000))])
+    report('Proxy updates (%d watched keys)' % keys, [
+        ('update all keys', bench(update_all, number=1, repeat=5) / 1000),
+    ], unit='msec')
+
+
+if __name__ == '__main__':
+    bench_backend_fanout()
+    bench_config_fanout()
+    bench_proxy_updates()
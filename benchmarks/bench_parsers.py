@@ -0,0 +1,71 @@
+"""Benchmark of config payload parsing with the available decoders."""
+import json
+
+from distconfig.parsers import default_registry
+
+from common import bench, memory, report
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+def _payload(services=200):
+    return dict(
+        ('service%d' % i, {
+            'enabled': i % 2 == 0,
+            'timeout': 1.5 * i,
+            'hosts': ['host%d.example.com' % j for j in range(5)],
+            'limits': {'rps': 100 * i, 'burst': 10 * i},
+            'description': u'Configuration of service %d' % i,
+        })
+        for i in range(services)
+    )
+
+
+def _decoders(value):
+    encoded = json.dumps(value).encode('utf8')
+    yield 'json', json.loads, encoded.decode('utf8')
+    if ujson is not None:
+        yield 'ujson', ujson.loads, encoded
+    if orjson is not None:
+        yield 'orjson', orjson.loads, encoded
+    if msgpack is not None:
+        yield 'msgpack', lambda data: msgpack.unpackb(data, raw=False), msgpack.packb(value, use_bin_type=True)
+    if cbor2 is not None:
+        yield 'cbor2', cbor2.loads, cbor2.dumps(value)
+
+
+def bench_parsers(services=200):
+    value = _payload(services)
+    registry = default_registry()
+    timings, allocations, sizes = [], [], []
+    for name, loads, data in _decoders(value):
+        timings.append((name, bench(lambda: loads(data), number=200)))
+        timings.append((name + ' (registry)', bench(lambda: registry.parse(data), number=200)))
+        allocations.append((name, memory(lambda: loads(data))))
+        sizes.append((name, len(data) / 1024.0))
+
+    report('Parse time (%d services)' % services, timings)
+    report('Parsed size (%d services)' % services, allocations, unit='KiB')
+    report('Payload size (%d services)' % services, sizes, unit='KiB')
+
+
+if __name__ == '__main__':
+    bench_parsers()
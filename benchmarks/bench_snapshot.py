@@ -0,0 +1,53 @@
+"""Benchmark of cold start with and without snapshots or values shared by another process."""
+import json
+import shutil
+import tempfile
+
+from distconfig.api import Proxy
+from distconfig.backends.execution_context import ExecutionContext
+from distconfig.backends.memory import MemoryBackend
+from distconfig.backends.shared_memory import SharedMemoryBackend, SharedSnapshotStore
+from distconfig.backends.snapshot import SnapshotStore
+
+from common import bench, report
+
+
+class _NoopExecutionContext(ExecutionContext):
+
+    def run(self, func, *args, **kwargs):
+        pass
+
+
+def bench_cold_start(paths=30, latency=0.005):
+    value = json.dumps(dict(('key%d' % i, {'value': i}) for i in range(100)))
+    data = dict(('/service/config%d' % i, value) for i in range(paths))
+    directory = tempfile.mkdtemp()
+    try:
+        store = SnapshotStore(directory)
+        shared = SharedSnapshotStore(directory + '/shared')
+        for path, raw in data.items():
+            store.save(path, raw)
+            shared.save(path, raw)
+
+        def cold_start(snapshot):
+            proxy = Proxy(MemoryBackend(
+                data, latency=latency, execution_context=_NoopExecutionContext(), snapshot=snapshot))
+            for path in data:
+                proxy.get_config(path)
+
+        def worker_start():
+            proxy = Proxy(SharedMemoryBackend(directory + '/shared', execution_context=_NoopExecutionContext()))
+            for path in data:
+                proxy.get_config(path)
+
+        report('Cold start (%d paths, %d ms latency)' % (paths, latency * 1000), [
+            ('get_config (backend)', bench(lambda: cold_start(None), number=1, repeat=3) / 1000),
+            ('get_config (snapshot)', bench(lambda: cold_start(store), number=10, repeat=3) / 1000),
+            ('get_config (shared memory)', bench(worker_start, number=10, repeat=3) / 1000),
+        ], unit='msec')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    bench_cold_start()
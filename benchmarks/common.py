@@ -0,0 +1,77 @@
+"""Helpers shared by the benchmark scripts."""
+from __future__ import print_function
+
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+#: Results reported so far as ``(title, name, value, unit)`` tuples, used
+#: by ``run.py`` to write machine readable output.
+RESULTS = []
+
+#: Set to False to only record results without printing them.
+VERBOSE = True
+
+
+def bench(func, number=10000, repeat=5):
+    """Time ``func`` and return the best time per call in microseconds."""
+    timings = timeit.repeat(func, number=number, repeat=repeat)
+    return min(timings) / number * 1e6
+
+
+def bench_setup(setup, repeat=10):
+    """Time a single call of the function returned by ``setup``.
+
+    Useful for operations that can't be repeated on the same state, ``setup``
+    is called before each run and isn't timed.
+
+    :return: the best time in microseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        func = setup()
+        start = timeit.default_timer()
+        func()
+        timings.append(timeit.default_timer() - start)
+    return min(timings) * 1e6
+
+
+def memory(func):
+    """Call ``func`` and return the memory it allocated in KiB.
+
+    The result of ``func`` is kept alive while measuring, ``None`` is
+    returned when ``tracemalloc`` isn't available.
+    """
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        result = func()  # noqa
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return allocated / 1024.0
+
+
+def report(title, rows, unit='usec'):
+    """Print benchmark results as a table and record them in :data:`RESULTS`.
+
+    :param title: Title of the table.
+    :param rows: List of ``(name, value)`` tuples.
+    :param unit: Unit of the values, default: 'usec'.
+    """
+    for name, value in rows:
+        RESULTS.append((title, name, value, unit))
+    if not VERBOSE:
+        return
+    print(title)
+    print('=' * len(title))
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        value = 'n/a' if value is None else '%.3f' % value
+        print('%s  %10s %s' % (name.ljust(width), value, unit))
+    print()
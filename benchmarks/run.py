@@ -0,0 +1,118 @@
+"""Run the benchmarks and optionally compare them with a previous run.
+
+Example::
+
+    $ python benchmarks/run.py --output before.json
+    $ git checkout my-branch
+    $ python benchmarks/run.py --compare before.json --threshold 0.2
+
+Every ``bench_*`` function of the ``bench_*.py`` modules next to this script
+is run, ``--filter`` restricts them by name. All results are lower is better,
+``--compare`` exits with status 1 when a result regressed by more than
+``--threshold``.
+"""
+from __future__ import print_function
+
+import argparse
+import glob
+import importlib
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import common
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _benchmarks(pattern=None):
+    for filename in sorted(glob.glob(os.path.join(HERE, 'bench_*.py'))):
+        module = importlib.import_module(os.path.splitext(os.path.basename(filename))[0])
+        funcs = [func for name, func in inspect.getmembers(module, inspect.isfunction)
+                 if name.startswith('bench_') and func.__module__ == module.__name__]
+        for func in sorted(funcs, key=lambda func: func.__code__.co_firstlineno):
+            name = '%s.%s' % (module.__name__, func.__name__)
+            if pattern is None or pattern in name:
+                yield name, func
+
+
+def _git_revision():
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=HERE, stderr=subprocess.STDOUT)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def _compare(results, baseline, threshold):
+    previous = dict((result['key'], result) for result in baseline['results'])
+    regressions = []
+    for result in results:
+        old = previous.get(result['key'])
+        if old is None or not old['value'] or result['value'] is None:
+            continue
+        change = (result['value'] - old['value']) / old['value']
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(result['key'])
+        print('%-80s %12.3f -> %12.3f %s %+7.1f%%%s' % (
+            result['key'], old['value'], result['value'], result['unit'], change * 100, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', '--filter', help='Only run benchmarks whose name contains this string.')
+    parser.add_argument('-o', '--output', help='Write results as JSON to this file, "-" for stdout.')
+    parser.add_argument('-c', '--compare', help='JSON file of a previous run to compare results with.')
+    parser.add_argument('-t', '--threshold', type=float, default=0.25,
+                        help='Relative slowdown reported as a regression, default: 0.25.')
+    parser.add_argument('-q', '--quiet', action='store_true', help="Don't print the result tables.")
+    args = parser.parse_args(argv)
+
+    common.VERBOSE = not (args.quiet or args.output == '-')
+    results = []
+    for name, func in _benchmarks(args.filter):
+        del common.RESULTS[:]
+        func()
+        for title, row, value, unit in common.RESULTS:
+            results.append({
+                'key': '%s: %s: %s' % (name, title, row),
+                'benchmark': name,
+                'title': title,
+                'name': row,
+                'value': value,
+                'unit': unit,
+            })
+
+    output = {
+        'revision': _git_revision(),
+        'python': sys.version,
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.output == '-':
+        json.dump(output, sys.stdout, indent=2, sort_keys=True)
+        print()
+    elif args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('python') != output['python']:
+            print('Warning: baseline was run with Python %s' % baseline.get('python'), file=sys.stderr)
+        if _compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,359 @@
+"""Agent serving the values of a backend to the processes of a host over a Unix socket.
+
+The agent holds the backend watchers for the host, processes read and watch values
+through it with :class:`distconfig.backends.agent.AgentBackend`, so the cluster sees
+one client per host instead of one per process. Run it with a callable creating the
+backend, the agent is given to it as the ``snapshot`` of the backend so that it
+receives every raw value and version ::
+
+    $ python -m distconfig.agent /run/distconfig.sock mymodule.create_backend
+
+where ``create_backend(snapshot)`` returns e.g. ``ConsulBackend(client, snapshot=snapshot)``.
+
+Messages are framed by a header holding the body length, the message type and a
+request id. Bodies are lists of paths, or of ``(path, value, version)`` entries
+encoded like :mod:`distconfig.backends.shared_memory` entries.
+"""
+import argparse
+import logging
+import os
+import socket
+import struct
+import threading
+
+import six
+from six.moves import queue, socketserver
+
+from distconfig import utils
+from distconfig.backends.shared_memory import _ENTRY
+from distconfig.backends.snapshot import _decode, _encode
+
+
+LOGGER = logging.getLogger(__name__)
+
+# body length, message type, request id.
+_HEADER = struct.Struct('>IBI')
+_COUNT = struct.Struct('>I')
+
+#: Client request of path values, body is a list of paths.
+GET = 1
+#: Same as ``GET`` and subscribe to changes of the paths.
+WATCH = 2
+#: Agent response to ``GET`` and ``WATCH``, body is a list of entries.
+VALUES = 3
+#: Agent notification of changed values, body is a list of entries.
+CHANGE = 4
+#: Agent response to a failed request, body is the error message.
+ERROR = 5
+
+
+def encode_paths(paths):
+    chunks = [_COUNT.pack(len(paths))]
+    for path in paths:
+        path = path.encode('utf8')
+        chunks.append(_COUNT.pack(len(path)))
+        chunks.append(path)
+    return b''.join(chunks)
+
+
+def decode_paths(body):
+    count, = _COUNT.unpack_from(body)
+    paths, offset = [], _COUNT.size
+    for _ in range(count):
+        length, = _COUNT.unpack_from(body, offset)
+        offset += _COUNT.size
+        paths.append(body[offset:offset + length].decode('utf8'))
+        offset += length
+    return paths
+
+
+def encode_values(values):
+    """Encode dictionary of ``(value, version)`` by path."""
+    chunks = [_COUNT.pack(len(values))]
+    for path, (value, version) in six.iteritems(values):
+        path = path.encode('utf8')
+        value_type, data = _encode(value)
+        chunks.append(_ENTRY.pack(len(path), value_type, version is not None, version or 0, len(data)))
+        chunks.append(path)
+        chunks.append(data)
+    return b''.join(chunks)
+
+
+def decode_values(body):
+    """Decode dictionary of ``(value, version)`` by path."""
+    count, = _COUNT.unpack_from(body)
+    values, offset = {}, _COUNT.size
+    for _ in range(count):
+        path_length, value_type, has_version, version, value_length = _ENTRY.unpack_from(body, offset)
+        offset += _ENTRY.size
+        path = body[offset:offset + path_length].decode('utf8')
+        offset += path_length
+        values[path] = (_decode(value_type, body[offset:offset + value_length]), version if has_version else None)
+        offset += value_length
+    return values
+
+
+def send_frame(sock, message_type, request_id, body=b''):
+    sock.sendall(_HEADER.pack(len(body), message_type, request_id) + body)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_frame(sock):
+    """Receive a frame.
+
+    :return: Tuple of message type, request id and body, None if the connection was closed.
+    """
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    length, message_type, request_id = _HEADER.unpack(header)
+    body = _recv_exactly(sock, length) if length else b''
+    if body is None:
+        return None
+    return message_type, request_id, body
+
+
+class _Connection(socketserver.BaseRequestHandler):
+    """Client connection, frames are sent by a writer thread so that a client not
+    reading them never blocks the agent, it's disconnected once ``max_pending``
+    frames are waiting."""
+
+    #: Maximum number of frames waiting to be sent to the client.
+    max_pending = 1000
+
+    def setup(self):
+        self.send_lock = threading.Lock()
+        self.paths = set()
+        self._frames = queue.Queue(self.max_pending)
+        self._writer = threading.Thread(target=self._write)
+        self._writer.daemon = True
+        self._writer.start()
+        self.server.agent._connect(self)
+
+    def send(self, message_type, request_id, body=b''):
+        """Queue frame to be sent, never blocks.
+
+        :raises IOError: If too many frames are waiting, the client is then disconnected.
+        """
+        try:
+            self._frames.put_nowait(_HEADER.pack(len(body), message_type, request_id) + body)
+        except queue.Full:
+            self.close()
+            raise IOError('client is too slow, %d frames waiting' % self.max_pending)
+
+    def close(self):
+        """Disconnect the client, pending frames are dropped."""
+        try:
+            self.request.shutdown(socket.SHUT_RDWR)
+        except (IOError, OSError):
+            pass
+
+    def _write(self):
+        failed = False
+        while 1:
+            frame = self._frames.get()
+            if frame is None:
+                return
+            if failed:
+                continue  # Drain frames until finish() stops the writer.
+            try:
+                self.request.sendall(frame)
+            except (IOError, OSError) as ex:
+                self.server.agent._logger.info('failed to send to client: %s', ex)
+                failed = True
+                self.close()
+
+    def finish(self):
+        # The socket is closed once this returns, stop the writer first so that it
+        # never writes to a reused file descriptor.
+        self.close()
+        self._frames.put(None)
+        self._writer.join()
+
+    def handle(self):
+        agent = self.server.agent
+        try:
+            while 1:
+                frame = recv_frame(self.request)
+                if frame is None:
+                    return
+                message_type, request_id, body = frame
+                try:
+                    paths = decode_paths(body)
+                    if message_type == WATCH:
+                        agent._subscribe(self, paths)
+                    agent._fetch(paths)
+                except Exception as ex:
+                    agent._logger.error('exception raised while serving request: %s', ex)
+                    self.send(ERROR, request_id, six.text_type(ex).encode('utf8'))
+                    continue
+                # Values are read and queued under the send lock, so a change saved
+                # meanwhile is sent after them and never overwritten by an older value.
+                with self.send_lock:
+                    self.send(VALUES, request_id, encode_values(agent._get(paths)))
+        except (IOError, OSError) as ex:
+            agent._logger.info('connection closed: %s', ex)
+        finally:
+            agent._disconnect(self)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    daemon_threads = True
+
+
+class Agent(object):
+    """Serve the values of a backend over a Unix socket.
+
+    The agent must be given as the ``snapshot`` of the backend, e.g.
+    ``ConsulBackend(client, snapshot=agent)``, and set as :attr:`backend`.
+
+    :param socket_path: Path of the Unix socket, replaced if it exists.
+    :param backend: Optional :class:`distconfig.backends.base.BaseBackend` instance,
+        can also be set later to :attr:`backend`.
+    :param logger: :class:`logging.Logger` instance.
+
+    """
+
+    def __init__(self, socket_path, backend=None, logger=LOGGER):
+        self._socket_path = socket_path
+        self.backend = backend
+        self._logger = logger
+        self._lock = threading.Lock()
+        # (value, version) by path and connections by subscribed path.
+        self._values = {}
+        self._subscribers = {}
+        self._connections = set()
+        self._server = None
+
+    def start(self):
+        """Listen on the socket and serve clients in background threads."""
+        self._bind()
+        thread = threading.Thread(target=self._server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def serve_forever(self):
+        """Listen on the socket and serve clients until :meth:`shutdown` is called."""
+        self._bind()
+        self._server.serve_forever()
+
+    def shutdown(self):
+        """Stop serving clients and close their connections."""
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            connection.close()
+        try:
+            os.unlink(self._socket_path)
+        except OSError:
+            pass
+
+    def _bind(self):
+        try:
+            os.unlink(self._socket_path)
+        except OSError:
+            pass
+        self._server = _Server(self._socket_path, _Connection)
+        self._server.agent = self
+
+    def _fetch(self, paths):
+        """Read paths never read before from the backend."""
+        with self._lock:
+            missing = [path for path in paths if path not in self._values]
+        if missing:
+            # Reading paths makes the backend watch them, later changes are
+            # received by :meth:`save`. Versions aren't known until then.
+            raw = self.backend.get_raw_many(missing)
+            with self._lock:
+                for path in missing:
+                    self._values.setdefault(path, (raw.get(path), None))
+
+    def _get(self, paths):
+        """Return ``(value, version)`` by path of fetched paths."""
+        with self._lock:
+            return dict((path, self._values.get(path, (None, None))) for path in paths)
+
+    def _subscribe(self, connection, paths):
+        with self._lock:
+            connection.paths.update(paths)
+            for path in paths:
+                self._subscribers.setdefault(path, set()).add(connection)
+
+    def _connect(self, connection):
+        with self._lock:
+            self._connections.add(connection)
+
+    def _disconnect(self, connection):
+        with self._lock:
+            self._connections.discard(connection)
+            for path in connection.paths:
+                subscribers = self._subscribers.get(path, set())
+                subscribers.discard(connection)
+                if not subscribers:
+                    self._subscribers.pop(path, None)
+
+    def load(self, path):
+        """Snapshot interface, return last value and version of path.
+
+        :raises KeyError: If path is unknown.
+        """
+        with self._lock:
+            return self._values[path]
+
+    def save(self, path, value, version=None):
+        """Snapshot interface, called by the backend with new values, notify subscribers.
+
+        Subscribers are not notified when only the version changed, e.g. when the
+        backend first notifies the version of a value fetched without it.
+        """
+        with self._lock:
+            previous = self._values.get(path)
+            self._values[path] = (value, version)
+            if previous is not None and previous[0] == value:
+                return
+            subscribers = list(self._subscribers.get(path, ()))
+        body = encode_values({path: (value, version)})
+        for connection in subscribers:
+            try:
+                with connection.send_lock:
+                    # Skip values replaced by a concurrent save while waiting
+                    # for the lock, the newer value is sent by that save.
+                    with self._lock:
+                        current, _ = self._values[path]
+                    if current != value:
+                        continue
+                    connection.send(CHANGE, 0, body)
+            except (IOError, OSError) as ex:
+                self._logger.info('failed to notify client of %r change: %s', path, ex)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the values of a distconfig backend over a Unix socket.')
+    parser.add_argument('socket', help='Path of the Unix socket.')
+    parser.add_argument('factory', help='Dotted name of a callable creating the backend, called with '
+                                        'the agent as snapshot keyword argument.')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    agent = Agent(args.socket)
+    agent.backend = utils.resolve_dotted_name(args.factory)(snapshot=agent)
+    try:
+        agent.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
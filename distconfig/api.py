@@ -1,11 +1,22 @@
+import threading
+
+import six
+
 from . import config, utils
 
 
 class Proxy(object):
-    """Proxy class for differents backend."""
+    """Proxy class for differents backend.
+
+    Config instances are cached by path, so getting the same path more than once
+    doesn't hit the backend and return the same instance kept up to date by
+    the backend watcher.
+    """
 
     def __init__(self, backend):
         self._backend = backend
+        self._configs = {}
+        self._lock = threading.Lock()
 
     @property
     def backend(self):
@@ -36,7 +47,48 @@ class Proxy(object):
         :return: ``config_cls`` instance.
 
         """
+        key = (path, config_cls)
+        try:
+            return self._configs[key]
+        except KeyError:
+            pass
         data = self._backend.get(path)
-        config = config_cls(data)
-        self._backend.add_listener(config._invalidate)
+        return self._cache_config(path, config_cls, data)
+
+    def get_configs(self, paths, config_cls=config.Config):
+        """Get configurations of many paths at once.
+
+        Paths not already loaded are fetched together with
+        :meth:`distconfig.backends.base.BaseBackend.get_many`, which is cheaper than
+        calling :meth:`get_config` for each path.
+
+        :param paths: Locations of the configurations in the backend.
+        :param config_cls: configuration class to return, default: :class:`distconfig.config.Config`.
+        :return: dictionary of ``config_cls`` instances by path.
+
+        """
+        configs, missing = self._get_cached_configs(paths, config_cls)
+        if missing:
+            for path, data in six.iteritems(self._backend.get_many(missing)):
+                configs[path] = self._cache_config(path, config_cls, data)
+        return configs
+
+    def _get_cached_configs(self, paths, config_cls):
+        configs, missing = {}, []
+        for path in paths:
+            try:
+                configs[path] = self._configs[(path, config_cls)]
+            except KeyError:
+                missing.append(path)
+        return configs, missing
+
+    def _cache_config(self, path, config_cls, data):
+        key = (path, config_cls)
+        with self._lock:
+            # Another thread may have loaded the same path in the meantime.
+            try:
+                return self._configs[key]
+            except KeyError:
+                config = self._configs[key] = config_cls(data)
+                self._backend.add_listener(config._invalidate, path)
         return config
@@ -0,0 +1,54 @@
+"""asyncio counterpart of :mod:`distconfig.api`, requires Python 3.5+."""
+import asyncio
+
+from distconfig import config
+from distconfig.api import Proxy
+from distconfig.backends.async_base import AsyncBackend
+
+
+class AsyncProxy(Proxy):
+    """Proxy class for differents backend that can be used from asyncio coroutines.
+
+    With an asyncio backend, e.g. :class:`distconfig.backends.async_consul.AsyncConsulBackend`,
+    configs are fetched without blocking the event loop, other backends are called in the
+    event loop default executor.
+    """
+
+    async def get_config_async(self, path, config_cls=config.Config):
+        """Coroutine counterpart of :meth:`distconfig.api.Proxy.get_config`.
+
+        :param path: Location of the configuratin in the backend.
+        :param config_cls: configuration class to return, default: :class:`distconfig.config.Config`.
+        :return: ``config_cls`` instance.
+
+        """
+        key = (path, config_cls)
+        try:
+            return self._configs[key]
+        except KeyError:
+            pass
+        if isinstance(self._backend, AsyncBackend):
+            data = await self._backend.get_async(path)
+        else:
+            loop = asyncio.get_event_loop()
+            data = await loop.run_in_executor(None, self._backend.get, path)
+        return self._cache_config(path, config_cls, data)
+
+    async def get_configs_async(self, paths, config_cls=config.Config):
+        """Coroutine counterpart of :meth:`distconfig.api.Proxy.get_configs`.
+
+        :param paths: Locations of the configurations in the backend.
+        :param config_cls: configuration class to return, default: :class:`distconfig.config.Config`.
+        :return: dictionary of ``config_cls`` instances by path.
+
+        """
+        configs, missing = self._get_cached_configs(paths, config_cls)
+        if missing:
+            if isinstance(self._backend, AsyncBackend):
+                values = await self._backend.get_many_async(missing)
+            else:
+                loop = asyncio.get_event_loop()
+                values = await loop.run_in_executor(None, self._backend.get_many, missing)
+            for path, data in values.items():
+                configs[path] = self._cache_config(path, config_cls, data)
+        return configs
@@ -0,0 +1,136 @@
+import itertools
+import socket
+import threading
+
+from distconfig import agent, instrumentation
+from distconfig.backends.base import BaseBackend
+
+
+class AgentBackend(BaseBackend):
+    """Backend reading and watching values through a local :class:`distconfig.agent.Agent`.
+
+    Paths read are watched by the agent, which pushes their changes on the same
+    connection. When the connection is lost, it's opened again following the
+    backend reconnect policy and watched paths are read again, listeners are notified
+    of values that changed meanwhile.
+
+    Example using :meth:`distconfig.api.Proxy.configure`::
+
+        proxy = Proxy.configure(
+            'distconfig.backends.agent.AgentBackend',
+            socket_path='/run/distconfig.sock',
+        )
+
+    :param socket_path: Path of the Unix socket of the agent.
+    :param execution_context: Instance of :class:`distconfig.backends.execution_context.ExecutionContext`
+        used to receive changes.
+    :param timeout: Seconds to wait for the agent to answer a request, default: 10.
+
+    """
+
+    def __init__(self, socket_path, execution_context=None, timeout=10, **kwargs):
+        super(AgentBackend, self).__init__(execution_context=execution_context, **kwargs)
+        self._socket_path = socket_path
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._socket = None
+        self._request_ids = itertools.count(1)
+        # [event, message type, body] by request id.
+        self._pending = {}
+        self._watching = set()
+
+    def get_raw(self, path):
+        return self.get_raw_many([path])[path]
+
+    def get_raw_many(self, paths):
+        """Get values of many paths with one request to the agent."""
+        paths = list(paths)
+        values = self._request(paths)
+        with self._lock:
+            self._watching.update(paths)
+        return dict((path, values.get(path, (None, None))[0]) for path in paths)
+
+    def _connect(self):
+        """Return the connection to the agent, opened if needed."""
+        with self._lock:
+            if self._socket is None:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    sock.connect(self._socket_path)
+                    self._execution_context.run(self._receive, sock)
+                except Exception:
+                    sock.close()
+                    raise
+                # Only stored once received from, the receiver waits for the lock
+                # before clearing it.
+                self._socket = sock
+            return self._socket
+
+    def _request(self, paths):
+        sock = self._connect()
+        request_id = next(self._request_ids)
+        pending = self._pending[request_id] = [threading.Event(), None, None]
+        try:
+            with self._send_lock:
+                agent.send_frame(sock, agent.WATCH, request_id, agent.encode_paths(paths))
+            if not pending[0].wait(self._timeout):
+                raise IOError('Agent at %r did not answer in %s seconds' % (self._socket_path, self._timeout))
+        finally:
+            del self._pending[request_id]
+        _, message_type, body = pending
+        if message_type == agent.ERROR:
+            raise IOError('Agent at %r failed: %s' % (self._socket_path, body.decode('utf8')))
+        if message_type is None:
+            raise IOError('Connection to agent at %r lost' % self._socket_path)
+        return agent.decode_values(body)
+
+    def _receive(self, sock):
+        try:
+            while self._execution_context.running:
+                frame = agent.recv_frame(sock)
+                if frame is None:
+                    break
+                message_type, request_id, body = frame
+                if message_type == agent.CHANGE:
+                    self._notify_changes(agent.decode_values(body))
+                    continue
+                pending = self._pending.get(request_id)
+                if pending is not None:
+                    pending[1:] = [message_type, body]
+                    pending[0].set()
+        except Exception as ex:
+            self._logger.error('exception raised while receiving from agent at %r: %s', self._socket_path, ex)
+        with self._lock:
+            if self._socket is sock:
+                self._socket = None
+        sock.close()
+        for pending in list(self._pending.values()):
+            pending[0].set()
+        if self._execution_context.running:
+            self._reconnect()
+
+    def _reconnect(self):
+        with self._lock:
+            paths = sorted(self._watching)
+        while self._execution_context.running:
+            try:
+                values = self._request(paths) if paths else self._connect()
+            except Exception as ex:
+                delay = self._reconnect_policy.failure(self._socket_path)
+                self._logger.error('exception raised while reconnecting to agent at %r (retrying in %.2fs): %s',
+                                   self._socket_path, delay, ex)
+                instrumentation.get_instrumentation().watch_error(self._socket_path, ex)
+                self._execution_context.sleep(delay)
+            else:
+                self._reconnect_policy.success(self._socket_path)
+                if paths:
+                    self._notify_changes(values)
+                return
+
+    def _notify_changes(self, values):
+        for path, (value, version) in values.items():
+            try:
+                self._notify_listeners(value, path, version)
+            except Exception:
+                pass  # Already logged, keep notifying the other paths.
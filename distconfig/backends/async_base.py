@@ -0,0 +1,162 @@
+"""Base class of asyncio backends, requires Python 3.5+."""
+import abc
+import asyncio
+
+from distconfig import instrumentation
+from distconfig.backends.base import _SNAPSHOTS, BaseBackend
+
+
+class AsyncBackend(BaseBackend):
+    """Base abstract asyncio backend class.
+
+    Backend implementation should inherit and implement ``get_raw_async`` coroutine,
+    watchers should run as asyncio tasks e.g. using
+    :class:`distconfig.backends.execution_context.AsyncioExecutionContext`.
+    """
+
+    @abc.abstractmethod
+    async def get_raw_async(self, path):
+        """Get path value from backend as it is.
+
+        :path: key in the backend.
+        :return: path value as saved in backend or None if not found in backend.
+        """
+
+    async def get_async(self, path):
+        """Get parsed path value in backend.
+
+        :path: key in the backend.
+        :return: path value parsed.
+        """
+        if self._snapshot is None:
+            data = await self._get_raw_async_instrumented(path)
+        else:
+            data = (await self._get_raw_many_from_snapshot_async([path]))[path]
+        self._remember_values({path: data})
+        return self._parse_raw_data(data, path)
+
+    async def get_raw_many_async(self, paths):
+        """Get values of many paths from backend as they are.
+
+        Default implementation await ``get_raw_async`` for each path concurrently, at most
+        ``max_concurrency`` at a time.
+
+        :paths: keys in the backend.
+        :return: dictionary of path values as saved in backend or None if not found in backend.
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def get_raw(path):
+            async with semaphore:
+                return await self.get_raw_async(path)
+
+        paths = list(paths)
+        values = await asyncio.gather(*[get_raw(path) for path in paths])
+        return dict(zip(paths, values))
+
+    async def get_many_async(self, paths):
+        """Get parsed values of many paths in backend.
+
+        :paths: keys in the backend.
+        :return: dictionary of path values parsed.
+        """
+        if self._snapshot is None:
+            values = await self._get_raw_many_async_instrumented(paths)
+        else:
+            values = await self._get_raw_many_from_snapshot_async(paths)
+        self._remember_values(values)
+        return dict((path, self._parse_raw_data(data, path)) for path, data in values.items())
+
+    async def _get_raw_async_instrumented(self, path):
+        instr = instrumentation.get_instrumentation()
+        if not instr.enabled:
+            return await self.get_raw_async(path)
+        start = instrumentation.clock()
+        try:
+            return await self.get_raw_async(path)
+        finally:
+            instr.get_raw(path, instrumentation.clock() - start)
+
+    async def _get_raw_many_async_instrumented(self, paths):
+        instr = instrumentation.get_instrumentation()
+        if not instr.enabled:
+            return await self.get_raw_many_async(paths)
+        paths = list(paths)
+        start = instrumentation.clock()
+        try:
+            return await self.get_raw_many_async(paths)
+        finally:
+            instr.get_raw_many(paths, instrumentation.clock() - start)
+
+    async def _get_raw_many_from_snapshot_async(self, paths):
+        values, missing = self._load_snapshots(paths)
+        if values:
+            try:
+                self._execution_context.run(self._reconcile_snapshots_async, dict(values), self._get_receipts(values))
+            except Exception as ex:
+                # Snapshot values are still served, they are reconciled by the next read.
+                self._logger.error('exception raised while starting snapshots reconcile: %s', ex)
+        if missing:
+            fetched = await self._get_raw_many_async_instrumented(missing)
+            self._save_snapshots(fetched)
+            values.update(fetched)
+        return values
+
+    async def _reconcile_snapshots_async(self, snapshots, receipts):
+        while self._execution_context.running:
+            try:
+                values = await self._get_raw_many_async_instrumented(list(snapshots))
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                delay = self._reconnect_policy.failure(_SNAPSHOTS)
+                self._logger.error('exception raised while reconciling snapshots (retrying in %.2fs): %s', delay, ex)
+                await asyncio.sleep(delay)
+            else:
+                self._reconnect_policy.success(_SNAPSHOTS)
+                self._on_snapshots_reconciled(snapshots, receipts, values)
+                return
+
+    def get_raw(self, path):
+        """Blocking counterpart of ``get_raw_async``, see :meth:`_run_sync`."""
+        return self._run_sync(self.get_raw_async, path)
+
+    def get_raw_many(self, paths):
+        """Blocking counterpart of ``get_raw_many_async``, see :meth:`_run_sync`."""
+        return self._run_sync(self.get_raw_many_async, paths)
+
+    def _run_sync(self, coroutine_function, *args):
+        """Run ``coroutine_function`` in the event loop of the backend and return its result.
+
+        When the loop is running in another thread, e.g. when a sync
+        :class:`distconfig.api.Proxy` is used from a worker thread, the calling
+        thread blocks until the coroutine is done, else the loop is run until the
+        coroutine is done.
+
+        :raise RuntimeError: If called from the event loop, coroutines must await
+            the ``*_async`` methods instead of blocking the loop.
+        """
+        if _get_running_loop() is not None:
+            raise RuntimeError('%s is an asyncio backend, await its *_async methods from coroutines'
+                               % self.__class__.__name__)
+        loop = getattr(self._execution_context, 'loop', None)
+        if not isinstance(loop, asyncio.AbstractEventLoop):
+            loop = asyncio.get_event_loop()
+        coro = _call(coroutine_function, *args)
+        if loop.is_running():
+            return asyncio.run_coroutine_threadsafe(coro, loop).result()
+        return loop.run_until_complete(coro)
+
+
+async def _call(coroutine_function, *args):
+    return await coroutine_function(*args)
+
+
+def _get_running_loop():
+    """Return the event loop running in the current thread, None if there is none."""
+    try:
+        return asyncio.get_running_loop()
+    except AttributeError:  # Python < 3.7
+        return asyncio._get_running_loop()
+    except RuntimeError:
+        return None
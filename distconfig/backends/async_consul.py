@@ -0,0 +1,89 @@
+"""Consul asyncio backend, requires Python 3.5+."""
+import asyncio
+
+from distconfig import instrumentation
+from distconfig.backends.async_base import AsyncBackend
+from distconfig.backends.consul import ConsulBackend
+from distconfig.backends.execution_context import AsyncioExecutionContext
+
+
+class AsyncConsulBackend(AsyncBackend, ConsulBackend):
+    """Consul asyncio backend implementation.
+
+    Watchers are run as asyncio tasks, so one event loop can long-poll many keys
+    without a thread each, see :class:`distconfig.backends.consul.ConsulBackend`
+    for watching options.
+
+    :param client: Instance of :class:`consul.aio.Consul`.
+    :param execution_context: Instance of :class:`distconfig.backends.execution_context.AsyncioExecutionContext`,
+        default: a new ``AsyncioExecutionContext`` using the current event loop.
+
+    """
+
+    def __init__(self, client, execution_context=None, **kwargs):
+        if execution_context is None:
+            execution_context = AsyncioExecutionContext()
+        super(AsyncConsulBackend, self).__init__(client, execution_context=execution_context, **kwargs)
+
+    async def get_raw_async(self, key):
+        result = await self._get_backend_data(key)
+        self._add_watcher(key)
+        return result
+
+    async def get_raw_many_async(self, keys):
+        keys, by_prefix = self._group_by_prefix(keys)
+        values = {}
+        for prefix, prefix_keys in by_prefix.items():
+            _, items = await self._kv_get(prefix, recurse=True)
+            values.update(self._on_prefix_data(prefix_keys, items))
+        if keys:
+            values.update(await super(AsyncConsulBackend, self).get_raw_many_async(keys))
+        return values
+
+    async def _kv_get(self, key, recurse=False, watch=False, index=None):
+        kwargs = self._get_query_kwargs(key, recurse, watch, index)
+        index, data = await self._client.kv.get(key, **kwargs)
+        retry_kwargs = self._get_retry_kwargs(key, kwargs, index)
+        if retry_kwargs is not None:
+            index, data = await self._client.kv.get(key, **retry_kwargs)
+        self._indexes[(key, recurse)] = index
+        return index, data
+
+    async def _get_backend_data(self, key):
+        _, result = await self._kv_get(key)
+        if result:
+            result = result['Value']
+        return result
+
+    async def _watch_for_changes(self, key):
+        index = None
+        while self._execution_context.running:
+            try:
+                index, data = await self._kv_get(key, watch=True, index=index)
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                delay = self._reconnect_policy.failure(key)
+                self._logger.error('exception raised while listening on consul changes (re-launching watcher in %.2fs): %s', delay, ex)
+                instrumentation.get_instrumentation().watch_error(key, ex)
+                await asyncio.sleep(delay)
+            else:
+                self._reconnect_policy.success(key)
+                self._on_key_change(key, data)
+
+    async def _watch_prefix_for_changes(self, prefix):
+        index = None
+        modify_indexes = {}
+        while self._execution_context.running:
+            try:
+                index, items = await self._kv_get(prefix, recurse=True, watch=True, index=index)
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                delay = self._reconnect_policy.failure(prefix)
+                self._logger.error('exception raised while listening on consul changes of prefix %r (re-launching watcher in %.2fs): %s', prefix, delay, ex)
+                instrumentation.get_instrumentation().watch_error(prefix, ex)
+                await asyncio.sleep(delay)
+            else:
+                self._reconnect_policy.success(prefix)
+                modify_indexes = self._on_prefix_change(prefix, items, modify_indexes)
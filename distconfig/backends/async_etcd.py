@@ -0,0 +1,105 @@
+"""Etcd asyncio backend, requires Python 3.5+."""
+import asyncio
+
+from aio_etcd import EtcdEventIndexCleared, EtcdKeyNotFound
+
+from distconfig import instrumentation
+from distconfig.backends.async_base import AsyncBackend
+from distconfig.backends.etcd import EtcdBackend
+from distconfig.backends.execution_context import AsyncioExecutionContext
+
+
+class AsyncEtcdBackend(AsyncBackend, EtcdBackend):
+    """Etcd asyncio backend implementation.
+
+    Watchers are run as asyncio tasks, so one event loop can long-poll many keys
+    without a thread each, see :class:`distconfig.backends.etcd.EtcdBackend`
+    for watching options.
+
+    :param client: Instance of :class:`aio_etcd.Client`.
+    :param execution_context: Instance of :class:`distconfig.backends.execution_context.AsyncioExecutionContext`,
+        default: a new ``AsyncioExecutionContext`` using the current event loop.
+    """
+
+    def __init__(self, client, execution_context=None, **kwargs):
+        if execution_context is None:
+            execution_context = AsyncioExecutionContext()
+        super(AsyncEtcdBackend, self).__init__(client, execution_context=execution_context, **kwargs)
+
+    async def get_raw_async(self, key):
+        result = await self._get_backend_data(key)
+        self._add_watcher(key)
+        return result
+
+    async def get_raw_many_async(self, keys):
+        keys, by_directory = self._group_by_directory(keys)
+        values = {}
+        for directory, directory_keys in by_directory.items():
+            try:
+                result = await self._client.read(directory, recursive=True)
+            except EtcdKeyNotFound:
+                result = None
+            values.update(self._on_directory_data(directory_keys, result))
+        if keys:
+            values.update(await super(AsyncEtcdBackend, self).get_raw_many_async(keys))
+        return values
+
+    async def _get_backend_data(self, key):
+        try:
+            result = await self._client.get(key)
+        except EtcdKeyNotFound:
+            return
+        else:
+            return result.value
+
+    async def _watch_for_changes(self, key):
+        index = None
+        while self._execution_context.running:
+            try:
+                response = await self._client.watch(key, index=index)
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                delay = self._reconnect_policy.failure(key)
+                self._logger.error('exception raised while listening on etcd changes (re-launching watcher in %.2fs): %s', delay, ex)
+                instrumentation.get_instrumentation().watch_error(key, ex)
+                await asyncio.sleep(delay)
+            else:
+                self._reconnect_policy.success(key)
+                if index is None:
+                    index = response.etcd_index
+                else:
+                    index += 1
+                self._notify_listeners(response.value, key, response.modifiedIndex)
+
+    async def _watch_directory_for_changes(self, directory):
+        index = None
+        synced = False
+        while self._execution_context.running:
+            try:
+                if not synced:
+                    index = await self._sync_directory(directory)
+                    synced = True
+                    self._reconnect_policy.success(directory)
+                    continue
+                response = await self._client.watch(directory, index=index, recursive=True)
+            except asyncio.CancelledError:
+                raise
+            except EtcdEventIndexCleared:
+                self._logger.warning('etcd event index of %r cleared, re-reading directory', directory)
+                synced = False
+            except Exception as ex:
+                delay = self._reconnect_policy.failure(directory)
+                self._logger.error('exception raised while listening on etcd changes of directory %r (re-launching watcher in %.2fs): %s', directory, delay, ex)
+                instrumentation.get_instrumentation().watch_error(directory, ex)
+                await asyncio.sleep(delay)
+            else:
+                self._reconnect_policy.success(directory)
+                index = self._on_directory_change(directory, response)
+
+    async def _sync_directory(self, directory):
+        try:
+            result = await self._client.read(directory, recursive=True)
+        except EtcdKeyNotFound:
+            result = None
+        return self._on_directory_sync(directory, result)
@@ -1,13 +1,50 @@
 import abc
+import collections
+import functools
+import hashlib
+import itertools
 import logging
 import sys
+import threading
+import time
 
 import six
 import ujson
 
+from distconfig import instrumentation, utils
+from distconfig.config import LazyMapping
+from distconfig.parsers import ParserRegistry
+from distconfig.backends.execution_context import ThreadingExecutionContext
+from distconfig.backends.reconnect import ReconnectPolicy
+
 
 LOGGER = logging.getLogger(__name__)
 
+_MISSING = object()
+# Reconnect policy key of snapshot reconciles.
+_SNAPSHOTS = '<snapshots>'
+
+
+def _fingerprint(value):
+    """Return a cheap to compare fingerprint of a raw value."""
+    if value is None:
+        return None
+    if isinstance(value, six.text_type):
+        value = value.encode('utf8')
+    return hashlib.sha1(value).digest()
+
+
+def _parse_instrumented(parser, path, data):
+    """Parse ``data`` and report the parse duration of ``path``."""
+    instr = instrumentation.get_instrumentation()
+    if not instr.enabled:
+        return parser(data)
+    start = instrumentation.clock()
+    try:
+        return parser(data)
+    finally:
+        instr.parse(path, instrumentation.clock() - start)
+
 
 @six.add_metaclass(abc.ABCMeta)
 class BaseBackend(object):
@@ -15,16 +52,74 @@ class BaseBackend(object):
 
     Backend implementation should inherit and implement ``get_raw`` method.
 
-    :param parser: Callable that accept a string and parse it, default: ``ujson.loads``.
+    :param parser: Callable that accept a string and parse it or a
+        :class:`distconfig.parsers.ParserRegistry` instance to choose the parser by path
+        or payload, default: ``ujson.loads``.
     :param logger: :class:`logging.Logger`` instance.
+    :param max_concurrency: Maximum number of concurrent requests made by ``get_raw_many``
+        default implementation, default: 8.
+    :param execution_context: Instance of :class:`distconfig.backends.execution_context.ExecutionContext`
+        used to run background functions, default: a new ``ThreadingExecutionContext()``
+        owned by the backend, so that shutting it down only stops this backend watchers.
+    :param snapshot: Optional :class:`distconfig.backends.snapshot.SnapshotStore` instance, when
+        given ``get`` and ``get_many`` return values from the snapshot if any and reconcile them
+        with the backend in background, listeners are notified of values that differ. Values
+        read together are saved with the store ``save_many(values, versions)`` if it has one.
+    :param coalesce_window: Optional number of seconds to wait for a newer value of a
+        changed path before notifying listeners, only the latest value received in the
+        window is parsed and delivered, default: None i.e. notify every change right away.
+    :param coalesce_max_delay: Maximum number of seconds a change can be delayed by
+        ``coalesce_window``, default: 10 times ``coalesce_window``.
+    :param lazy: If true, raw data is wrapped in a :class:`distconfig.config.LazyMapping`
+        parsed on first access instead of being parsed right away, a config keeps serving
+        its last parsed data when a new value fails to parse, default: False.
+    :param reconnect_policy: :class:`distconfig.backends.reconnect.ReconnectPolicy` instance
+        shared by the backend watchers to wait between reconnects, default: a new
+        ``ReconnectPolicy()``.
     """
 
-    def __init__(self, parser=ujson.loads, logger=LOGGER):
-        self.__callbacks = []
+    def __init__(self, parser=ujson.loads, logger=LOGGER, max_concurrency=8,
+                 execution_context=None, snapshot=None,
+                 coalesce_window=None, coalesce_max_delay=None, lazy=False, reconnect_policy=None):
+        self.__callbacks = collections.defaultdict(list)
+        self.__callbacks_lock = threading.Lock()
+        # Last raw value by path of changes received while the path had no
+        # listener, passed to the first listener added for the path.
+        self.__unclaimed = {}
         self.__parser = parser
+        self._lazy = lazy
+        self._max_concurrency = max_concurrency
+        if execution_context is None:
+            execution_context = ThreadingExecutionContext()
+        self._execution_context = execution_context
+        self._snapshot = snapshot
+        self._reconnect_policy = reconnect_policy if reconnect_policy is not None else ReconnectPolicy()
+        self._coalesce_window = coalesce_window
+        if coalesce_window is not None and coalesce_max_delay is None:
+            coalesce_max_delay = 10 * coalesce_window
+        self._coalesce_max_delay = coalesce_max_delay
+        # Changes waiting for the coalesce window to end by path, as
+        # [value, version, first received time, last received time].
+        self.__pending = {}
+        self.__pending_lock = threading.Lock()
+        self.__dispatching = False
+        self.__received = 0
+        self.__coalesced = 0
+        # (version, fingerprint) of the last raw value delivered by path.
+        self.__fingerprints = {}
+        # Id of the last value received by path, to tell which paths received a
+        # value from watchers while their snapshots were reconciled.
+        self.__receipts = {}
+        self.__receipt_ids = itertools.count(1)
 
         self._logger = logger
 
+    @property
+    def reconnect_policy(self):
+        """:class:`distconfig.backends.reconnect.ReconnectPolicy` of the watchers, e.g. to
+        check if the circuit is open."""
+        return self._reconnect_policy
+
     @abc.abstractmethod
     def get_raw(self, path):
         """Get path value from backend as it is.
@@ -39,43 +134,343 @@ class BaseBackend(object):
         :path: key in the backend.
         :return: path value parsed.
         """
-        data = self.get_raw(path)
-        return self._parse_raw_data(data)
+        if self._snapshot is None:
+            data = self._get_raw_instrumented(path)
+        else:
+            data = self._get_raw_many_from_snapshot([path])[path]
+        self._remember_values({path: data})
+        return self._parse_raw_data(data, path)
+
+    def get_raw_many(self, paths):
+        """Get values of many paths from backend as they are.
+
+        Default implementation call ``get_raw`` for each path concurrently, backends
+        should override it when they support cheaper ways to read many paths.
+
+        :paths: keys in the backend.
+        :return: dictionary of path values as saved in backend or None if not found in backend.
+        """
+        paths = list(paths)
+        if len(paths) == 1 or self._max_concurrency <= 1:
+            values = [self.get_raw(path) for path in paths]
+        else:
+            values = utils.parallel_map(self.get_raw, paths, self._max_concurrency)
+        return dict(zip(paths, values))
+
+    def get_many(self, paths):
+        """Get parsed values of many paths in backend.
+
+        :paths: keys in the backend.
+        :return: dictionary of path values parsed.
+        """
+        if self._snapshot is None:
+            values = self._get_raw_many_instrumented(paths)
+        else:
+            values = self._get_raw_many_from_snapshot(paths)
+        self._remember_values(values)
+        return dict((path, self._parse_raw_data(data, path)) for path, data in six.iteritems(values))
+
+    def _get_raw_instrumented(self, path):
+        instr = instrumentation.get_instrumentation()
+        if not instr.enabled:
+            return self.get_raw(path)
+        start = instrumentation.clock()
+        try:
+            return self.get_raw(path)
+        finally:
+            instr.get_raw(path, instrumentation.clock() - start)
+
+    def _get_raw_many_instrumented(self, paths):
+        instr = instrumentation.get_instrumentation()
+        if not instr.enabled:
+            return self.get_raw_many(paths)
+        paths = list(paths)
+        start = instrumentation.clock()
+        try:
+            return self.get_raw_many(paths)
+        finally:
+            instr.get_raw_many(paths, instrumentation.clock() - start)
+
+    def _remember_values(self, values):
+        """Remember fingerprint of values read before their path is listened to, so
+        that the first notification of the same value is skipped.
+
+        Paths with listeners, or already remembered, keep the fingerprint of the last
+        value dispatched: the value read may not have been delivered to listeners yet.
+        """
+        with self.__callbacks_lock:
+            if self.__callbacks.get(None):
+                return
+            for path, value in six.iteritems(values):
+                if path not in self.__callbacks and path not in self.__fingerprints:
+                    self.__fingerprints[path] = (None, _fingerprint(value))
+
+    def _is_unchanged(self, path, value, version):
+        """Return True if ``value`` is the same as the last value of ``path``, and
+        remember it otherwise."""
+        last_version, last_fingerprint = self.__fingerprints.get(path, (None, False))
+        if version is not None and version == last_version:
+            return True
+        fingerprint = _fingerprint(value)
+        self.__fingerprints[path] = (version, fingerprint)
+        return fingerprint == last_fingerprint
+
+    def _get_raw_many_from_snapshot(self, paths):
+        values, missing = self._load_snapshots(paths)
+        if values:
+            try:
+                self._execution_context.run(self._reconcile_snapshots, dict(values), self._get_receipts(values))
+            except Exception as ex:
+                # Snapshot values are still served, they are reconciled by the next read.
+                self._logger.error('exception raised while starting snapshots reconcile: %s', ex)
+        if missing:
+            if len(missing) == 1:
+                fetched = {missing[0]: self._get_raw_instrumented(missing[0])}
+            else:
+                fetched = self._get_raw_many_instrumented(missing)
+            self._save_snapshots(fetched)
+            values.update(fetched)
+        return values
+
+    def _load_snapshots(self, paths):
+        """Load snapshots of paths.
+
+        :return: Tuple of dictionary of snapshot values by path and list of paths without snapshot.
+        """
+        values, missing = {}, []
+        for path in paths:
+            try:
+                values[path], _ = self._snapshot.load(path)
+            except KeyError:
+                missing.append(path)
+        return values, missing
+
+    def _save_snapshots(self, values, versions=None):
+        save_many = getattr(self._snapshot, 'save_many', None)
+        if save_many is not None:
+            try:
+                save_many(values, versions)
+            except Exception as ex:
+                self._logger.error('exception raised while saving snapshots of %r: %s', sorted(values), ex)
+            return
+        versions = versions or {}
+        for path, value in six.iteritems(values):
+            try:
+                self._snapshot.save(path, value, versions.get(path))
+            except Exception as ex:
+                self._logger.error('exception raised while saving snapshot of %r: %s', path, ex)
+
+    def _get_receipts(self, paths):
+        """Return id of the last value received by path, None if none was received."""
+        return dict((path, self.__receipts.get(path)) for path in paths)
+
+    def _reconcile_snapshots(self, snapshots, receipts):
+        while self._execution_context.running:
+            try:
+                values = self._get_raw_many_instrumented(list(snapshots))
+            except Exception as ex:
+                delay = self._reconnect_policy.failure(_SNAPSHOTS)
+                self._logger.error('exception raised while reconciling snapshots (retrying in %.2fs): %s', delay, ex)
+                self._execution_context.sleep(delay)
+            else:
+                self._reconnect_policy.success(_SNAPSHOTS)
+                self._on_snapshots_reconciled(snapshots, receipts, values)
+                return
 
-    def _parse_raw_data(self, data):
+    def _on_snapshots_reconciled(self, snapshots, receipts, values):
+        """Notify listeners of reconciled values that differ from their snapshot.
+
+        :param receipts: Ids of the last value received by path when snapshots were
+            loaded, as returned by :meth:`_get_receipts`.
+        """
+        for path, value in six.iteritems(values):
+            if value == snapshots[path]:
+                continue
+            if self.__receipts.get(path) != receipts[path]:
+                # Watchers received a value meanwhile, which may be newer.
+                continue
+            try:
+                self._notify_listeners(value, path)
+            except Exception:
+                pass  # Already logged, keep notifying the other paths.
+
+    def _parse_raw_data(self, data, path=None):
         if data is None:
             return {}
-        return self.__parser(data)
+        parser = self.__parser
+        if isinstance(parser, ParserRegistry):
+            parser = functools.partial(parser.parse, path=path)
+        if self._lazy:
+            # Timed when parsed, on first access.
+            return LazyMapping(data, functools.partial(_parse_instrumented, parser, path))
+        return _parse_instrumented(parser, path, data)
 
-    def add_listener(self, callback):
+    def add_listener(self, callback, path=None):
         """Add callback to be called when data change in the backend.
 
         If the same callback is added more than once, then it will be notified more than once.
         That is, no check is made to ensure uniqueness.
 
+        If ``path`` changed since it was read while it had no listener, e.g. when snapshots
+        are reconciled before :meth:`distconfig.api.Proxy.get_config` adds its listener,
+        ``callback`` is called right away with the new data.
+
         :param callback: Callable that accept one argument the new data.
+        :param path: Only call ``callback`` when data of this path change,
+            default: None, i.e. call ``callback`` on changes of any path.
         """
-        self.__callbacks.append(callback)
+        with self.__callbacks_lock:
+            self.__callbacks[path].append(callback)
+            unclaimed = self.__unclaimed.pop(path, _MISSING) if path is not None else _MISSING
+        if unclaimed is _MISSING:
+            return
+        self._logger.debug('Notify new listener of %r value changed before it was added', path)
+        try:
+            callback(self._parse_raw_data(unclaimed, path))
+        except Exception:
+            self._logger.exception('Notify new listener raised an exception')
 
-    def remove_listener(self, callback):
+    def remove_listener(self, callback, path=None):
         """Remove previously added callback.
 
         If callback had been added more than once, then only the first occurrence will be removed.
 
         :param callback: Callable as with ``:meth: add_listener``.
+        :param path: Path as with ``:meth: add_listener``.
         :raise ValueError: In case callback was not previously registered.
         """
-        self.__callbacks.remove(callback)
+        with self.__callbacks_lock:
+            callbacks = self.__callbacks[path]
+            callbacks.remove(callback)
+            if not callbacks:
+                del self.__callbacks[path]
 
-    def _notify_listeners(self, value):
-        self._logger.debug('Notify listeners of new value: %r', value)
-        value = self._parse_raw_data(value)
+    def _get_listeners(self, path):
+        if path is None:
+            # Backend didn't tell which path changed, notify everyone.
+            return [callback for callbacks in list(self.__callbacks.values()) for callback in callbacks]
+        return self.__callbacks.get(path, []) + self.__callbacks.get(None, [])
+
+    @property
+    def coalesce_stats(self):
+        """Dictionary of the number of changes ``received`` and ``coalesced`` i.e. dropped
+        because a newer value of the same path was received in the coalesce window."""
+        return {'received': self.__received, 'coalesced': self.__coalesced}
+
+    def _notify_listeners(self, value, path=None, version=None):
+        """Parse ``value`` and pass it to listeners of ``path``.
+
+        Listeners are not notified if ``value`` is the same as the last value
+        of ``path``, e.g. when a watcher reconnect. When ``coalesce_window`` is
+        set, listeners are notified in background once no newer value was
+        received during the window.
+
+        :param value: New raw value of ``path``.
+        :param path: Path that changed, default: None, i.e. notify all listeners.
+        :param version: Optional integer version of ``value`` e.g. backend modify index.
+        """
+        if path is not None:
+            self.__receipts[path] = next(self.__receipt_ids)
+        if self._coalesce_window is None or path is None:
+            return self._dispatch(value, path, version)
+        now = time.time()
+        with self.__pending_lock:
+            self.__received += 1
+            pending = self.__pending.get(path)
+            if pending is not None:
+                pending[0], pending[1], pending[3] = value, version, now
+                self.__coalesced += 1
+                return
+            self.__pending[path] = [value, version, now, now]
+            if self.__dispatching:
+                return
+            self.__dispatching = True
+        try:
+            self._start_dispatcher()
+        except Exception as ex:
+            self._logger.error('exception raised while starting coalesced changes dispatcher, notifying right away: %s', ex)
+            with self.__pending_lock:
+                self.__dispatching = False
+                pending, self.__pending = self.__pending, {}
+            for path, (value, version, _, _) in six.iteritems(pending):
+                self._dispatch(value, path, version)
+
+    def _start_dispatcher(self):
+        """Start :meth:`_dispatch_pending` in a dedicated thread, so that it doesn't wait
+        for a worker of the execution context, busy with watchers."""
+        thread = threading.Thread(target=self._dispatch_pending)
+        thread.daemon = True
+        thread.start()
+
+    def _dispatch_pending(self):
+        """Notify pending changes once their coalesce window ended, until none is left."""
+        while 1:
+            due, delay = [], None
+            with self.__pending_lock:
+                now = time.time()
+                for path, (value, version, first, last) in list(self.__pending.items()):
+                    deadline = min(last + self._coalesce_window, first + self._coalesce_max_delay)
+                    if deadline <= now:
+                        del self.__pending[path]
+                        due.append((path, value, version))
+                    elif delay is None or deadline - now < delay:
+                        delay = deadline - now
+                if not due and delay is None:
+                    self.__dispatching = False
+                    return
+            for path, value, version in due:
+                try:
+                    self._dispatch(value, path, version)
+                except Exception:
+                    pass  # Already logged, keep notifying the other paths.
+            if not due:
+                # Windows are only extended, a path added meanwhile can't end before.
+                time.sleep(delay)
+
+    def _call_instrumented(self, instr, callbacks, value, path):
+        """Call ``callbacks`` with ``value`` and report their durations.
+
+        :return: ``sys.exc_info()`` of the last exception raised by a callback if any.
+        """
         last_exc = None
-        for callback in self.__callbacks:
+        clock = instrumentation.clock
+        start = clock()
+        for callback in callbacks:
+            callback_start = clock()
+            error = None
             try:
                 callback(value)
-            except Exception:
+            except Exception as ex:
                 last_exc = sys.exc_info()
+                error = ex
+            instr.callback(path, callback, clock() - callback_start, error)
+        instr.notify(path, len(callbacks), clock() - start)
+        return last_exc
+
+    def _dispatch(self, value, path, version):
+        if path is not None and self._is_unchanged(path, value, version):
+            self._logger.debug('Skip notifying listeners of %r unchanged value', path)
+            return
+        self._logger.debug('Notify listeners of %r new value: %r', path, value)
+        if self._snapshot is not None and path is not None:
+            self._save_snapshots({path: value}, {path: version})
+        with self.__callbacks_lock:
+            callbacks = self._get_listeners(path)
+            if path is not None and path not in self.__callbacks:
+                self.__unclaimed[path] = value
+        if not callbacks:
+            return
+        value = self._parse_raw_data(value, path)
+        instr = instrumentation.get_instrumentation()
+        if instr.enabled:
+            last_exc = self._call_instrumented(instr, callbacks, value, path)
+        else:
+            last_exc = None
+            for callback in callbacks:
+                try:
+                    callback(value)
+                except Exception:
+                    last_exc = sys.exc_info()
         if last_exc:
             self._logger.exception('Notify listeners raised an exception', exc_info=last_exc)
             try:
@@ -1,45 +1,222 @@
+import collections
+import threading
+
+import six
+
+from distconfig import instrumentation
 from distconfig.backends.base import BaseBackend
-from distconfig.backends.execution_context import ThreadingExecutionContext
+
+
+#: Consistency modes of Consul reads.
+CONSISTENCY_MODES = ('default', 'consistent', 'stale')
 
 
 class ConsulBackend(BaseBackend):
     """Consul backend implementation.
 
+    By default each key is watched by its own blocking query, when watching many keys that
+    share a common prefix pass the prefix in ``watch_prefixes`` so that they are all watched
+    by one recursive blocking query, only keys which ``ModifyIndex`` changed are notified.
+
     :param client: Instance of :class:`consul.Consul`.
     :param execution_context: Instance of :class:`distconfig.backends.execution_context.ExecutionContext`
+    :param watch_prefixes: Iterable of key prefixes to watch recursively instead of watching
+        each key under them individually, the longest matching prefix is used, default: ().
+    :param consistency: Consistency mode of reads and watches, one of ``'default'``,
+        ``'consistent'`` or ``'stale'``, default: None i.e. the mode of ``client``.
+    :param wait: Maximum duration of blocking queries, e.g. ``'5m'`` or a number of
+        seconds, default: None i.e. the Consul default of 5 minutes.
+    :param key_options: Dictionary of ``consistency`` and ``wait`` options by key prefix,
+        overriding the backend options for the keys and watched prefixes under it, the
+        longest matching prefix is used, default: None.
+
+    ``'stale'`` reads can be served by any Consul server instead of the leader, to bound
+    their staleness the index returned by each read is kept by key, a stale read which
+    index is older than the previous one of the same key is done again with the
+    ``'default'`` mode, so values never go back to a version older than one already read.
 
     """
 
-    def __init__(self, client, execution_context=ThreadingExecutionContext(), **kwargs):
-        super(ConsulBackend, self).__init__(**kwargs)
+    def __init__(self, client, execution_context=None, watch_prefixes=(),
+                 consistency=None, wait=None, key_options=None, **kwargs):
+        super(ConsulBackend, self).__init__(execution_context=execution_context, **kwargs)
         self._client = client
-        self._execution_context = execution_context
+        self._watch_prefixes = tuple(watch_prefixes)
+        self._options = {'consistency': consistency, 'wait': wait}
+        self._key_options = dict(key_options or {})
+        for options in [self._options] + list(self._key_options.values()):
+            if options.get('consistency') not in (None,) + CONSISTENCY_MODES:
+                raise ValueError('Invalid consistency mode %r, expected one of %s' % (
+                    options['consistency'], ', '.join(CONSISTENCY_MODES)))
+        # Index returned by the last read by (key, recursive).
+        self._indexes = {}
         self._watching = set()
+        # Watched keys by prefix, a key is only watched by its longest prefix.
+        self._prefix_keys = collections.defaultdict(set)
+        self._lock = threading.Lock()
 
     def get_raw(self, key):
         result = self._get_backend_data(key)
         self._add_watcher(key)
         return result
 
+    def get_raw_many(self, keys):
+        """Get values of many keys, keys sharing a watched prefix are read with one recursive query."""
+        keys, by_prefix = self._group_by_prefix(keys)
+        values = {}
+        for prefix, prefix_keys in by_prefix.items():
+            _, items = self._kv_get(prefix, recurse=True)
+            values.update(self._on_prefix_data(prefix_keys, items))
+        if keys:
+            values.update(super(ConsulBackend, self).get_raw_many(keys))
+        return values
+
+    def _group_by_prefix(self, keys):
+        """Group keys by watched prefix, keys alone under their prefix are left ungrouped.
+
+        :return: Tuple of ungrouped keys and dictionary of keys by prefix.
+        """
+        left, by_prefix = [], collections.defaultdict(list)
+        for key in keys:
+            prefix = self._get_watch_prefix(key)
+            (left if prefix is None else by_prefix[prefix]).append(key)
+        for prefix, prefix_keys in list(by_prefix.items()):
+            if len(prefix_keys) == 1:
+                left.extend(by_prefix.pop(prefix))
+        return left, by_prefix
+
+    def _on_prefix_data(self, keys, items):
+        items = dict((item['Key'], item['Value']) for item in items or ())
+        values = {}
+        for key in keys:
+            values[key] = items.get(key)
+            self._add_watcher(key)
+        return values
+
+    def _get_query_options(self, key):
+        """Return backend options of ``key`` overridden by the options of its longest prefix in ``key_options``."""
+        options = dict(self._options)
+        prefixes = [prefix for prefix in self._key_options if key.startswith(prefix)]
+        if prefixes:
+            options.update(self._key_options[max(prefixes, key=len)])
+        return options
+
+    def _get_query_kwargs(self, key, recurse=False, watch=False, index=None):
+        """Return keyword arguments of ``client.kv.get`` for ``key``, only options that are set are passed."""
+        options = self._get_query_options(key)
+        kwargs = {}
+        if watch:
+            kwargs['index'] = index
+            wait = options.get('wait')
+            if wait is not None:
+                kwargs['wait'] = wait if isinstance(wait, six.string_types) else '%gs' % wait
+        if recurse:
+            kwargs['recurse'] = True
+        if options.get('consistency') is not None:
+            kwargs['consistency'] = options['consistency']
+        return kwargs
+
+    def _get_retry_kwargs(self, key, kwargs, index):
+        """Return keyword arguments to read ``key`` again if a stale read returned an older index, else None."""
+        last_index = self._indexes.get((key, bool(kwargs.get('recurse'))))
+        if kwargs.get('consistency') != 'stale' or index is None or last_index is None or index >= last_index:
+            return None
+        self._logger.debug('stale read of %r returned index %s older than %s, reading it again from the leader',
+                           key, index, last_index)
+        kwargs = dict(kwargs, consistency='default')
+        kwargs.pop('wait', None)
+        kwargs.pop('index', None)
+        return kwargs
+
+    def _kv_get(self, key, recurse=False, watch=False, index=None):
+        kwargs = self._get_query_kwargs(key, recurse, watch, index)
+        index, data = self._client.kv.get(key, **kwargs)
+        retry_kwargs = self._get_retry_kwargs(key, kwargs, index)
+        if retry_kwargs is not None:
+            index, data = self._client.kv.get(key, **retry_kwargs)
+        self._indexes[(key, recurse)] = index
+        return index, data
+
     def _get_backend_data(self, key):
-        _, result = self._client.kv.get(key)
+        _, result = self._kv_get(key)
         if result:
             result = result['Value']
         return result
 
+    def _get_watch_prefix(self, key):
+        prefixes = [prefix for prefix in self._watch_prefixes if key.startswith(prefix)]
+        if prefixes:
+            return max(prefixes, key=len)
+
     def _add_watcher(self, key):
-        if key not in self._watching:
+        with self._lock:
+            if key in self._watching:
+                return
+            prefix = self._get_watch_prefix(key)
+            if prefix is None:
+                self._execution_context.run(self._watch_for_changes, key)
+            else:
+                if prefix not in self._prefix_keys:
+                    self._execution_context.run(self._watch_prefix_for_changes, prefix)
+                self._prefix_keys[prefix].add(key)
+            # Only once watched, the next read tries again if the watcher failed to start.
             self._watching.add(key)
-            self._execution_context.run(self._watch_for_changes, key)
 
     def _watch_for_changes(self, key):
         index = None
-        while 1:
+        while self._execution_context.running:
             try:
-                index, data = self._client.kv.get(key, index=index)
+                index, data = self._kv_get(key, watch=True, index=index)
             except Exception as ex:
-                self._logger.error('exception raised while listening on consul changes (re-launching watcher): %s', ex)
+                delay = self._reconnect_policy.failure(key)
+                self._logger.error('exception raised while listening on consul changes (re-launching watcher in %.2fs): %s', delay, ex)
+                instrumentation.get_instrumentation().watch_error(key, ex)
+                self._execution_context.sleep(delay)
             else:
-                if data:
-                    data = data['Value']
-                self._notify_listeners(data)
+                self._reconnect_policy.success(key)
+                self._on_key_change(key, data)
+
+    def _on_key_change(self, key, data):
+        version = None
+        if data:
+            data, version = data['Value'], data['ModifyIndex']
+        self._notify_listeners(data, key, version)
+
+    def _watch_prefix_for_changes(self, prefix):
+        index = None
+        modify_indexes = {}
+        while self._execution_context.running:
+            try:
+                index, items = self._kv_get(prefix, recurse=True, watch=True, index=index)
+            except Exception as ex:
+                delay = self._reconnect_policy.failure(prefix)
+                self._logger.error('exception raised while listening on consul changes of prefix %r (re-launching watcher in %.2fs): %s', prefix, delay, ex)
+                instrumentation.get_instrumentation().watch_error(prefix, ex)
+                self._execution_context.sleep(delay)
+            else:
+                self._reconnect_policy.success(prefix)
+                modify_indexes = self._on_prefix_change(prefix, items, modify_indexes)
+
+    def _on_prefix_change(self, prefix, items, modify_indexes):
+        """Notify keys under ``prefix`` which ``ModifyIndex`` changed.
+
+        :param items: Items returned by the recursive query of ``prefix``.
+        :param modify_indexes: ``ModifyIndex`` of keys as returned by the previous call.
+        :return: ``ModifyIndex`` of keys in ``items``.
+        """
+        items = dict((item['Key'], item) for item in items or ())
+        changes = [(key, item['Value'], item['ModifyIndex'])
+                   for key, item in items.items() if modify_indexes.get(key) != item['ModifyIndex']]
+        changes.extend((key, None, None) for key in modify_indexes if key not in items)
+        self._notify_changes(prefix, changes)
+        return dict((key, item['ModifyIndex']) for key, item in items.items())
+
+    def _notify_changes(self, prefix, changes):
+        watched = self._prefix_keys.get(prefix, ())
+        for key, value, version in changes:
+            if key not in watched:
+                continue
+            try:
+                self._notify_listeners(value, key, version)
+            except Exception:
+                pass  # Already logged, keep notifying the other keys.
@@ -1,29 +1,100 @@
 from __future__ import absolute_import
 
+import collections
+import threading
+
 from etcd import EtcdKeyNotFound
 
+try:
+    from etcd import EtcdEventIndexCleared
+except ImportError:  # python-etcd < 0.4
+    class EtcdEventIndexCleared(Exception):
+        pass
+
+from distconfig import instrumentation
 from distconfig.backends.base import BaseBackend
-from distconfig.backends.execution_context import ThreadingExecutionContext
+
+
+_DELETE_ACTIONS = frozenset(['delete', 'expire', 'compareAndDelete'])
+
+
+def _normalize_key(key):
+    """Normalize etcd key to the form returned in etcd responses.
+
+    Example:
+
+        >>> _normalize_key('distconfig/config/')
+        '/distconfig/config'
+
+    """
+    return '/' + key.strip('/')
 
 
 class EtcdBackend(BaseBackend):
     """Etcd backend implementation.
 
+    By default each key is watched by its own long-poll, when watching many keys under
+    the same directory pass the directory in ``watch_directories`` so that they are all
+    watched by one recursive long-poll and each event is routed to the changed key.
+
     :param client: Instance of :class:`etcd.Client`.
     :param execution_context: Instance of :class:`distconfig.backends.execution_context.ExecutionContext`
+    :param watch_directories: Iterable of directories to watch recursively instead of
+        watching each key under them individually, the deepest matching directory
+        is used, default: ().
     """
 
-    def __init__(self, client, execution_context=ThreadingExecutionContext(), **kwargs):
-        super(EtcdBackend, self).__init__(**kwargs)
+    def __init__(self, client, execution_context=None, watch_directories=(), **kwargs):
+        super(EtcdBackend, self).__init__(execution_context=execution_context, **kwargs)
         self._client = client
-        self._execution_context = execution_context
+        self._watch_directories = tuple(_normalize_key(directory) for directory in watch_directories)
         self._watching = set()
+        # Watched keys by directory and normalized key, used to route directory
+        # events, a key is only watched by its deepest directory.
+        self._directory_keys = collections.defaultdict(dict)
+        self._lock = threading.Lock()
 
     def get_raw(self, key):
         result = self._get_backend_data(key)
         self._add_watcher(key)
         return result
 
+    def get_raw_many(self, keys):
+        """Get values of many keys, keys sharing a watched directory are read with one recursive read."""
+        keys, by_directory = self._group_by_directory(keys)
+        values = {}
+        for directory, directory_keys in by_directory.items():
+            try:
+                result = self._client.read(directory, recursive=True)
+            except EtcdKeyNotFound:
+                result = None
+            values.update(self._on_directory_data(directory_keys, result))
+        if keys:
+            values.update(super(EtcdBackend, self).get_raw_many(keys))
+        return values
+
+    def _group_by_directory(self, keys):
+        """Group keys by watched directory, keys alone under their directory are left ungrouped.
+
+        :return: Tuple of ungrouped keys and dictionary of keys by directory.
+        """
+        left, by_directory = [], collections.defaultdict(list)
+        for key in keys:
+            directory = self._get_watch_directory(key)
+            (left if directory is None else by_directory[directory]).append(key)
+        for directory, directory_keys in list(by_directory.items()):
+            if len(directory_keys) == 1:
+                left.extend(by_directory.pop(directory))
+        return left, by_directory
+
+    def _on_directory_data(self, keys, result):
+        nodes = {} if result is None else dict((node.key, node.value) for node in result.leaves)
+        values = {}
+        for key in keys:
+            values[key] = nodes.get(_normalize_key(key))
+            self._add_watcher(key)
+        return values
+
     def _get_backend_data(self, key):
         try:
             result = self._client.get(key)
@@ -32,21 +103,104 @@ class EtcdBackend(BaseBackend):
         else:
             return result.value
 
+    def _get_watch_directory(self, key):
+        key = _normalize_key(key)
+        directories = [directory for directory in self._watch_directories if key.startswith(directory.rstrip('/') + '/')]
+        if directories:
+            return max(directories, key=len)
+
     def _add_watcher(self, key):
-        if key not in self._watching:
+        with self._lock:
+            if key in self._watching:
+                return
+            directory = self._get_watch_directory(key)
+            if directory is None:
+                self._execution_context.run(self._watch_for_changes, key)
+            else:
+                if directory not in self._directory_keys:
+                    self._execution_context.run(self._watch_directory_for_changes, directory)
+                self._directory_keys[directory].setdefault(_normalize_key(key), set()).add(key)
+            # Only once watched, the next read tries again if the watcher failed to start.
             self._watching.add(key)
-            self._execution_context.run(self._watch_for_changes, key)
 
     def _watch_for_changes(self, key):
         index = None
-        while 1:
+        while self._execution_context.running:
             try:
                 response = self._client.watch(key, index=index)
             except Exception as ex:
-                self._logger.error('exception raised while listening on etcd changes (re-launching watcher): %s', ex)
+                delay = self._reconnect_policy.failure(key)
+                self._logger.error('exception raised while listening on etcd changes (re-launching watcher in %.2fs): %s', delay, ex)
+                instrumentation.get_instrumentation().watch_error(key, ex)
+                self._execution_context.sleep(delay)
             else:
+                self._reconnect_policy.success(key)
                 if index is None:
                     index = response.etcd_index
                 else:
                     index += 1
-                self._notify_listeners(response.value)
+                self._notify_listeners(response.value, key, response.modifiedIndex)
+
+    def _watch_directory_for_changes(self, directory):
+        index = None
+        synced = False
+        while self._execution_context.running:
+            try:
+                if not synced:
+                    index = self._sync_directory(directory)
+                    synced = True
+                    self._reconnect_policy.success(directory)
+                    continue
+                response = self._client.watch(directory, index=index, recursive=True)
+            except EtcdEventIndexCleared:
+                # Events since our index were dropped by etcd, start again
+                # from the current state.
+                self._logger.warning('etcd event index of %r cleared, re-reading directory', directory)
+                synced = False
+            except Exception as ex:
+                delay = self._reconnect_policy.failure(directory)
+                self._logger.error('exception raised while listening on etcd changes of directory %r (re-launching watcher in %.2fs): %s', directory, delay, ex)
+                instrumentation.get_instrumentation().watch_error(directory, ex)
+                self._execution_context.sleep(delay)
+            else:
+                self._reconnect_policy.success(directory)
+                index = self._on_directory_change(directory, response)
+
+    def _on_directory_change(self, directory, response):
+        """Notify the key of ``response`` event of its new value.
+
+        :return: etcd index to continue watching from.
+        """
+        value = None if response.action in _DELETE_ACTIONS else response.value
+        self._notify_changes(directory, [(response.key, value, response.modifiedIndex)])
+        return response.modifiedIndex + 1
+
+    def _sync_directory(self, directory):
+        """Notify watched keys under ``directory`` of their current value.
+
+        :return: etcd index to start watching from.
+        """
+        try:
+            result = self._client.read(directory, recursive=True)
+        except EtcdKeyNotFound:
+            result = None
+        return self._on_directory_sync(directory, result)
+
+    def _on_directory_sync(self, directory, result):
+        if result is None:
+            values, index = {}, None
+        else:
+            values = dict((node.key, node.value) for node in result.leaves)
+            index = result.etcd_index + 1
+        keys = list(self._directory_keys.get(directory, ()))
+        self._notify_changes(directory, [(key, values.get(key), None) for key in keys])
+        return index
+
+    def _notify_changes(self, directory, changes):
+        watched = self._directory_keys.get(directory, {})
+        for normalized_key, value, version in changes:
+            for key in list(watched.get(normalized_key, ())):
+                try:
+                    self._notify_listeners(value, key, version)
+                except Exception:
+                    pass  # Already logged, keep notifying the other keys.
@@ -1,17 +1,70 @@
 import abc
+import functools
+import logging
 import threading
 
 import six
+from six.moves import queue
+
+
+LOGGER = logging.getLogger(__name__)
+
+_STOPPED_LOCK = threading.Lock()
 
 
 @six.add_metaclass(abc.ABCMeta)
 class ExecutionContext(object):
-    """Base abstract execution context class."""
+    """Base abstract execution context class.
+
+    Background functions, e.g. backend watchers, should stop once the execution
+    context is shut down, i.e. when :attr:`running` is False, and wait with
+    :meth:`sleep` so that shutting down interrupts them.
+    """
+
+    _shutdown = False
+    # Event set on shutdown, created on first use so that subclasses don't need to
+    # call ``__init__``.
+    _stopped = None
 
     @abc.abstractmethod
     def run(self, func, *args, **kwargs):
         pass
 
+    @property
+    def running(self):
+        """False once :meth:`shutdown` was called."""
+        return not self._shutdown
+
+    def shutdown(self):
+        """Ask background functions to stop.
+
+        Watchers blocked on a backend request stop when the request returns. All the
+        backends sharing the execution context are stopped, backends create their own
+        execution context when none is given.
+        """
+        self._shutdown = True
+        self._get_stopped().set()
+
+    def sleep(self, seconds):
+        """Wait ``seconds``, or less if the execution context is shut down meanwhile.
+
+        :return: False if the execution context was shut down.
+        """
+        self._get_stopped().wait(seconds)
+        return self.running
+
+    def _get_stopped(self):
+        stopped = self._stopped
+        if stopped is None:
+            with _STOPPED_LOCK:
+                if self._stopped is None:
+                    stopped = threading.Event()
+                    if self._shutdown:
+                        stopped.set()
+                    self._stopped = stopped
+                stopped = self._stopped
+        return stopped
+
 
 class GeventExecutionContext(ExecutionContext):
     """Execution context that run background function as a Greenlet.
@@ -35,3 +88,187 @@ class ThreadingExecutionContext(ExecutionContext):
         thread = threading.Thread(target=func, args=args, kwargs=kwargs)
         thread.daemon = True
         thread.start()
+
+
+class AsyncioExecutionContext(ExecutionContext):
+    """Execution context that run background coroutine functions as asyncio tasks.
+
+    Regular functions are run in the event loop default executor. Tasks
+    are cancelled when the execution context is shut down.
+
+    :param loop: asyncio event loop, default: ``asyncio.get_event_loop()``.
+    """
+
+    def __init__(self, loop=None):
+        self._loop = loop
+        self._tasks = set()
+
+    @property
+    def loop(self):
+        """Event loop running the tasks."""
+        if self._loop is None:
+            import asyncio
+
+            self._loop = asyncio.get_event_loop()
+        return self._loop
+
+    def run(self, func, *args, **kwargs):
+        """Run given function as an asyncio task, can be called from any thread."""
+        self.loop.call_soon_threadsafe(self._start, func, args, kwargs)
+
+    def _start(self, func, args, kwargs):
+        import asyncio
+
+        if asyncio.iscoroutinefunction(func):
+            task = self.loop.create_task(func(*args, **kwargs))
+        else:
+            task = self.loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def shutdown(self):
+        """Ask background functions to stop and cancel running tasks."""
+        super(AsyncioExecutionContext, self).shutdown()
+        for task in list(self._tasks):
+            self.loop.call_soon_threadsafe(task.cancel)
+
+
+class _PoolExecutionContext(ExecutionContext):
+    """Base class of execution contexts running functions in a bounded pool of workers.
+
+    Workers are started on demand up to ``max_workers`` and reused once the function
+    they run returns. Backend watchers only return once the execution context is shut
+    down, so a function waiting for a busy worker could wait forever: when all workers
+    are busy, :meth:`run` raises instead of queueing the function. Use prefix or directory
+    watching of backends to watch many keys with a few workers.
+
+    :param max_workers: Maximum number of workers.
+    :param logger: :class:`logging.Logger`` instance.
+    """
+
+    def __init__(self, max_workers, logger=LOGGER):
+        if max_workers < 1:
+            raise ValueError('max_workers must be greater than 0, got %r' % max_workers)
+        self._max_workers = max_workers
+        self._logger = logger
+        self._queue = self._make_queue()
+        self._workers = 0
+        # Functions submitted and not yet done, running or handed to a worker.
+        self._outstanding = 0
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _make_queue(self):
+        pass
+
+    @abc.abstractmethod
+    def _spawn(self, func):
+        pass
+
+    @property
+    def max_workers(self):
+        """Maximum number of workers."""
+        return self._max_workers
+
+    @property
+    def workers(self):
+        """Number of started workers."""
+        return self._workers
+
+    @property
+    def pending(self):
+        """Number of functions handed to a worker and not started yet."""
+        return self._queue.qsize()
+
+    @property
+    def saturated(self):
+        """True when all workers are busy, new functions will be rejected."""
+        return self._outstanding >= self._max_workers
+
+    def run(self, func, *args, **kwargs):
+        """Run given function in an idle worker of the pool, started if needed.
+
+        :raise RuntimeError: If all workers are busy or the execution context was shut down.
+        """
+        if not self.running:
+            raise RuntimeError('Execution context was shut down')
+        with self._lock:
+            if self._outstanding >= self._max_workers:
+                self._logger.error('Execution context saturated, %d workers busy', self._max_workers)
+                raise RuntimeError('Execution context saturated, all %d workers are busy' % self._max_workers)
+            spawn = self._outstanding >= self._workers
+            self._outstanding += 1
+            if spawn:
+                self._workers += 1
+        if spawn:
+            try:
+                self._spawn(self._work)
+            except Exception:
+                with self._lock:
+                    self._outstanding -= 1
+                    self._workers -= 1
+                raise
+        self._queue.put((func, args, kwargs))
+
+    def shutdown(self):
+        """Ask background functions to stop and stop workers once they are done."""
+        super(_PoolExecutionContext, self).shutdown()
+        for _ in range(self._workers):
+            self._queue.put(None)
+
+    def _work(self):
+        while self.running:
+            item = self._queue.get()
+            if item is None:
+                break
+            func, args, kwargs = item
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                self._logger.exception('Exception raised by %r', func)
+            finally:
+                with self._lock:
+                    self._outstanding -= 1
+
+
+class ThreadPoolExecutionContext(_PoolExecutionContext):
+    """Execution context that run background functions in a bounded pool of daemon OS threads.
+
+    :param max_workers: Maximum number of threads, default: 32.
+    :param logger: :class:`logging.Logger`` instance.
+    """
+
+    def __init__(self, max_workers=32, **kwargs):
+        super(ThreadPoolExecutionContext, self).__init__(max_workers, **kwargs)
+
+    def _make_queue(self):
+        return queue.Queue()
+
+    def _spawn(self, func):
+        thread = threading.Thread(target=func)
+        thread.daemon = True
+        thread.start()
+
+
+class GeventPoolExecutionContext(_PoolExecutionContext):
+    """Execution context that run background functions in a bounded pool of Greenlets.
+
+    gevent monkey patching must be done by user.
+
+    :param max_workers: Maximum number of greenlets, default: 1000.
+    :param logger: :class:`logging.Logger`` instance.
+    """
+
+    def __init__(self, max_workers=1000, **kwargs):
+        super(GeventPoolExecutionContext, self).__init__(max_workers, **kwargs)
+
+    def _make_queue(self):
+        import gevent.queue
+
+        return gevent.queue.Queue()
+
+    def _spawn(self, func):
+        import gevent
+
+        gevent.spawn(func)
+        gevent.sleep()
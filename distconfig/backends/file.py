@@ -0,0 +1,283 @@
+"""Backend reading configs from files of a local directory.
+
+Changes are watched using Linux inotify through :mod:`ctypes`, on other platforms
+watched files are polled.
+"""
+import collections
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+
+from distconfig import instrumentation
+from distconfig.backends.base import BaseBackend
+
+
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_CLOSE_WRITE = 0x00000008
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_ONLYDIR = 0x01000000
+
+# Files are only read once closed after writing or moved in place, never while
+# being written. Creation of files is ignored for the same reason, except for
+# directories and symlinks which are complete when created.
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_MOVED_FROM | _IN_CREATE | _IN_DELETE
+_WATCH_MASK |= _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+_GONE_MASK = _IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF
+
+# wd, mask, cookie, name length.
+_EVENT = struct.Struct('iIII')
+
+_fsencode = getattr(os, 'fsencode', lambda name: name)
+_fsdecode = getattr(os, 'fsdecode', lambda name: name)
+
+
+class _Inotify(object):
+    """Minimal binding of Linux inotify.
+
+    :raises OSError: if inotify isn't available.
+    """
+
+    def __init__(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            init, self._add_watch, self._rm_watch = libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+        except (OSError, AttributeError):
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self.fd = init(os.O_NONBLOCK | getattr(os, 'O_CLOEXEC', 0))
+        if self.fd < 0:
+            self._raise_errno()
+
+    def _raise_errno(self, filename=None):
+        code = ctypes.get_errno()
+        raise OSError(code, os.strerror(code), filename)
+
+    def add_watch(self, directory, mask):
+        """Watch directory and return the watch descriptor."""
+        wd = self._add_watch(self.fd, _fsencode(directory), mask)
+        if wd < 0:
+            self._raise_errno(directory)
+        return wd
+
+    def rm_watch(self, wd):
+        self._rm_watch(self.fd, wd)
+
+    def read(self, timeout):
+        """Wait up to ``timeout`` seconds for events.
+
+        :return: List of ``(wd, mask, name)`` tuples.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except OSError as ex:
+            if ex.errno == errno.EAGAIN:
+                return []
+            raise
+        events, offset = [], 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = _fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileBackend(BaseBackend):
+    """Backend reading configs from files under a local directory.
+
+    A config path is the path of a file relative to ``directory``, e.g. ``/service/config``
+    is read from ``<directory>/service/config``, a missing file is the same as a missing
+    key.
+
+    Each directory holding a watched file is watched with inotify, files are read once
+    closed after writing or moved in place so that partially written files are never
+    read. Files replaced by swapping a symlink, like the ``..data`` symlink of Kubernetes
+    ConfigMap volumes, are notified once the symlink is swapped. Missing files are watched
+    through their closest existing parent directory. When inotify isn't available,
+    watched files are read every ``poll_interval`` seconds instead.
+
+    Files are watched until :meth:`close` is called or the execution context is
+    shut down, the inotify instance is then closed.
+
+    :param directory: Directory holding config files.
+    :param execution_context: Instance of :class:`distconfig.backends.execution_context.ExecutionContext`
+        used to watch files.
+    :param poll_interval: Seconds between reads of watched files when inotify isn't
+        available, default: 1.
+
+    """
+
+    #: Seconds to wait for file events before checking if the execution context is still running.
+    watch_timeout = 1
+
+    def __init__(self, directory, execution_context=None, poll_interval=1, **kwargs):
+        super(FileBackend, self).__init__(execution_context=execution_context, **kwargs)
+        self._directory = os.path.abspath(directory)
+        self._poll_interval = poll_interval
+        self._watching = set()
+        self._lock = threading.Lock()
+        # Watched paths by directory, directory by watch descriptor and the reverse.
+        self._directory_paths = collections.defaultdict(set)
+        self._wd_directories = {}
+        self._directory_wds = {}
+        self._inotify = None
+        self._closed = threading.Event()
+
+    def close(self):
+        """Stop watching files, they can still be read but listeners are not notified anymore.
+
+        The inotify instance is closed by the watcher once it stops, within
+        :attr:`watch_timeout` seconds.
+        """
+        self._closed.set()
+
+    def get_raw(self, path):
+        filename = self._filename(path)
+        self._add_watcher(path)
+        return self._read(filename)
+
+    def get_raw_many(self, paths):
+        """Get values of many paths, local files are read one after the other."""
+        return dict((path, self.get_raw(path)) for path in paths)
+
+    def _filename(self, path):
+        filename = os.path.normpath(os.path.join(self._directory, path.lstrip('/')))
+        if not filename.startswith(self._directory + os.sep):
+            raise ValueError('Path %r is outside of directory %r' % (path, self._directory))
+        return filename
+
+    def _read(self, filename):
+        try:
+            with open(filename, 'rb') as f:
+                return f.read()
+        except (IOError, OSError) as ex:
+            if ex.errno in (errno.ENOENT, errno.ENOTDIR, errno.EISDIR):
+                return None
+            raise
+
+    def _add_watcher(self, path):
+        with self._lock:
+            if path in self._watching or self._closed.is_set():
+                return
+            if not self._watching:
+                self._start_watcher()
+            # Only once watched, the next read tries again if the watcher failed to start.
+            self._watching.add(path)
+            if self._inotify is not None:
+                self._watch_directory_of(path)
+
+    def _start_watcher(self):
+        """Start watching files with inotify, else polling them, must be called with the lock held."""
+        try:
+            inotify = _Inotify()
+        except OSError as ex:
+            self._logger.warning('Polling files of %r every %s seconds, inotify failed: %s',
+                                 self._directory, self._poll_interval, ex)
+            self._execution_context.run(self._poll_for_changes)
+            return
+        self._inotify = inotify
+        try:
+            self._execution_context.run(self._watch_for_changes)
+        except Exception:
+            self._inotify = None
+            inotify.close()
+            raise
+
+    def _watch_directory_of(self, path):
+        """Watch the closest existing directory of the file of ``path``, must be called
+        with the lock held."""
+        directory = os.path.dirname(self._filename(path))
+        while directory != self._directory and not os.path.isdir(directory):
+            directory = os.path.dirname(directory)
+        if path in self._directory_paths.get(directory, ()) and directory in self._directory_wds:
+            return
+        for other, paths in list(self._directory_paths.items()):
+            if path in paths and other != directory:
+                paths.discard(path)
+                if not paths:
+                    self._unwatch_directory(other)
+        if directory not in self._directory_wds:
+            try:
+                wd = self._inotify.add_watch(directory, _WATCH_MASK)
+            except OSError as ex:
+                self._logger.error('Can not watch directory %r: %s', directory, ex)
+                return
+            self._wd_directories[wd] = directory
+            self._directory_wds[directory] = wd
+        self._directory_paths[directory].add(path)
+
+    def _unwatch_directory(self, directory):
+        del self._directory_paths[directory]
+        wd = self._directory_wds.pop(directory, None)
+        if wd is not None:
+            del self._wd_directories[wd]
+            self._inotify.rm_watch(wd)
+
+    def _watch_for_changes(self):
+        try:
+            while self._execution_context.running and not self._closed.is_set():
+                try:
+                    events = self._inotify.read(self.watch_timeout)
+                except Exception as ex:
+                    delay = self._reconnect_policy.failure(self._directory)
+                    self._logger.error('exception raised while watching files of %r (retrying in %.2fs): %s',
+                                       self._directory, delay, ex)
+                    instrumentation.get_instrumentation().watch_error(self._directory, ex)
+                    self._execution_context.sleep(delay)
+                else:
+                    self._reconnect_policy.success(self._directory)
+                    if events:
+                        self._on_events(events)
+        finally:
+            with self._lock:
+                inotify, self._inotify = self._inotify, None
+            inotify.close()
+
+    def _on_events(self, events):
+        paths = set()
+        with self._lock:
+            for wd, mask, name in events:
+                directory = self._wd_directories.get(wd)
+                if directory is None:
+                    continue
+                if mask & _IN_CREATE and not mask & _IN_ISDIR and not os.path.islink(os.path.join(directory, name)):
+                    continue
+                if mask & _GONE_MASK:
+                    # Directory removed or replaced, its paths are watched again below.
+                    del self._wd_directories[wd]
+                    del self._directory_wds[directory]
+                paths.update(self._directory_paths.get(directory, ()))
+            # Paths may now be watched from another directory, e.g. their
+            # directory was created or removed.
+            for path in paths:
+                self._watch_directory_of(path)
+        self._notify_changes(sorted(paths))
+
+    def _poll_for_changes(self):
+        while self._execution_context.sleep(self._poll_interval) and not self._closed.is_set():
+            with self._lock:
+                paths = sorted(self._watching)
+            self._notify_changes(paths)
+
+    def _notify_changes(self, paths):
+        for path in paths:
+            try:
+                self._notify_listeners(self._read(self._filename(path)), path)
+            except Exception:
+                pass  # Already logged, keep notifying the other paths.
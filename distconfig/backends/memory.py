@@ -0,0 +1,126 @@
+import random
+import threading
+import time
+
+import six
+
+from distconfig.backends.base import BaseBackend
+
+
+class MemoryBackend(BaseBackend):
+    """In-process backend holding raw values in memory.
+
+    Meant for tests, load tests and benchmarks that shouldn't depend on an external
+    service. Every write gets a new version from a backend wide index, like Consul
+    ``ModifyIndex`` or etcd ``modifiedIndex``, and listeners are notified from the
+    execution context of the value at the time of the notification, as a watch would.
+
+    Latency injection delays reads and watch notifications by ``latency`` plus a random
+    number of seconds between 0 and ``jitter``, a read of many paths is delayed once
+    as a single round trip. Writes are not delayed.
+
+    Example:
+
+        >>> from distconfig import Proxy
+        >>> backend = MemoryBackend({'/service/config': '{"key": "value"}'})
+        >>> Proxy(backend).get_config('/service/config')['key']
+        'value'
+
+    :param data: Optional mapping of path to initial raw value, default: None.
+    :param latency: Seconds to delay reads and notifications by, default: 0.
+    :param jitter: Maximum random seconds to add to ``latency``, default: 0.
+    :param seed: Optional seed of the jitter random generator to make runs reproducible.
+    :param execution_context: Instance of :class:`distconfig.backends.execution_context.ExecutionContext`
+        used to notify listeners.
+
+    """
+
+    def __init__(self, data=None, latency=0, jitter=0, seed=None,
+                 execution_context=None, **kwargs):
+        super(MemoryBackend, self).__init__(execution_context=execution_context, **kwargs)
+        self._latency = latency
+        self._jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._index = 0
+        # (raw value, version) by path.
+        self._values = {}
+        for path, value in six.iteritems(data or {}):
+            self._index += 1
+            self._values[path] = (value, self._index)
+
+    @property
+    def index(self):
+        """Version of the latest write."""
+        return self._index
+
+    def version(self, path):
+        """Return version of the last write of ``path``, None if it doesn't exist."""
+        with self._lock:
+            _, version = self._values.get(path, (None, None))
+        return version
+
+    def get_raw(self, path):
+        self._delay()
+        with self._lock:
+            value, _ = self._values.get(path, (None, None))
+        return value
+
+    def get_raw_many(self, paths):
+        """Get values of many paths in one round trip."""
+        self._delay()
+        with self._lock:
+            return dict((path, self._values.get(path, (None, None))[0]) for path in paths)
+
+    def set(self, path, value):
+        """Write raw ``value`` of ``path`` and notify listeners.
+
+        :return: the version of the write.
+        """
+        return self.update({path: value})
+
+    def update(self, values):
+        """Write many raw values at once, all of them get the same version.
+
+        :param values: Mapping of path to raw value.
+        :return: the version of the write.
+        """
+        with self._lock:
+            self._index += 1
+            version = self._index
+            for path, value in six.iteritems(values):
+                self._values[path] = (value, version)
+        self._execution_context.run(self._watch_notify, list(values))
+        return version
+
+    def delete(self, path):
+        """Delete ``path`` and notify listeners.
+
+        :return: the version of the delete.
+        :raises KeyError: if path doesn't exist.
+        """
+        with self._lock:
+            del self._values[path]
+            self._index += 1
+            version = self._index
+        self._execution_context.run(self._watch_notify, [path])
+        return version
+
+    def _delay(self):
+        delay = self._latency
+        if self._jitter:
+            delay += self._random.uniform(0, self._jitter)
+        if delay:
+            time.sleep(delay)
+
+    def _watch_notify(self, paths):
+        self._delay()
+        # Like a watch, notify the value at the time the notification is
+        # delivered, a newer value already notified is skipped by version.
+        with self._lock:
+            values = [(path,) + self._values.get(path, (None, self._index)) for path in paths]
+        for path, value, version in values:
+            try:
+                self._notify_listeners(value, path, version)
+            except Exception:
+                pass  # Already logged, keep notifying the other paths.
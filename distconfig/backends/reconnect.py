@@ -0,0 +1,93 @@
+"""Reconnect policy of backend watchers."""
+import random
+import threading
+import time
+
+
+class ReconnectPolicy(object):
+    """Exponential backoff with jitter between reconnects of failed watchers, and
+    circuit breaker state shared by the watchers of a backend.
+
+    Each watcher waits ``initial_delay * multiplier ** (failures - 1)`` seconds, capped to
+    ``max_delay``, after its consecutive failures, minus a random part of up to ``jitter``
+    of the delay so that watchers don't reconnect all at once. A successful request of a
+    watcher resets its delay.
+
+    The circuit opens once ``failure_threshold`` requests failed in a row across all
+    watchers, and closes on the next successful request. While open, :attr:`state` is
+    ``'open'``, other components can check it e.g. to report the backend as unhealthy.
+
+    :param initial_delay: Seconds to wait after the first failure, default: 0.1.
+    :param max_delay: Maximum seconds to wait, default: 30.
+    :param multiplier: Factor applied to the delay after each failure, default: 2.
+    :param jitter: Fraction of the delay that is randomized, between 0 and 1, default: 0.5.
+    :param failure_threshold: Number of failures in a row that opens the circuit, default: 5.
+    :param seed: Optional seed of the jitter random generator.
+
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+
+    def __init__(self, initial_delay=0.1, max_delay=30, multiplier=2, jitter=0.5,
+                 failure_threshold=5, seed=None):
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._multiplier = multiplier
+        self._jitter = jitter
+        self._failure_threshold = failure_threshold
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # Consecutive failures by watched path.
+        self._attempts = {}
+        self._failures = 0
+        self._opened_at = None
+
+    @property
+    def state(self):
+        """``'open'`` if the circuit is open, else ``'closed'``."""
+        return self.OPEN if self._opened_at is not None else self.CLOSED
+
+    @property
+    def is_open(self):
+        """True if the circuit is open."""
+        return self._opened_at is not None
+
+    @property
+    def opened_at(self):
+        """Time at which the circuit opened, None if closed."""
+        return self._opened_at
+
+    @property
+    def failures(self):
+        """Number of failures in a row across all watchers."""
+        return self._failures
+
+    def delay(self, attempt):
+        """Return seconds to wait after ``attempt`` consecutive failures."""
+        delay = min(self._max_delay, self._initial_delay * self._multiplier ** (attempt - 1))
+        if self._jitter:
+            delay -= self._random.uniform(0, delay * self._jitter)
+        return delay
+
+    def failure(self, path):
+        """Record a failed request of the watcher of ``path``.
+
+        :return: seconds to wait before reconnecting.
+        """
+        with self._lock:
+            attempt = self._attempts.get(path, 0) + 1
+            self._attempts[path] = attempt
+            self._failures += 1
+            if self._failures >= self._failure_threshold and self._opened_at is None:
+                self._opened_at = time.time()
+            return self.delay(attempt)
+
+    def success(self, path):
+        """Record a successful request of the watcher of ``path``."""
+        if not self._failures and path not in self._attempts:
+            return  # Fast path, nothing failed.
+        with self._lock:
+            self._attempts.pop(path, None)
+            self._failures = 0
+            self._opened_at = None
@@ -0,0 +1,291 @@
+"""Share backend values between the processes of a host through memory-mapped files.
+
+One process owns the backend watchers and publishes raw values with a
+:class:`SharedSnapshotStore` given as the ``snapshot`` of its backend, other
+processes, e.g. the workers of a pre-fork server, read them with a
+:class:`SharedMemoryBackend`::
+
+    # Publisher process.
+    store = SharedSnapshotStore('/run/distconfig')
+    proxy = Proxy(ConsulBackend(client, snapshot=store))
+    proxy.get_configs(paths)  # Publish and watch paths.
+
+    # Worker processes.
+    proxy = Proxy(SharedMemoryBackend('/run/distconfig'))
+
+The directory holds two files: ``data``, all values serialized with their version,
+replaced atomically on each change, and ``generation``, a counter incremented after
+each replacement. Workers map ``data`` in memory, so raw values are shared by the
+page cache, and check the counter to pick up new versions. Parsed values can't be
+shared between processes, each worker parses the values it reads.
+"""
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+import six
+
+from distconfig.backends.base import BaseBackend
+from distconfig.backends.snapshot import _decode, _encode, _replace
+
+
+# magic, generation, number of entries.
+_DATA_HEADER = struct.Struct('>4sQI')
+_DATA_MAGIC = b'DCM1'
+# path length, value type, has version, version, value length.
+_ENTRY = struct.Struct('>IBBQI')
+# magic, padding, generation.
+_GENERATION = struct.Struct('>4s4xQ')
+_GENERATION_MAGIC = b'DCG1'
+
+_DATA, _GENERATION_FILE = 'data', 'generation'
+
+
+def _read_generation(mapped):
+    magic, generation = _GENERATION.unpack_from(mapped)
+    return generation if magic == _GENERATION_MAGIC else None
+
+
+def _load_entries(mapped):
+    """Parse entries of a mapped data file.
+
+    :return: Tuple of generation and dictionary of ``(value, version)`` by path, where
+        value is a tuple of value type, offset and length in ``mapped``.
+    :raises ValueError: if the file is invalid.
+    """
+    if len(mapped) < _DATA_HEADER.size:
+        raise ValueError('Truncated data file')
+    magic, generation, count = _DATA_HEADER.unpack_from(mapped)
+    if magic != _DATA_MAGIC:
+        raise ValueError('Invalid data file')
+    entries, offset = {}, _DATA_HEADER.size
+    for _ in range(count):
+        path_length, value_type, has_version, version, value_length = _ENTRY.unpack_from(mapped, offset)
+        offset += _ENTRY.size
+        path = mapped[offset:offset + path_length].decode('utf8')
+        offset += path_length
+        entries[path] = ((value_type, offset, value_length), version if has_version else None)
+        offset += value_length
+    if offset != len(mapped):
+        raise ValueError('Truncated data file')
+    return generation, entries
+
+
+class SharedSnapshotStore(object):
+    """Snapshot store publishing backend values to :class:`SharedMemoryBackend` readers.
+
+    Give it as the ``snapshot`` of the backend of the publisher process, every value
+    read or changed is then published. Values already published in ``directory`` are
+    loaded when created, so a restarted publisher starts from them. All values are
+    written again on each change, values read or reconciled together are published
+    with one write.
+
+    :param directory: Directory shared with readers, created if missing.
+
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generation = 0
+        self._generation_map = self._open_generation()
+        try:
+            with open(os.path.join(directory, _DATA), 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            return
+        try:
+            _, entries = _load_entries(mapped)
+            for path, ((value_type, offset, length), version) in six.iteritems(entries):
+                self._entries[path] = (_decode(value_type, mapped[offset:offset + length]), version)
+        except (ValueError, struct.error):
+            self._entries = {}
+        finally:
+            mapped.close()
+
+    def _open_generation(self):
+        filename = os.path.join(self._directory, _GENERATION_FILE)
+        fd = os.open(filename, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _GENERATION.size:
+                os.ftruncate(fd, _GENERATION.size)
+            mapped = mmap.mmap(fd, _GENERATION.size)
+        finally:
+            os.close(fd)
+        # Keep counting from the last publisher so readers never see an older generation.
+        self._generation = _read_generation(mapped) or 0
+        return mapped
+
+    def load(self, path):
+        """Load published value of path.
+
+        :return: Tuple of raw value and version, version is None if unknown.
+        :raises KeyError: If path wasn't published.
+        """
+        return self._entries[path]
+
+    def save(self, path, value, version=None):
+        """Publish value of path, nothing is written if it's already published."""
+        with self._lock:
+            if self._entries.get(path) == (value, version):
+                return
+            self._entries[path] = (value, version)
+            self._publish()
+
+    def save_many(self, values, versions=None):
+        """Publish values of many paths at once, with a single write of the data file.
+
+        Nothing is written if all values are already published.
+
+        :param values: Dictionary of raw value by path.
+        :param versions: Optional dictionary of version by path.
+        """
+        versions = versions or {}
+        with self._lock:
+            changed = False
+            for path, value in six.iteritems(values):
+                entry = (value, versions.get(path))
+                if self._entries.get(path) != entry:
+                    self._entries[path] = entry
+                    changed = True
+            if changed:
+                self._publish()
+
+    def delete(self, path):
+        """Stop publishing path."""
+        with self._lock:
+            if self._entries.pop(path, None) is not None:
+                self._publish()
+
+    def _publish(self):
+        self._generation += 1
+        chunks = [_DATA_HEADER.pack(_DATA_MAGIC, self._generation, len(self._entries))]
+        for path, (value, version) in six.iteritems(self._entries):
+            encoded_path = path.encode('utf8')
+            value_type, data = _encode(value)
+            chunks.append(_ENTRY.pack(len(encoded_path), value_type, version is not None, version or 0, len(data)))
+            chunks.append(encoded_path)
+            chunks.append(data)
+        # Not synced to disk, readers share the page cache and values are
+        # published again by the next publisher anyway.
+        fd, tmp = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(b''.join(chunks))
+            os.chmod(tmp, 0o644)
+            _replace(tmp, os.path.join(self._directory, _DATA))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        _GENERATION.pack_into(self._generation_map, 0, _GENERATION_MAGIC, self._generation)
+
+
+class SharedMemoryBackend(BaseBackend):
+    """Backend reading values published by a :class:`SharedSnapshotStore` of another process.
+
+    Reads are served from the memory-mapped data file, the generation counter is checked
+    on each read and every ``poll_interval`` seconds by a watcher which notifies listeners
+    of watched paths which version changed. Paths not published yet are missing.
+
+    :param directory: Directory of the :class:`SharedSnapshotStore`.
+    :param execution_context: Instance of :class:`distconfig.backends.execution_context.ExecutionContext`
+        used to watch the generation counter.
+    :param poll_interval: Seconds between checks of the generation counter, default: 0.1.
+
+    """
+
+    def __init__(self, directory, execution_context=None, poll_interval=0.1, **kwargs):
+        super(SharedMemoryBackend, self).__init__(execution_context=execution_context, **kwargs)
+        self._directory = directory
+        self._poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._watching = set()
+        self._generation_map = None
+        # Tuple of generation, mapped data and entries, replaced as a whole.
+        self._current = (None, None, {})
+
+    def get_raw(self, path):
+        self._add_watcher(path)
+        return self._read(self._refresh(), path)
+
+    def get_raw_many(self, paths):
+        """Get values of many paths from the same generation."""
+        current = self._refresh()
+        values = {}
+        for path in paths:
+            self._add_watcher(path)
+            values[path] = self._read(current, path)
+        return values
+
+    def _read(self, current, path, with_version=False):
+        _, mapped, entries = current
+        try:
+            (value_type, offset, length), version = entries[path]
+        except KeyError:
+            value, version = None, None
+        else:
+            value = _decode(value_type, mapped[offset:offset + length])
+        return (value, version) if with_version else value
+
+    def _generation(self):
+        if self._generation_map is None:
+            try:
+                with open(os.path.join(self._directory, _GENERATION_FILE), 'rb') as f:
+                    self._generation_map = mmap.mmap(f.fileno(), _GENERATION.size, access=mmap.ACCESS_READ)
+            except (IOError, OSError, ValueError):
+                return None  # Nothing published yet.
+        return _read_generation(self._generation_map)
+
+    def _refresh(self):
+        """Map the latest data file if the generation changed.
+
+        :return: Tuple of generation, mapped data and entries.
+        """
+        current = self._current
+        generation = self._generation()
+        if generation is None or generation == current[0]:
+            return current
+        with self._lock:
+            current = self._current
+            if generation == current[0]:
+                return current
+            try:
+                with open(os.path.join(self._directory, _DATA), 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                data_generation, entries = _load_entries(mapped)
+            except (IOError, OSError, ValueError, struct.error) as ex:
+                self._logger.error('exception raised while reading shared values of %r: %s', self._directory, ex)
+                return current
+            # The previous mapping isn't closed, concurrent readers may still use it.
+            self._current = current = (data_generation, mapped, entries)
+        return current
+
+    def _add_watcher(self, path):
+        with self._lock:
+            if path in self._watching:
+                return
+            if not self._watching:
+                self._execution_context.run(self._watch_for_changes)
+            # Only once watched, the next read tries again if the watcher failed to start.
+            self._watching.add(path)
+
+    def _watch_for_changes(self):
+        generation = self._current[0]
+        while self._execution_context.sleep(self._poll_interval):
+            current = self._refresh()
+            if current[0] == generation:
+                continue
+            generation = current[0]
+            with self._lock:
+                paths = sorted(self._watching)
+            for path in paths:
+                value, version = self._read(current, path, with_version=True)
+                try:
+                    self._notify_listeners(value, path, version)
+                except Exception:
+                    pass  # Already logged, keep notifying the other paths.
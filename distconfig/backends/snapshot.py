@@ -0,0 +1,107 @@
+"""Local on-disk snapshots of backend values, used to start without waiting for the backend."""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+
+import six
+
+
+# magic, value type, has version, version, value length.
+_HEADER = struct.Struct('>4sBBQI')
+_MAGIC = b'DCS1'
+
+_NONE, _BYTES, _TEXT = 0, 1, 2
+
+
+def _encode(value):
+    if value is None:
+        return _NONE, b''
+    if isinstance(value, six.text_type):
+        return _TEXT, value.encode('utf8')
+    return _BYTES, bytes(value)
+
+
+def _decode(value_type, data):
+    if value_type == _NONE:
+        return None
+    if value_type == _TEXT:
+        return data.decode('utf8')
+    return data
+
+
+class SnapshotStore(object):
+    """Store the last raw value and version of backend paths in a local directory.
+
+    Each path is saved in its own file which is replaced atomically on update, files
+    are read using memory-mapped I/O. When given to a backend, ``get`` returns the
+    snapshot value right away and reconcile it with the backend in background.
+
+    :param directory: Directory where snapshots are saved, created if missing.
+
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _filename(self, path):
+        name = hashlib.sha1(path.encode('utf8') if isinstance(path, six.text_type) else path).hexdigest()
+        return os.path.join(self._directory, name + '.snapshot')
+
+    def load(self, path):
+        """Load snapshot of path.
+
+        :param path: key in the backend.
+        :return: Tuple of raw value and version, version is None if unknown.
+        :raises KeyError: If there is no valid snapshot of path.
+        """
+        try:
+            with open(self._filename(path), 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < _HEADER.size:
+                    raise KeyError(path)
+                mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        except (IOError, OSError):
+            raise KeyError(path)
+        try:
+            magic, value_type, has_version, version, length = _HEADER.unpack_from(mapped)
+            if magic != _MAGIC or _HEADER.size + length != size:
+                raise KeyError(path)
+            value = _decode(value_type, mapped[_HEADER.size:size])
+        finally:
+            mapped.close()
+        return value, version if has_version else None
+
+    def save(self, path, value, version=None):
+        """Save snapshot of path atomically.
+
+        :param path: key in the backend.
+        :param value: raw value as returned by the backend.
+        :param version: Optional integer version of the value e.g. backend modify index.
+        """
+        value_type, data = _encode(value)
+        header = _HEADER.pack(_MAGIC, value_type, version is not None, version or 0, len(data))
+        fd, tmp = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            _replace(tmp, self._filename(path))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def delete(self, path):
+        """Delete snapshot of path if any."""
+        try:
+            os.unlink(self._filename(path))
+        except OSError:
+            pass
+
+
+_replace = getattr(os, 'replace', os.rename)
@@ -28,6 +28,17 @@ class ZooKeeperBackend(BaseBackend):
         except NoNodeError:
             return self._get_and_watch_unexistant_path(path)
 
+    def get_raw_many(self, paths):
+        """Get values of many paths, requests are pipelined in the ZooKeeper session."""
+        requests = [(path, self._client.get_async(path, watch=partial(self._on_path_change, path))) for path in paths]
+        values = {}
+        for path, request in requests:
+            try:
+                values[path], _ = request.get()
+            except NoNodeError:
+                values[path] = self._get_and_watch_unexistant_path(path)
+        return values
+
     def _get_and_watch_unexistant_path(self, path):
         self._client.retry(self._client.exists, path, watch=partial(self._on_path_change, path))
 
@@ -44,4 +55,4 @@ class ZooKeeperBackend(BaseBackend):
             data = self._get_and_watch_unexistant_path(path)
         else:
             data = self._get_and_watch_path(path)
-        return super(ZooKeeperBackend, self)._notify_listeners(data)
+        return super(ZooKeeperBackend, self)._notify_listeners(data, path)
@@ -1,10 +1,17 @@
 import collections
 import functools
+import logging
 import re
+import sys
+import threading
 import weakref
 
 import six
 
+from distconfig import instrumentation
+
+
+LOGGER = logging.getLogger(__name__)
 
 UNDEFINED = object()
 
@@ -28,6 +35,248 @@ def _split_path(path, _regex=re.compile(r'(?<!\\)/')):
     return list(map(functools.partial(re.sub, r'\\/', '/'), _regex.split(path)))
 
 
+class _PathCache(object):
+    """Bounded thread-safe memo of compiled path expressions.
+
+    Compiled paths are tuples of keys as returned by :func:`_split_path`, the
+    cache is shared by all :class:`Config` instances and is cleared when it
+    reach ``maxsize`` entries, since path expressions used by an application
+    are usually a small fixed set.
+
+    Example:
+
+        >>> cache = _PathCache(maxsize=2)
+        >>> cache.get('a/b\\/c')
+        ('a', 'b/c')
+        >>> cache.get('a/b\\/c') is cache.get('a/b\\/c')
+        True
+
+    """
+
+    def __init__(self, maxsize=1024):
+        self._maxsize = maxsize
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, path):
+        try:
+            return self._cache[path]
+        except KeyError:
+            pass
+        keys = tuple(_split_path(path))
+        with self._lock:
+            if len(self._cache) >= self._maxsize:
+                self._cache.clear()
+            self._cache[path] = keys
+        return keys
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_PATH_CACHE = _PathCache()
+
+
+def _build_index(data):
+    """Return a flat mapping of every compiled path in ``data`` to its value.
+
+    Example:
+
+        >>> sorted(_build_index({'a': {'b': 1}, 'c': 2}).items())
+        [(('a',), {'b': 1}), (('a', 'b'), 1), (('c',), 2)]
+
+    """
+    index = {}
+    stack = [((), data)]
+    while stack:
+        prefix, node = stack.pop()
+        for key, value in six.iteritems(node):
+            keys = prefix + (key,)
+            index[keys] = value
+            if isinstance(value, collections.Mapping):
+                stack.append((keys, value))
+    return index
+
+
+class LazyMapping(collections.Mapping):
+    """Read only mapping that parse its raw data on first access.
+
+    Parsing is done once, if it fails the error is kept and ``fallback`` data is
+    served instead, e.g. the previous data of a config, else the error is raised
+    on each access.
+
+    :param raw: Raw data.
+    :param parser: Callable that accept ``raw`` and return a mapping.
+    :param fallback: Optional mapping served if parsing fails, default: None.
+
+    Example:
+
+        >>> import json
+        >>> data = LazyMapping('{"a": 1}', json.loads)
+        >>> data.loaded
+        False
+        >>> data['a']
+        1
+        >>> data.loaded
+        True
+
+    """
+
+    __slots__ = ('_raw', '_parser', '_fallback', '_data', '_error', '_lock')
+
+    def __init__(self, raw, parser, fallback=None):
+        self._raw = raw
+        self._parser = parser
+        self._fallback = fallback
+        self._data = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        """True if raw data was already parsed, successfully or not."""
+        return self._data is not None or self._error is not None
+
+    @property
+    def error(self):
+        """Exception raised while parsing raw data, None if not parsed yet or parsed successfully."""
+        return self._error
+
+    @property
+    def data(self):
+        """Parsed data, or fallback data if parsing failed.
+
+        :raises TypeError: If parsed data is not a mapping and there is no fallback.
+        :raises Exception: Exception raised by the parser if there is no fallback.
+        """
+        data = self._data
+        if data is None:
+            with self._lock:
+                if not self.loaded:
+                    self._load()
+            data = self._data
+            if data is None:
+                raise self._error
+        return data
+
+    def _load(self):
+        try:
+            data = self._parser(self._raw)
+            if not isinstance(data, collections.Mapping):
+                raise TypeError('Need a mapping-like object, instead got %r' % type(data))
+        except Exception as ex:
+            self._error = ex
+            data = self._fallback
+            if data is not None:
+                LOGGER.error('exception raised while parsing config data, keeping previous data: %s', ex)
+        self._data, self._raw, self._fallback = data, None, None
+
+    def _last_parsed(self):
+        """Return parsed data, or the data served if parsing fails when not parsed yet."""
+        with self._lock:
+            return self._data if self._data is not None else self._fallback
+
+    def _with_fallback(self, fallback):
+        """Return a copy serving ``fallback`` if parsing fails, ``self`` if already parsed."""
+        with self._lock:
+            if self.loaded:
+                return self
+            return LazyMapping(self._raw, self._parser, fallback)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return repr(self.data)
+
+
+def _join_path(keys):
+    """Return path expression of ``keys``, reverse of :func:`_split_path`.
+
+    Example:
+
+        >>> _join_path(('a/b', 'c'))
+        'a\\\\/b/c'
+
+    """
+    return '/'.join(key.replace('/', '\\/') if isinstance(key, six.string_types) else str(key) for key in keys)
+
+
+def _merge(old, new, prefix, changes):
+    """Diff ``old`` and ``new`` data and share their unchanged subtrees.
+
+    :param prefix: Keys of the path being compared.
+    :param changes: Set where keys of changed paths are added.
+    :return: ``new`` where subtrees equal to ``old`` subtrees are replaced by
+        the ``old`` ones, ``old`` itself if nothing changed.
+
+    Example:
+
+        >>> old = {'a': {'b': 1}, 'c': {'d': 2}}
+        >>> changes = set()
+        >>> new = _merge(old, {'a': {'b': 1}, 'c': {'d': 3}}, (), changes)
+        >>> sorted(changes)
+        [('c', 'd')]
+        >>> new['a'] is old['a']
+        True
+
+    """
+    if old is new:
+        return old
+    if isinstance(old, collections.Mapping) and isinstance(new, collections.Mapping):
+        merged = {}
+        same = len(old) == len(new)
+        # False while merged values are the new ones, e.g. new data already shares
+        # the subtrees of old data, then new data is returned as is.
+        rebuilt = False
+        for key, value in six.iteritems(new):
+            if key in old:
+                merged[key] = _merge(old[key], value, prefix + (key,), changes)
+                same = same and merged[key] is old[key]
+                rebuilt = rebuilt or merged[key] is not value
+            else:
+                merged[key] = value
+                changes.add(prefix + (key,))
+                same = False
+        for key in old:
+            if key not in new:
+                changes.add(prefix + (key,))
+        if same:
+            return old
+        # Only plain dicts are rebuilt to share subtrees, other mappings are kept as they are.
+        return merged if rebuilt and type(new) is dict else new
+    if type(old) is type(new) and old == new:
+        return old
+    changes.add(prefix)
+    return new
+
+
+class _Snapshot(object):
+    """Immutable version of config data and its index, replaced as a whole on change.
+
+    Snapshots of inner configs got from pinned configs are cached by path in
+    ``inner``, so that pinned configs of the same version share their index.
+    """
+
+    __slots__ = ('data', 'index', 'version', 'inner')
+
+    def __init__(self, data, index, version):
+        self.data = data
+        self.index = index
+        self.version = version
+        self.inner = {}
+
+
 class Config(collections.Mapping):
     """Read only mapping-like for holding configuration.
 
@@ -36,32 +285,191 @@ class Config(collections.Mapping):
     is type assertion, i.e. When a user call ``Config.get_int`` on a key where
     the value is a string e.g. '2', the call will fail with a ``TypeError``.
 
+    When ``index`` is true, a flat ``path -> value`` index of the whole data is
+    built each time new data is installed, so lookups cost one hash lookup
+    instead of a walk over nested mappings. This trades memory and update time
+    for lookup speed and is only worth it for big configs that are read a lot,
+    use ``benchmarks/bench_config.py`` to measure it.
+
+    When new data is installed, it's compared with the current one: subtrees that
+    didn't change keep their identity, only inner configs which data changed are
+    updated, and listeners added with :meth:`add_listener` are called with the
+    paths that changed. Comparing data is skipped when new data is a
+    :class:`LazyMapping` not parsed yet and nothing needs the changes, i.e. there
+    is no index, no inner config and no listener, so it stays unparsed until read.
+
+    Data and index are held by an immutable snapshot replaced with a single
+    assignment, so a read never sees the data of one version with the index of
+    another and reads don't take locks. Inner configs are updated after their
+    parent, use :meth:`snapshot` to read many values, possibly through inner
+    configs, from the same version.
+
+    :param data: Mapping-like object holding the configuration.
+    :param index: Build a flat path index of ``data``, default: False.
+
     """
 
-    def __init__(self, data):
+    def __init__(self, data, index=False):
         if not isinstance(data, collections.Mapping):
             raise TypeError('Need a mapping-like object, instead got %r' % type(data))
-        self._data = data
+        self._indexed = index
+        self._snapshot = _Snapshot(data, _build_index(data) if index else None, 0)
         self.__inner_configs = weakref.WeakValueDictionary()
+        self.__inner_configs_lock = threading.Lock()
+        self.__listeners = []
+        self.__pinned = False
+        self.__live = None
+
+    @classmethod
+    def _pinned(cls, snapshot, index, live=None):
+        """Return config reading ``snapshot``, never updated.
+
+        :param live: Optional config ``snapshot`` was taken from, snapshots of its
+            inner configs are reused when they read the same data.
+        """
+        config = cls.__new__(cls)
+        config._indexed = index
+        config._snapshot = snapshot
+        config.__inner_configs = weakref.WeakValueDictionary()
+        config.__inner_configs_lock = threading.Lock()
+        config.__listeners = []
+        config.__pinned = True
+        config.__live = live
+        return config
+
+    @property
+    def _data(self):
+        return self._snapshot.data
+
+    @property
+    def _index(self):
+        return self._snapshot.index
+
+    @property
+    def version(self):
+        """Number of changes installed since the config was created."""
+        return self._snapshot.version
+
+    def snapshot(self):
+        """Return a read only config pinned to the current version of the data.
+
+        The returned config, and inner configs got from it, are never updated, e.g.
+        get a snapshot once per request to read consistent values during the whole
+        request. Taking a snapshot doesn't copy the data.
+
+        :return: :class:`Config` instance.
+        """
+        return self._pinned(self._snapshot, self._indexed, self)
 
     def __str__(self):
         return '%s(%r)' % (self.__class__.__name__, self._data)
 
+    def add_listener(self, callback):
+        """Add callback to be called after the config data changed.
+
+        :param callback: Callable that accept one argument, a frozenset of the
+            changed paths e.g. ``frozenset(['key1/key2'])``.
+        """
+        self.__listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Remove previously added callback.
+
+        :param callback: Callable as with ``:meth: add_listener``.
+        :raise ValueError: In case callback was not previously registered.
+        """
+        self.__listeners.remove(callback)
+
     def _invalidate(self, new_data):
-        self._data = new_data
-        for path, inner_config in six.iteritems(self.__inner_configs):
+        """Install new data.
+
+        :param new_data: New mapping-like object holding the configuration.
+        :return: frozenset of the changed paths, None if new data is lazy and
+            wasn't compared.
+        """
+        if isinstance(new_data, LazyMapping):
+            if not (new_data.loaded or self._indexed or self.__listeners):
+                # Checked and installed under the lock so that an inner config
+                # created meanwhile by get_config is never left behind.
+                with self.__inner_configs_lock:
+                    if not self.__inner_configs:
+                        snapshot = self._snapshot
+                        # Keep serving the last parsed data if new data turns out to be malformed.
+                        fallback = snapshot.data
+                        if isinstance(fallback, LazyMapping):
+                            fallback = fallback._last_parsed()
+                        self._snapshot = _Snapshot(new_data._with_fallback(fallback), None, snapshot.version + 1)
+                        return None
+            # Parsing errors are raised before anything is installed, like when
+            # parsing eagerly.
+            new_data = new_data.data
+        snapshot = self._snapshot
+        old_data = snapshot.data
+        if isinstance(old_data, LazyMapping):
+            try:
+                old_data = old_data.data
+            except Exception:
+                old_data = {}  # Never parsed successfully, everything changed.
+        changes = set()
+        new_data = _merge(old_data, new_data, (), changes)
+        if not changes:
+            return frozenset()
+        # The new snapshot is fully built before being installed, so readers see
+        # either the old or the new data and index but never a mix of them.
+        new_snapshot = _Snapshot(new_data, _build_index(new_data) if self._indexed else None, snapshot.version + 1)
+        with self.__inner_configs_lock:
+            self._snapshot = new_snapshot
+            inner_configs = list(six.iteritems(self.__inner_configs))
+        for path, inner_config in inner_configs:
             inner_data = self.get(path, default={})
-            inner_config._invalidate(inner_data)
+            if inner_data is not inner_config._data:
+                inner_config._invalidate(inner_data)
+        changes = frozenset(_join_path(keys) for keys in changes)
+        self._notify_listeners(changes)
+        return changes
+
+    def _notify_listeners(self, changes):
+        last_exc = None
+        for callback in list(self.__listeners):
+            try:
+                callback(changes)
+            except Exception:
+                last_exc = sys.exc_info()
+        if last_exc:
+            six.reraise(*last_exc)
 
     def __iter__(self):
-        return iter(self._data)
+        return iter(self._snapshot.data)
 
     def __len__(self):
-        return len(self._data)
+        return len(self._snapshot.data)
 
     def __getitem__(self, path):
-        data = self._data
-        keys = _split_path(path)
+        # Hot path, skip the get_instrumentation() call.
+        instr = instrumentation._current
+        if not instr.enabled:
+            return self._lookup(path)
+        try:
+            value = self._lookup(path)
+        except KeyError:
+            instr.lookup(path, False)
+            raise
+        instr.lookup(path, True)
+        return value
+
+    def _lookup(self, path):
+        keys = _PATH_CACHE.get(path)
+        snapshot = self._snapshot
+        index = snapshot.index
+        if index is not None:
+            try:
+                return index[keys]
+            except KeyError:
+                pass  # Walk the data to report the first missing key.
+        data = snapshot.data
+        if isinstance(data, LazyMapping):
+            # Parse here so that parsing errors aren't reported as missing keys.
+            data = data.data
         for i, key in enumerate(keys):
             try:
                 data = data[key]
@@ -109,12 +517,41 @@ class Config(collections.Mapping):
         :raises KeyError: if path doesn't exist and no default was given.
         """
         try:
-            instance = self.__inner_configs[path]
+            return self.__inner_configs[path]
         except KeyError:
-            inner = self.get(path, default=default, type_=dict)
-            instance = self.__inner_configs[path] = Config(inner)
+            pass
+        if self.__pinned:
+            return self.__get_pinned_config(path, default)
+        # Created under the lock so that the inner config either reads the
+        # latest data or is updated by a concurrent _invalidate.
+        with self.__inner_configs_lock:
+            instance = self.__inner_configs.get(path)
+            if instance is None:
+                inner = self.get(path, default=default, type_=dict)
+                instance = self.__inner_configs[path] = Config(inner, index=self._indexed)
         return instance
 
+    def __get_pinned_config(self, path, default):
+        """Return inner config of a pinned config, pinned too.
+
+        The inner snapshot is shared by pinned configs of the same version, and taken
+        from the live inner config when it reads the same data, so that the inner
+        index isn't built again for every snapshot.
+        """
+        snapshot = self._snapshot
+        live_inner = self.__live.__inner_configs.get(path) if self.__live is not None else None
+        inner_snapshot = snapshot.inner.get(path)
+        if inner_snapshot is None:
+            inner = self.get(path, default=default, type_=dict)
+            if live_inner is not None and live_inner._snapshot.data is inner:
+                inner_snapshot = live_inner._snapshot
+            else:
+                inner_snapshot = _Snapshot(inner, _build_index(inner) if self._indexed else None, 0)
+            if inner is not default:
+                inner_snapshot = snapshot.inner.setdefault(path, inner_snapshot)
+        instance = self._pinned(inner_snapshot, self._indexed, live_inner)
+        return self.__inner_configs.setdefault(path, instance)
+
     def get_int(self, path, default=UNDEFINED):
         """Get path value as integer.
 
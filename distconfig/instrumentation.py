@@ -0,0 +1,160 @@
+"""Instrumentation hooks called by backends and :class:`distconfig.config.Config`.
+
+By default hooks do nothing and durations aren't even measured, install an
+:class:`Instrumentation` subclass with :func:`set_instrumentation` to export them
+to a metrics system, or use :class:`MemoryInstrumentation` to aggregate them in memory.
+
+Example:
+
+    >>> from distconfig.config import Config
+    >>> previous = set_instrumentation(MemoryInstrumentation())
+    >>> config = Config({'key': 'value'})
+    >>> config.get('key'), config.get('missing')
+    ('value', None)
+    >>> sorted(get_instrumentation().counters().items())
+    [('lookup_misses', 1), ('lookups', 2)]
+    >>> _ = set_instrumentation(previous)
+
+"""
+import collections
+import threading
+import time
+
+
+#: Clock used to measure durations.
+clock = getattr(time, 'perf_counter', time.time)
+
+
+class Instrumentation(object):
+    """Instrumentation interface, the default implementation does nothing.
+
+    Durations are in seconds. Hooks are called from the caller thread or from the
+    backend watchers, implementations must be thread-safe and must not raise.
+    """
+
+    #: If False, callers don't measure durations nor call hooks.
+    enabled = False
+
+    def get_raw(self, path, duration):
+        """Called after reading the raw value of ``path`` from a backend."""
+
+    def get_raw_many(self, paths, duration):
+        """Called after reading the raw values of many ``paths`` from a backend."""
+
+    def parse(self, path, duration):
+        """Called after parsing the raw value of ``path``."""
+
+    def notify(self, path, listeners, duration):
+        """Called after notifying ``listeners`` number of listeners of a change of ``path``."""
+
+    def callback(self, path, callback, duration, error):
+        """Called after a listener ``callback`` of ``path`` returned.
+
+        :param error: Exception raised by the callback if any, else None.
+        """
+
+    def watch_error(self, path, error):
+        """Called when a backend watcher of ``path`` failed with ``error`` and is re-launched."""
+
+    def lookup(self, path, hit):
+        """Called after a :class:`distconfig.config.Config` lookup of ``path``.
+
+        :param hit: False if the path is missing.
+        """
+
+
+class MemoryInstrumentation(Instrumentation):
+    """Aggregate counters and timings in memory.
+
+    Timings are aggregated as count, total, min and max durations by hook name:
+    ``get_raw``, ``get_raw_many``, ``parse``, ``notify`` and ``callback``. Counters are
+    ``notified_listeners``, ``callback_errors``, ``watch_errors``, ``lookups`` and
+    ``lookup_misses``.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters and timings."""
+        with self._lock:
+            self._counters = collections.defaultdict(int)
+            self._timings = {}
+
+    def counters(self):
+        """Return dictionary of counter values by name."""
+        with self._lock:
+            return dict(self._counters)
+
+    def timings(self):
+        """Return dictionary of timings by name, timings are dictionaries with keys
+        ``count``, ``total``, ``min``, ``max`` and ``mean``."""
+        with self._lock:
+            return dict((name, {'count': count, 'total': total, 'min': min_, 'max': max_, 'mean': total / count})
+                        for name, (count, total, min_, max_) in self._timings.items())
+
+    def _time(self, name, duration):
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                self._timings[name] = [1, duration, duration, duration]
+            else:
+                timing[0] += 1
+                timing[1] += duration
+                timing[2] = min(timing[2], duration)
+                timing[3] = max(timing[3], duration)
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def get_raw(self, path, duration):
+        self._time('get_raw', duration)
+
+    def get_raw_many(self, paths, duration):
+        self._time('get_raw_many', duration)
+
+    def parse(self, path, duration):
+        self._time('parse', duration)
+
+    def notify(self, path, listeners, duration):
+        self._time('notify', duration)
+        self._count('notified_listeners', listeners)
+
+    def callback(self, path, callback, duration, error):
+        self._time('callback', duration)
+        if error is not None:
+            self._count('callback_errors')
+
+    def watch_error(self, path, error):
+        self._count('watch_errors')
+
+    def lookup(self, path, hit):
+        self._count('lookups')
+        if not hit:
+            self._count('lookup_misses')
+
+
+# Installed instrumentation, always read through get_instrumentation() except by
+# Config lookups which read it directly to save a function call per lookup.
+_current = Instrumentation()
+
+
+def get_instrumentation():
+    """Return the installed :class:`Instrumentation`."""
+    return _current
+
+
+def set_instrumentation(instrumentation):
+    """Install ``instrumentation`` used by all backends and configs.
+
+    :param instrumentation: :class:`Instrumentation` instance, None to disable instrumentation.
+    :return: the previously installed instrumentation.
+    """
+    global _current
+    previous = _current
+    _current = instrumentation if instrumentation is not None else Instrumentation()
+    return previous
@@ -0,0 +1,170 @@
+"""Registry of config payload parsers.
+
+Besides ``ujson``, the following decoders are registered when installed:
+`orjson <https://pypi.python.org/pypi/orjson>`_ and
+`python-rapidjson <https://pypi.python.org/pypi/python-rapidjson>`_ for JSON,
+`msgpack <https://pypi.python.org/pypi/msgpack>`_ for MessagePack and
+`cbor2 <https://pypi.python.org/pypi/cbor2>`_ for CBOR.
+"""
+import collections
+import fnmatch
+import functools
+
+import six
+import ujson
+
+
+def _first_byte(data):
+    """Return first byte of ``data`` as an integer, None if empty or not bytes."""
+    if not isinstance(data, (bytes, bytearray)) or not data:
+        return None
+    return bytearray(data[:1])[0]
+
+
+def is_json(data):
+    """Return True if ``data`` looks like a JSON object or array.
+
+    Example:
+
+        >>> is_json(b'  {"a": 1}')
+        True
+        >>> is_json(b'\\x81\\xa1a\\x01')
+        False
+
+    """
+    stripped = data.lstrip()
+    return stripped[:1] in ('{', '[', b'{', b'[')
+
+
+def is_msgpack(data):
+    """Return True if ``data`` looks like a MessagePack map."""
+    byte = _first_byte(data)
+    return byte is not None and (0x80 <= byte <= 0x8f or byte in (0xde, 0xdf))
+
+
+def is_cbor(data):
+    """Return True if ``data`` looks like a CBOR map or start with the CBOR self-describe tag."""
+    byte = _first_byte(data)
+    return byte is not None and (data[:3] == b'\xd9\xd9\xf7' or 0xa0 <= byte <= 0xbb or byte == 0xbf)
+
+
+def _json_decoders():
+    """Return list of ``(name, loads)`` of installed JSON decoders, fastest first."""
+    decoders = []
+    for name in ('orjson', 'rapidjson'):
+        try:
+            module = __import__(name)
+        except ImportError:
+            continue
+        decoders.append((name, module.loads))
+    decoders.append(('ujson', ujson.loads))
+    return decoders
+
+
+class ParserRegistry(object):
+    """Registry choosing the parser of a config payload by path or by sniffing the payload.
+
+    A registry can be given as ``parser`` option of backends. A path parser is looked up
+    first, then the first registered parser which sniff function accept the payload, and
+    finally the default parser.
+
+    :param default: Parser used when no other parser match, default: ``ujson.loads``.
+
+    Example:
+
+        >>> registry = ParserRegistry()
+        >>> registry.register('upper', lambda data: {'value': data.upper()})
+        >>> registry.register_path('/legacy/*', 'upper')
+        >>> registry.parse('foo', '/legacy/config')
+        {'value': 'FOO'}
+        >>> registry.parse('{"a": 1}', '/new/config')
+        {'a': 1}
+
+    """
+
+    def __init__(self, default=ujson.loads):
+        self._default = default
+        self._parsers = collections.OrderedDict()
+        self._sniffers = collections.OrderedDict()
+        self._paths = []
+
+    def register(self, name, parser, sniff=None):
+        """Register a parser.
+
+        :param name: Parser name.
+        :param parser: Callable that accept the raw data and return the parsed data.
+        :param sniff: Optional callable that accept the raw data and return True if
+            ``parser`` can parse it, or bytes prefix of data ``parser`` can parse.
+        """
+        if isinstance(sniff, bytes):
+            sniff = functools.partial(_has_prefix, sniff)
+        self._parsers[name] = parser
+        if sniff is not None:
+            self._sniffers[name] = sniff
+        else:
+            self._sniffers.pop(name, None)
+
+    def register_path(self, pattern, name):
+        """Use parser ``name`` for paths matching ``pattern``.
+
+        :param pattern: Shell-style pattern as accepted by :func:`fnmatch.fnmatchcase`.
+        :param name: Name of a registered parser.
+        :raises KeyError: If no parser was registered as ``name``.
+        """
+        if name not in self._parsers:
+            raise KeyError('No parser registered as %r' % name)
+        self._paths.append((pattern, name))
+
+    def get(self, name):
+        """Return parser registered as ``name``.
+
+        :raises KeyError: If no parser was registered as ``name``.
+        """
+        return self._parsers[name]
+
+    def get_parser(self, data, path=None):
+        """Return the parser of ``data`` found at ``path``."""
+        if path is not None:
+            for pattern, name in self._paths:
+                if fnmatch.fnmatchcase(path, pattern):
+                    return self._parsers[name]
+        for name, sniff in six.iteritems(self._sniffers):
+            if sniff(data):
+                return self._parsers[name]
+        return self._default
+
+    def parse(self, data, path=None):
+        """Parse ``data`` found at ``path``."""
+        return self.get_parser(data, path)(data)
+
+    __call__ = parse
+
+
+def _has_prefix(prefix, data):
+    return isinstance(data, bytes) and data.startswith(prefix)
+
+
+def default_registry():
+    """Return a registry of JSON, MessagePack and CBOR parsers which are installed.
+
+    JSON payloads are parsed with the fastest JSON decoder installed.
+    """
+    decoders = _json_decoders()
+    _, json_loads = decoders[0]
+    registry = ParserRegistry(default=json_loads)
+    registry.register('json', json_loads, sniff=is_json)
+    for name, loads in decoders:
+        registry.register(name, loads)
+    try:
+        import msgpack
+    except ImportError:
+        pass
+    else:
+        registry.register('msgpack', functools.partial(msgpack.unpackb, raw=False), sniff=is_msgpack)
+    try:
+        import cbor2
+    except ImportError:
+        pass
+    else:
+        registry.register('cbor', cbor2.loads, sniff=is_cbor)
+    return registry
@@ -0,0 +1,166 @@
+"""Typed settings objects bound to a :class:`distconfig.config.Config`.
+
+Settings classes declare typed fields mapped to config paths, values are read from
+the config once and stored in a compact ``__slots__`` object, so reading a setting is
+a plain attribute access. Bound settings are materialized again each time the config
+changes and the new object replaces the previous one with a single assignment.
+
+Example:
+
+    >>> from distconfig.config import Config
+    >>> class HttpSettings(Settings):
+    ...     timeout = Field('http/timeout', float, default=1.0)
+    ...     retries = Field('http/retries', int)
+    >>> config = Config({'http': {'retries': 3}})
+    >>> settings = HttpSettings.bind(config)
+    >>> settings.current.timeout, settings.current.retries
+    (1.0, 3)
+    >>> _ = config._invalidate({'http': {'retries': 5}})
+    >>> settings.current.retries
+    5
+
+"""
+import itertools
+import threading
+
+import six
+
+from distconfig.config import UNDEFINED
+
+
+_counter = itertools.count()
+
+
+class Field(object):
+    """Declare a setting read from a config path.
+
+    :param path: path expression e.g. 'key1/key2/key3'.
+    :param type_: Optional Python type the value must be an instance of, as with
+        :meth:`distconfig.config.Config.get`, default: None.
+    :param default: default value when the path is missing, default: UNDEFINED i.e.
+        the path is required.
+    """
+
+    def __init__(self, path, type_=None, default=UNDEFINED):
+        self.path = path
+        self.type_ = type_
+        self.default = default
+        self._order = next(_counter)
+
+    def __repr__(self):
+        return '%s(%r, %r, default=%r)' % (self.__class__.__name__, self.path, self.type_, self.default)
+
+    def read(self, config):
+        """Read the field value from ``config``.
+
+        :raises TypeError: if the value is not of type ``type_``.
+        :raises KeyError: if path doesn't exist and no default was given.
+        """
+        return config.get(self.path, default=self.default, type_=self.type_)
+
+
+class _SettingsMeta(type):
+    """Replace :class:`Field` attributes by slots."""
+
+    def __new__(mcs, name, bases, namespace):
+        fields = {}
+        for base in reversed(bases):
+            fields.update(getattr(base, '_fields', {}))
+        declared = dict((key, value) for key, value in namespace.items() if isinstance(value, Field))
+        for key in declared:
+            del namespace[key]
+        fields.update(declared)
+        namespace['__slots__'] = tuple(sorted(declared, key=lambda key: declared[key]._order))
+        namespace['_fields'] = fields
+        namespace['_names'] = tuple(sorted(fields, key=lambda key: fields[key]._order))
+        return super(_SettingsMeta, mcs).__new__(mcs, name, bases, namespace)
+
+
+@six.add_metaclass(_SettingsMeta)
+class Settings(object):
+    """Base class of settings, declare fields as class attributes using :class:`Field`.
+
+    Instances are immutable, use :meth:`from_config` to read them from a config or
+    :meth:`bind` to keep them up to date with a config.
+    """
+
+    def __init__(self, **values):
+        missing = set(self._names) - set(values)
+        if missing:
+            raise TypeError('Missing values of %s' % ', '.join(sorted(missing)))
+        unknown = set(values) - set(self._names)
+        if unknown:
+            raise TypeError('Unknown settings %s' % ', '.join(sorted(unknown)))
+        for name, value in six.iteritems(values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('%s is immutable' % self.__class__.__name__)
+
+    def __delattr__(self, name):
+        raise AttributeError('%s is immutable' % self.__class__.__name__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join('%s=%r' % (name, getattr(self, name)) for name in self._names))
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self._names)
+
+    @classmethod
+    def from_config(cls, config):
+        """Read settings from ``config``.
+
+        :param config: :class:`distconfig.config.Config` instance.
+        :raises TypeError: if a value is not of the type of its field.
+        :raises KeyError: if a required path doesn't exist.
+        """
+        return cls(**dict((name, field.read(config)) for name, field in six.iteritems(cls._fields)))
+
+    @classmethod
+    def bind(cls, config):
+        """Read settings from ``config`` and read them again each time it changes.
+
+        :param config: :class:`distconfig.config.Config` instance.
+        :return: :class:`BoundSettings` instance.
+        """
+        return BoundSettings(cls, config)
+
+
+class BoundSettings(object):
+    """Settings kept up to date with a config.
+
+    :attr:`current` always holds a complete settings instance, readers should get it
+    once, e.g. per request, to read consistent values. If the changed config doesn't
+    match the fields anymore, e.g. a value of the wrong type, :attr:`current` keeps the
+    previous settings and the error is raised to the config listeners caller.
+
+    :param settings_cls: :class:`Settings` subclass.
+    :param config: :class:`distconfig.config.Config` instance.
+    """
+
+    def __init__(self, settings_cls, config):
+        self._settings_cls = settings_cls
+        self._config = config
+        self._lock = threading.Lock()
+        #: Latest settings instance.
+        self.current = settings_cls.from_config(config.snapshot())
+        config.add_listener(self._on_config_change)
+
+    def unbind(self):
+        """Stop updating settings when the config changes."""
+        self._config.remove_listener(self._on_config_change)
+
+    def _on_config_change(self, changes):
+        with self._lock:
+            settings = self._settings_cls.from_config(self._config.snapshot())
+            if settings != self.current:
+                self.current = settings
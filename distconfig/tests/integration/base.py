@@ -6,6 +6,8 @@ import unittest
 
 import six
 
+from distconfig.api import Proxy
+
 envvar = 'DISTCONFIG_RUN_INTEGRATION_TEST'
 if os.environ.get(envvar) != 'true':
     raise unittest.SkipTest('Skipping integration tests, to enable run: export %s=true' % envvar)
@@ -23,6 +25,8 @@ class _BackendTestCase(unittest.TestCase):
             'boolean': False,
             'none': None
         }
+        # Don't share cached configs between tests.
+        self.proxy = Proxy(self.proxy.backend)
 
     @abc.abstractproperty
     def path(self):
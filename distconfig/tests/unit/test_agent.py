@@ -0,0 +1,156 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+import mock
+
+from distconfig import agent
+from distconfig.api import Proxy
+from distconfig.backends.agent import AgentBackend
+from distconfig.backends.execution_context import ThreadingExecutionContext
+from distconfig.backends.memory import MemoryBackend
+from distconfig.backends.reconnect import ReconnectPolicy
+from distconfig.tests.unit.utils import SyncExecutionContext, wait_for
+
+
+class ProtocolTestCase(unittest.TestCase):
+
+    def test_paths(self):
+        paths = [u'/foo', u'/b\xe4r', u'']
+
+        self.assertEqual(agent.decode_paths(agent.encode_paths(paths)), paths)
+
+    def test_values(self):
+        values = {u'/foo': (b'{"foo": 1}', 3), u'/bar': (u'{"bar": 1}', None), u'/baz': (None, None)}
+
+        self.assertEqual(agent.decode_values(agent.encode_values(values)), values)
+
+
+class AgentTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.socket_path = os.path.join(directory, 'agent.sock')
+        self.agent = agent.Agent(self.socket_path)
+        self.source = MemoryBackend({'/foo': '{"foo": 1}'}, execution_context=SyncExecutionContext(),
+                                    snapshot=self.agent)
+        self.agent.backend = self.source
+        self.agent.start()
+        self.addCleanup(self.agent.shutdown)
+        self.execution_context = ThreadingExecutionContext()
+        self.addCleanup(self.execution_context.shutdown)
+        self.backend = AgentBackend(
+            self.socket_path, execution_context=self.execution_context, timeout=5,
+            reconnect_policy=ReconnectPolicy(initial_delay=0.01, max_delay=0.05))
+
+    def test_get(self):
+        self.assertEqual(self.backend.get('/foo'), {'foo': 1})
+        self.assertEqual(self.backend.get_many(['/foo', '/bar']), {'/foo': {'foo': 1}, '/bar': {}})
+
+    def test_get_served_from_agent(self):
+        other = AgentBackend(self.socket_path, execution_context=self.execution_context)
+        self.backend.get('/foo')
+
+        with mock.patch.object(self.source, 'get_raw_many') as get_raw_many:
+            self.assertEqual(other.get('/foo'), {'foo': 1})
+
+        self.assertFalse(get_raw_many.called)
+
+    def test_error(self):
+        with mock.patch.object(self.source, 'get_raw_many', side_effect=ValueError('boom')):
+            with self.assertRaises(IOError) as context:
+                self.backend.get('/foo')
+
+        self.assertIn('boom', str(context.exception))
+
+    def test_watch(self):
+        config = Proxy(self.backend).get_config('/foo')
+
+        self.source.set('/foo', '{"foo": 2}')
+
+        self.assertTrue(wait_for(lambda: config.get('foo') == 2), dict(config))
+
+    def test_reconnect(self):
+        config = Proxy(self.backend).get_config('/foo')
+        self.agent.shutdown()
+
+        self.source.set('/foo', '{"foo": 2}')
+        self.agent.start()
+
+        self.assertTrue(wait_for(lambda: config.get('foo') == 2), dict(config))
+        self.assertFalse(self.backend.reconnect_policy.is_open)
+
+    def test_save_version_only(self):
+        connection = mock.Mock(send_lock=threading.Lock(), paths=set())
+        self.agent._fetch(['/foo'])
+        self.agent._subscribe(connection, ['/foo'])
+
+        self.agent.save('/foo', '{"foo": 1}', 1)
+        self.agent.save('/foo', '{"foo": 2}', 2)
+
+        self.assertEqual(self.agent.load('/foo'), ('{"foo": 2}', 2))
+        connection.send.assert_called_once_with(agent.CHANGE, 0, agent.encode_values({'/foo': ('{"foo": 2}', 2)}))
+
+    def test_values_sent_before_change(self):
+        get = self.agent._get
+
+        def get_and_change(paths):
+            values = get(paths)
+            # The change is saved while values are being sent.
+            thread = threading.Thread(target=self.source.set, args=('/foo', '{"foo": 2}'))
+            thread.start()
+            thread.join(0.1)
+            return values
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(sock.close)
+        sock.connect(self.socket_path)
+        with mock.patch.object(self.agent, '_get', side_effect=get_and_change):
+            agent.send_frame(sock, agent.WATCH, 1, agent.encode_paths(['/foo']))
+
+            message_type, request_id, body = agent.recv_frame(sock)
+            self.assertEqual((message_type, request_id), (agent.VALUES, 1))
+            self.assertEqual(agent.decode_values(body), {'/foo': ('{"foo": 1}', None)})
+
+            message_type, _, body = agent.recv_frame(sock)
+            self.assertEqual(message_type, agent.CHANGE)
+            self.assertEqual(agent.decode_values(body), {'/foo': ('{"foo": 2}', 2)})
+
+    @mock.patch('distconfig.agent._Connection.max_pending', 2)
+    def test_slow_client_disconnected(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(sock.close)
+        sock.connect(self.socket_path)
+        agent.send_frame(sock, agent.WATCH, 1, agent.encode_paths(['/foo']))
+        self.assertEqual(agent.recv_frame(sock)[0], agent.VALUES)
+
+        # The client stops reading, changes are saved without blocking until it's disconnected.
+        def update():
+            for i in range(50):
+                self.source.set('/foo', '{"foo": "%s"}' % ('x' * 1024 * 1024 + str(i)))
+
+        thread = threading.Thread(target=update)
+        thread.daemon = True
+        thread.start()
+        thread.join(10)
+
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(wait_for(lambda: not self.agent._connections))
+
+
+class AgentBackendTestCase(unittest.TestCase):
+
+    def test_connect_receiver_not_started(self):
+        backend = AgentBackend('/nonexistent', execution_context=mock.Mock())
+        backend._execution_context.run.side_effect = RuntimeError('saturated')
+
+        with mock.patch('distconfig.backends.agent.socket.socket') as socket_class:
+            with self.assertRaises(RuntimeError):
+                backend._connect()
+
+        socket_class.return_value.close.assert_called_once_with()
+        self.assertIsNone(backend._socket)
@@ -0,0 +1,80 @@
+import json
+import unittest
+
+import mock
+
+from distconfig.api import Proxy
+from distconfig.config import Config
+from distconfig.tests.unit.test_backend import FakeBackend
+
+
+class ProxyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.value = {'foo': 'bar'}
+        self.raw_value = json.dumps(self.value)
+        self.backend = FakeBackend({
+            '/some/path': self.raw_value
+        })
+        self.proxy = Proxy(self.backend)
+
+    def test_get_config(self):
+        config = self.proxy.get_config('/some/path')
+
+        self.assertEqual(config, Config(self.value))
+
+    def test_get_config_cached(self):
+        with mock.patch.object(self.backend, 'get_raw', wraps=self.backend.get_raw) as get_raw:
+            config1 = self.proxy.get_config('/some/path')
+            config2 = self.proxy.get_config('/some/path')
+
+        self.assertIs(config1, config2)
+        self.assertEqual(get_raw.call_count, 1)
+
+    def test_get_config_cached_per_config_class(self):
+        class MyConfig(Config):
+            pass
+
+        config = self.proxy.get_config('/some/path', config_cls=MyConfig)
+
+        self.assertIsInstance(config, MyConfig)
+        self.assertIsNot(config, self.proxy.get_config('/some/path'))
+
+    def test_cached_config_updated(self):
+        config = self.proxy.get_config('/some/path')
+        self.proxy.get_config('/some/path')
+
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.backend._notify_listeners(json.dumps({'foo': 'baz'}), '/some/path')
+
+        self.assertEqual(config['foo'], 'baz')
+        # One listener for the cached config and one for the callback.
+        self.assertEqual(len(self.backend._get_listeners('/some/path')), 2)
+
+    def test_get_configs(self):
+        configs = self.proxy.get_configs(['/some/path', '/no/existing/path'])
+
+        self.assertEqual(configs, {
+            '/some/path': Config(self.value),
+            '/no/existing/path': Config({}),
+        })
+        self.assertIs(configs['/some/path'], self.proxy.get_config('/some/path'))
+
+    def test_get_configs_fetch_only_missing(self):
+        config = self.proxy.get_config('/some/path')
+
+        with mock.patch.object(self.backend, 'get_raw_many', wraps=self.backend.get_raw_many) as get_raw_many:
+            configs = self.proxy.get_configs(['/some/path', '/no/existing/path'])
+
+        get_raw_many.assert_called_once_with(['/no/existing/path'])
+        self.assertIs(configs['/some/path'], config)
+
+    def test_get_configs_register_listeners(self):
+        configs = self.proxy.get_configs(['/some/path', '/no/existing/path'])
+
+        self.backend._notify_listeners(json.dumps({'foo': 'baz'}), '/no/existing/path')
+
+        self.assertEqual(configs['/no/existing/path']['foo'], 'baz')
+        self.assertEqual(configs['/some/path']['foo'], 'bar')
@@ -0,0 +1,272 @@
+import json
+import sys
+import threading
+import unittest
+
+import mock
+
+if sys.version_info < (3, 5):
+    raise unittest.SkipTest('asyncio support requires Python 3.5+')
+
+import asyncio  # noqa
+
+import aio_etcd  # noqa
+
+from distconfig.async_api import AsyncProxy  # noqa
+from distconfig.backends.async_base import AsyncBackend  # noqa
+from distconfig.backends.async_consul import AsyncConsulBackend  # noqa
+from distconfig.backends.async_etcd import AsyncEtcdBackend  # noqa
+from distconfig.backends.execution_context import AsyncioExecutionContext  # noqa
+from distconfig.config import Config  # noqa
+from distconfig.tests.unit.test_backend import FakeBackend  # noqa
+
+
+class StopWatching(BaseException):
+    pass
+
+
+class FakeAsyncBackend(AsyncBackend):
+
+    def __init__(self, data, **kwargs):
+        super(FakeAsyncBackend, self).__init__(**kwargs)
+        self._data = data
+        self.calls = 0
+
+    def get_raw_async(self, path):
+        self.calls += 1
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(self._data.get(path))
+        return future
+
+
+class _AsyncTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.value = {'foo': 'bar'}
+        self.raw_value = json.dumps(self.value)
+
+    def run_until_complete(self, coro):
+        return self.loop.run_until_complete(coro)
+
+
+class AsyncioExecutionContextTestCase(_AsyncTestCase):
+
+    def setUp(self):
+        super(AsyncioExecutionContextTestCase, self).setUp()
+        self.execution_context = AsyncioExecutionContext(loop=self.loop)
+
+    def test_run_coroutine_function(self):
+        func = mock.AsyncMock()
+
+        self.execution_context.run(func, 1, foo='bar')
+        self.run_until_complete(asyncio.sleep(0.01))
+
+        func.assert_awaited_once_with(1, foo='bar')
+
+    def test_run_function(self):
+        func = mock.Mock()
+
+        self.execution_context.run(func, 1, foo='bar')
+        self.run_until_complete(asyncio.sleep(0.01))
+        self.run_until_complete(asyncio.sleep(0.01))
+
+        func.assert_called_once_with(1, foo='bar')
+
+    def test_shutdown_cancel_tasks(self):
+        self.execution_context.run(asyncio.sleep, 60)
+        self.run_until_complete(asyncio.sleep(0.01))
+        self.assertEqual(len(self.execution_context._tasks), 1)
+
+        self.execution_context.shutdown()
+        self.run_until_complete(asyncio.sleep(0.01))
+
+        self.assertFalse(self.execution_context.running)
+        self.assertEqual(len(self.execution_context._tasks), 0)
+
+
+class AsyncBackendTestCase(_AsyncTestCase):
+
+    def test_get_async(self):
+        backend = FakeAsyncBackend({'/some/path': self.raw_value})
+
+        self.assertEqual(self.run_until_complete(backend.get_async('/some/path')), self.value)
+
+    def test_get_async_unexistant_path(self):
+        backend = FakeAsyncBackend({})
+
+        self.assertEqual(self.run_until_complete(backend.get_async('/some/path')), {})
+
+    def test_get(self):
+        backend = FakeAsyncBackend({'/some/path': self.raw_value}, execution_context=AsyncioExecutionContext(loop=self.loop))
+
+        self.assertEqual(backend.get('/some/path'), self.value)
+        self.assertEqual(backend.get_many(['/some/path']), {'/some/path': self.value})
+
+    def test_get_loop_running_in_other_thread(self):
+        backend = FakeAsyncBackend({'/some/path': self.raw_value}, execution_context=AsyncioExecutionContext(loop=self.loop))
+        thread = threading.Thread(target=self.loop.run_forever)
+        thread.start()
+        try:
+            self.assertEqual(backend.get('/some/path'), self.value)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            thread.join(5)
+
+    def test_get_from_event_loop(self):
+        backend = FakeAsyncBackend({}, execution_context=AsyncioExecutionContext(loop=self.loop))
+        result = self.loop.create_future()
+
+        def get():
+            try:
+                backend.get('/some/path')
+            except RuntimeError as ex:
+                result.set_result(ex)
+
+        self.loop.call_soon(get)
+
+        self.assertIsInstance(self.run_until_complete(result), RuntimeError)
+
+
+class AsyncProxyTestCase(_AsyncTestCase):
+
+    def test_get_config_async(self):
+        backend = FakeAsyncBackend({'/some/path': self.raw_value})
+        proxy = AsyncProxy(backend)
+
+        config = self.run_until_complete(proxy.get_config_async('/some/path'))
+
+        self.assertEqual(config, Config(self.value))
+
+    def test_get_config_async_cached(self):
+        backend = FakeAsyncBackend({'/some/path': self.raw_value})
+        proxy = AsyncProxy(backend)
+
+        config1 = self.run_until_complete(proxy.get_config_async('/some/path'))
+        config2 = self.run_until_complete(proxy.get_config_async('/some/path'))
+
+        self.assertIs(config1, config2)
+        self.assertEqual(backend.calls, 1)
+        self.assertIs(proxy.get_config('/some/path'), config1)
+
+    def test_get_configs_async(self):
+        backend = FakeAsyncBackend({'/some/path': self.raw_value}, max_concurrency=1)
+        proxy = AsyncProxy(backend)
+
+        configs = self.run_until_complete(proxy.get_configs_async(['/some/path', '/no/existing/path']))
+
+        self.assertEqual(configs, {'/some/path': Config(self.value), '/no/existing/path': Config({})})
+        self.assertIs(configs['/some/path'], proxy.get_config('/some/path'))
+
+    def test_get_configs_async_with_blocking_backend(self):
+        proxy = AsyncProxy(FakeBackend({'/some/path': self.raw_value}))
+
+        configs = self.run_until_complete(proxy.get_configs_async(['/some/path']))
+
+        self.assertEqual(configs, {'/some/path': Config(self.value)})
+
+    def test_get_config_async_with_blocking_backend(self):
+        proxy = AsyncProxy(FakeBackend({'/some/path': self.raw_value}))
+
+        config = self.run_until_complete(proxy.get_config_async('/some/path'))
+
+        self.assertEqual(config, Config(self.value))
+
+
+class AsyncConsulBackendTestCase(_AsyncTestCase):
+
+    def setUp(self):
+        super(AsyncConsulBackendTestCase, self).setUp()
+        self.client = mock.Mock()
+        self.client.kv.get = mock.AsyncMock(return_value=(1, {'Value': self.raw_value}))
+        self.execution_context = mock.Mock()
+        self.backend = AsyncConsulBackend(self.client, execution_context=self.execution_context)
+
+    def test_get_async(self):
+        self.assertEqual(self.run_until_complete(self.backend.get_async('key')), self.value)
+        self.execution_context.run.assert_called_once_with(self.backend._watch_for_changes, 'key')
+
+    def test_watch_for_changes(self):
+        self.client.kv.get.side_effect = [(2, {'Value': self.raw_value, 'ModifyIndex': 2}), StopWatching()]
+
+        with mock.patch.object(self.backend, '_notify_listeners') as notify:
+            with self.assertRaises(StopWatching):
+                self.run_until_complete(self.backend._watch_for_changes('key'))
+
+        notify.assert_called_once_with(self.raw_value, 'key', 2)
+        self.client.kv.get.assert_awaited_with('key', index=2)
+
+    def test_stale_watch_older_index_read_again(self):
+        backend = AsyncConsulBackend(self.client, execution_context=self.execution_context, consistency='stale', wait=10)
+        backend._indexes[('key', False)] = 5
+        self.client.kv.get.side_effect = [(3, None), (5, {'Value': self.raw_value, 'ModifyIndex': 5}), StopWatching()]
+
+        with mock.patch.object(backend, '_notify_listeners') as notify:
+            with self.assertRaises(StopWatching):
+                self.run_until_complete(backend._watch_for_changes('key'))
+
+        notify.assert_called_once_with(self.raw_value, 'key', 5)
+        self.assertEqual(self.client.kv.get.await_args_list, [
+            mock.call('key', index=None, wait='10s', consistency='stale'),
+            mock.call('key', consistency='default'),
+            mock.call('key', index=5, wait='10s', consistency='stale'),
+        ])
+
+
+class AsyncEtcdBackendTestCase(_AsyncTestCase):
+
+    def setUp(self):
+        super(AsyncEtcdBackendTestCase, self).setUp()
+        self.client = mock.Mock()
+        self.client.get = mock.AsyncMock(return_value=mock.Mock(value=self.raw_value))
+        self.client.read = mock.AsyncMock()
+        self.client.watch = mock.AsyncMock()
+        self.execution_context = mock.Mock()
+        self.backend = AsyncEtcdBackend(self.client, execution_context=self.execution_context,
+                                        watch_directories=['/service'])
+
+    def test_get_async(self):
+        self.assertEqual(self.run_until_complete(self.backend.get_async('/key')), self.value)
+        self.execution_context.run.assert_called_once_with(self.backend._watch_for_changes, '/key')
+
+    def test_get_async_missing_key(self):
+        self.client.get.side_effect = aio_etcd.EtcdKeyNotFound
+
+        self.assertEqual(self.run_until_complete(self.backend.get_async('/key')), {})
+
+    def test_get_many_async_missing_directory(self):
+        self.client.read.side_effect = aio_etcd.EtcdKeyNotFound
+
+        values = self.run_until_complete(self.backend.get_many_async(['/service/a', '/service/b']))
+
+        self.assertEqual(values, {'/service/a': {}, '/service/b': {}})
+
+    def test_watch_for_changes(self):
+        self.client.watch.side_effect = [mock.Mock(value=self.raw_value, etcd_index=5, modifiedIndex=5), StopWatching()]
+
+        with mock.patch.object(self.backend, '_notify_listeners') as notify:
+            with self.assertRaises(StopWatching):
+                self.run_until_complete(self.backend._watch_for_changes('/key'))
+
+        notify.assert_called_once_with(self.raw_value, '/key', 5)
+        self.client.watch.assert_awaited_with('/key', index=5)
+
+    def test_directory_index_cleared_resync(self):
+        self.client.read.return_value = mock.Mock(value=None, leaves=[], etcd_index=1)
+        self.run_until_complete(self.backend.get_many_async(['/service/a', '/service/b']))
+        self.client.read.side_effect = [
+            mock.Mock(leaves=[mock.Mock(key='/service/a', value='1')], etcd_index=3),
+            mock.Mock(leaves=[mock.Mock(key='/service/a', value='2')], etcd_index=7),
+        ]
+        self.client.watch.side_effect = [aio_etcd.EtcdEventIndexCleared(), StopWatching()]
+
+        with mock.patch.object(self.backend, '_notify_listeners') as notify:
+            with self.assertRaises(StopWatching):
+                self.run_until_complete(self.backend._watch_directory_for_changes('/service'))
+
+        self.assertEqual(notify.call_args_list[-2:], [mock.call('2', '/service/a', None), mock.call(None, '/service/b', None)])
+        self.assertEqual(self.client.watch.await_args_list, [
+            mock.call('/service', index=4, recursive=True),
+            mock.call('/service', index=8, recursive=True),
+        ])
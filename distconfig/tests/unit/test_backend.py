@@ -31,6 +31,32 @@ class BackendTestCase(unittest.TestCase):
     def test_backend_get_unexistant_path(self):
         self.assertEqual(self.backend.get('/no/existing/path'), {})
 
+    def test_backend_get_many(self):
+        self.assertEqual(self.backend.get_many(['/some/path', '/no/existing/path']), {
+            '/some/path': self.value,
+            '/no/existing/path': {},
+        })
+
+    def test_backend_get_many_sequential(self):
+        backend = FakeBackend({'/some/path': self.raw_value}, max_concurrency=1)
+
+        self.assertEqual(backend.get_many(['/some/path']), {'/some/path': self.value})
+
+    def test_backend_get_many_error(self):
+        with mock.patch.object(self.backend, 'get_raw', side_effect=IOError):
+            with self.assertRaises(IOError):
+                self.backend.get_many(['/some/path', '/no/existing/path'])
+
+    def test_backend_get_lazy(self):
+        parser = mock.Mock(side_effect=json.loads)
+        backend = FakeBackend({'/some/path': self.raw_value}, parser=parser, lazy=True)
+
+        value = backend.get('/some/path')
+
+        self.assertEqual(parser.call_count, 0)
+        self.assertEqual(value, self.value)
+        self.assertEqual(parser.call_count, 1)
+
     def test_add_listeners(self):
         callback = mock.Mock(return_value=None)
         self.backend.add_listener(callback)
@@ -107,6 +133,120 @@ class BackendTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.backend.remove_listener(callback)
 
+    def test_path_listener(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.backend._notify_listeners(self.raw_value, '/some/path')
+
+        callback.assert_called_once_with(self.value)
+
+    def test_path_listener_not_notified_of_other_paths(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.backend._notify_listeners(self.raw_value, '/other/path')
+
+        self.assertEqual(callback.call_count, 0)
+
+    def test_global_listener_notified_of_any_path(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback)
+
+        self.backend._notify_listeners(self.raw_value, '/other/path')
+
+        callback.assert_called_once_with(self.value)
+
+    def test_notify_without_path_notify_all_listeners(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.backend._notify_listeners(self.raw_value)
+
+        callback.assert_called_once_with(self.value)
+
+    def test_remove_path_listener(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.backend.remove_listener(callback, '/some/path')
+
+        self.backend._notify_listeners(self.raw_value, '/some/path')
+
+        self.assertEqual(callback.call_count, 0)
+
+    def test_remove_path_listener_with_wrong_path(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        with self.assertRaises(ValueError):
+            self.backend.remove_listener(callback, '/other/path')
+
+    def test_notify_without_listeners_skip_parsing(self):
+        parser = mock.Mock()
+        backend = FakeBackend({}, parser=parser)
+
+        backend._notify_listeners(self.raw_value, '/some/path')
+
+        self.assertEqual(parser.call_count, 0)
+
+    def test_skip_unchanged_value(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.backend._notify_listeners(self.raw_value, '/some/path')
+        self.backend._notify_listeners(self.raw_value, '/some/path')
+
+        callback.assert_called_once_with(self.value)
+
+    def test_skip_unchanged_version(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.backend._notify_listeners(self.raw_value, '/some/path', 1)
+        with mock.patch('distconfig.backends.base._fingerprint') as fingerprint:
+            self.backend._notify_listeners(self.raw_value, '/some/path', 1)
+
+        callback.assert_called_once_with(self.value)
+        self.assertEqual(fingerprint.call_count, 0)
+
+    def test_skip_value_returned_by_get(self):
+        callback = mock.Mock(return_value=None)
+
+        self.backend.get('/some/path')
+        self.backend.add_listener(callback, '/some/path')
+        self.backend._notify_listeners(self.raw_value, '/some/path')
+
+        self.assertEqual(callback.call_count, 0)
+
+    def test_notify_value_returned_by_get_to_listeners(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.backend.get('/some/path')
+        self.backend._notify_listeners(self.raw_value, '/some/path')
+
+        callback.assert_called_once_with(self.value)
+
+    def test_notify_changed_value(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.backend._notify_listeners(self.raw_value, '/some/path')
+        self.backend._notify_listeners(None, '/some/path')
+        self.backend._notify_listeners(self.raw_value, '/some/path')
+
+        self.assertEqual(callback.call_args_list, [mock.call(self.value), mock.call({}), mock.call(self.value)])
+
+    def test_notify_without_path_never_skipped(self):
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback)
+
+        self.backend._notify_listeners(self.raw_value)
+        self.backend._notify_listeners(self.raw_value)
+
+        self.assertEqual(callback.call_count, 2)
+
     def test_listener_exception(self):
         callback = mock.Mock(side_effect=Exception('foo'))
         self.backend.add_listener(callback)
@@ -128,3 +268,114 @@ class BackendTestCase(unittest.TestCase):
             backend._notify_listeners(self.raw_value)
 
         self.assertTrue(logger_mock.exception.called)
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+        self.on_sleep = None
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        if self.on_sleep:
+            self.on_sleep()
+
+
+class CoalesceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('distconfig.backends.base.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.execution_context = mock.Mock()
+        self.backend = FakeBackend(
+            {}, execution_context=self.execution_context, coalesce_window=0.5, coalesce_max_delay=2)
+        self.callback = mock.Mock(return_value=None)
+        self.backend.add_listener(self.callback, '/some/path')
+        patcher = mock.patch.object(self.backend, '_start_dispatcher')
+        self.start_dispatcher = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def dispatch_pending(self):
+        self.assertEqual(self.start_dispatcher.call_count, 1)
+        self.backend._dispatch_pending()
+
+    def test_notify_latest_value(self):
+        self.backend._notify_listeners('{"v": 1}', '/some/path')
+        self.backend._notify_listeners('{"v": 2}', '/some/path')
+        self.backend._notify_listeners('{"v": 3}', '/some/path')
+
+        self.assertEqual(self.callback.call_count, 0)
+
+        self.dispatch_pending()
+
+        self.callback.assert_called_once_with({'v': 3})
+        self.assertEqual(self.backend.coalesce_stats, {'received': 3, 'coalesced': 2})
+
+    def test_window_extended_by_newer_value(self):
+        self.backend._notify_listeners('{"v": 1}', '/some/path')
+        values = iter(['{"v": 2}'])
+
+        def notify_once():
+            value = next(values, None)
+            if value:
+                self.backend._notify_listeners(value, '/some/path')
+        self.clock.on_sleep = notify_once
+
+        self.dispatch_pending()
+
+        self.callback.assert_called_once_with({'v': 2})
+        self.assertEqual(self.clock.now, 1001.0)
+
+    def test_max_delay(self):
+        self.backend._notify_listeners('{"v": 0}', '/some/path')
+        values = ('{"v": %d}' % i for i in range(1, 100))
+        self.clock.on_sleep = lambda: self.backend._notify_listeners(next(values), '/some/path')
+
+        self.dispatch_pending()
+
+        self.assertEqual(self.callback.call_count, 1)
+        self.assertEqual(self.clock.now, 1002.0)
+
+    def test_paths_coalesced_separately(self):
+        other_callback = mock.Mock(return_value=None)
+        self.backend.add_listener(other_callback, '/other/path')
+        self.backend._notify_listeners('{"v": 1}', '/some/path')
+        self.clock.now += 0.25
+        self.backend._notify_listeners('{"v": 2}', '/other/path')
+
+        self.dispatch_pending()
+
+        self.callback.assert_called_once_with({'v': 1})
+        other_callback.assert_called_once_with({'v': 2})
+        self.assertEqual(self.clock.now, 1000.75)
+        self.assertFalse(self.execution_context.run.called)
+
+    def test_dispatcher_restarted_after_pending_changes_dispatched(self):
+        self.backend._notify_listeners('{"v": 1}', '/some/path')
+        self.dispatch_pending()
+
+        self.backend._notify_listeners('{"v": 2}', '/some/path')
+
+        self.assertEqual(self.start_dispatcher.call_count, 2)
+
+    def test_dispatcher_start_failure(self):
+        self.start_dispatcher.side_effect = RuntimeError('can\'t start new thread')
+
+        self.backend._notify_listeners('{"v": 1}', '/some/path')
+        self.start_dispatcher.side_effect = None
+        self.backend._notify_listeners('{"v": 2}', '/some/path')
+
+        self.callback.assert_called_once_with({'v': 1})
+        self.assertEqual(self.start_dispatcher.call_count, 2)
+        self.assertEqual(self.backend.coalesce_stats, {'received': 2, 'coalesced': 0})
+
+    def test_notify_without_path_not_coalesced(self):
+        self.backend._notify_listeners('{"v": 1}')
+
+        self.callback.assert_called_once_with({'v': 1})
@@ -1,9 +1,12 @@
 # -*- encoding: utf8 -*-
-import six
-
+import json
+import threading
 import unittest
 
-from distconfig.config import Config
+import mock
+import six
+
+from distconfig.config import Config, LazyMapping, _PathCache, _build_index
 
 
 class ConfigTestCase(unittest.TestCase):
@@ -194,8 +197,302 @@ class InnerConfigTestCase(unittest.TestCase):
         self.assertEqual(inner.get('subinner/subnew'), 'subyay')
         self.assertEqual(subinner.get('subnew'), 'subyay')
 
+    def test_invalidate_return_changes(self):
+        changes = self.config._invalidate({
+            'inner': {
+                'foo': 'bar',
+                'subinner': {
+                    'baz': 'changed'
+                }
+            },
+            'new/key': 1
+        })
+
+        self.assertEqual(changes, frozenset(['inner/subinner/baz', 'another_inner', 'new\\/key']))
+
+    def test_invalidate_same_data(self):
+        data = self.config._data
+
+        changes = self.config._invalidate({
+            'inner': {'foo': 'bar', 'subinner': {'baz': 'taz'}},
+            'another_inner': {'foobar': 'wat?'}
+        })
+
+        self.assertEqual(changes, frozenset())
+        self.assertIs(self.config._data, data)
+
+    def test_invalidate_keep_unchanged_subtree_identity(self):
+        inner_data = self.config['inner']
+
+        self.config._invalidate({
+            'inner': {'foo': 'bar', 'subinner': {'baz': 'taz'}},
+            'another_inner': {'foobar': 'changed'}
+        })
+
+        self.assertIs(self.config['inner'], inner_data)
+
+    def test_invalidate_only_changed_inner_configs(self):
+        inner = self.config.get_config('inner')
+        another_inner = self.config.get_config('another_inner')
+        inner_listener = mock.Mock(return_value=None)
+        inner.add_listener(inner_listener)
+        another_inner_listener = mock.Mock(return_value=None)
+        another_inner.add_listener(another_inner_listener)
+
+        self.config._invalidate({
+            'inner': {'foo': 'bar', 'subinner': {'baz': 'taz'}},
+            'another_inner': {'foobar': 'changed'}
+        })
+
+        self.assertEqual(inner_listener.call_count, 0)
+        another_inner_listener.assert_called_once_with(frozenset(['foobar']))
+        self.assertEqual(another_inner['foobar'], 'changed')
+
+    def test_listener(self):
+        listener = mock.Mock(return_value=None)
+        self.config.add_listener(listener)
+
+        self.config._invalidate({})
+
+        listener.assert_called_once_with(frozenset(['inner', 'another_inner']))
+
+    def test_remove_listener(self):
+        listener = mock.Mock(return_value=None)
+        self.config.add_listener(listener)
+        self.config.remove_listener(listener)
+
+        self.config._invalidate({})
+
+        self.assertEqual(listener.call_count, 0)
+
+    def test_listener_exception(self):
+        listener = mock.Mock(side_effect=ValueError)
+        self.config.add_listener(listener)
+        another_listener = mock.Mock(return_value=None)
+        self.config.add_listener(another_listener)
+
+        with self.assertRaises(ValueError):
+            self.config._invalidate({})
+
+        self.assertEqual(another_listener.call_count, 1)
+
     def test_identity_inner_config(self):
         inner1 = self.config.get_config('inner')
         inner2 = self.config.get_config('inner')
 
         self.assertIs(inner1, inner2)
+
+
+class IndexedConfigTestCase(ConfigTestCase):
+
+    def setUp(self):
+        super(IndexedConfigTestCase, self).setUp()
+        self.config = Config(self.test_data, index=True)
+
+    def test_index_updated_on_invalidate(self):
+        self.config._invalidate({'new': {'key': 'value'}})
+
+        self.assertEqual(self.config['new/key'], 'value')
+        self.assertNotIn('outer', self.config)
+
+    def test_inner_config_indexed(self):
+        inner_config = self.config.get_config('inner')
+
+        self.assertEqual(inner_config._index, {('integer',): 1, ('float',): 1.4, ('boolean',): True,
+                                               ('unicode',): u'Straße', ('bytes',): six.b('bytes')})
+
+
+class LazyConfigTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = mock.Mock(side_effect=json.loads)
+        self.config = Config(LazyMapping('{"inner": {"foo": "bar"}}', self.parser))
+
+    def test_parse_on_first_access(self):
+        self.assertEqual(self.parser.call_count, 0)
+
+        self.assertEqual(self.config['inner/foo'], 'bar')
+        self.assertEqual(self.config.get('inner/foo'), 'bar')
+
+        self.assertEqual(self.parser.call_count, 1)
+
+    def test_parse_not_mapping(self):
+        config = Config(LazyMapping('[]', json.loads))
+
+        with self.assertRaises(TypeError):
+            config['foo']
+
+    def test_invalidate_without_parsing_under_lock(self):
+        lock = self.config._Config__inner_configs_lock = mock.MagicMock()
+
+        self.assertIsNone(self.config._invalidate(LazyMapping('{"inner": {"foo": "baz"}}', self.parser)))
+
+        self.assertTrue(lock.__enter__.called)
+        self.assertEqual(self.parser.call_count, 0)
+
+    def test_invalidate_without_parsing(self):
+        parser = mock.Mock(side_effect=json.loads)
+
+        changes = self.config._invalidate(LazyMapping('{"inner": {"foo": "baz"}}', parser))
+
+        self.assertIsNone(changes)
+        self.assertEqual(self.parser.call_count, 0)
+        self.assertEqual(parser.call_count, 0)
+        self.assertEqual(self.config['inner/foo'], 'baz')
+
+    def test_parse_error_not_retried(self):
+        parser = mock.Mock(side_effect=ValueError('malformed'))
+        config = Config(LazyMapping('{"inner":', parser))
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                config['inner']
+
+        self.assertEqual(parser.call_count, 1)
+
+    def test_invalidate_malformed_keep_previous_data(self):
+        self.assertEqual(self.config['inner/foo'], 'bar')
+        parser = mock.Mock(side_effect=ValueError('malformed'))
+
+        self.config._invalidate(LazyMapping('{"inner":', parser))
+
+        self.assertEqual(self.config['inner/foo'], 'bar')
+        self.assertEqual(self.config.get('inner/foo'), 'bar')
+        self.assertEqual(parser.call_count, 1)
+        self.assertIsInstance(self.config._data.error, ValueError)
+
+    def test_invalidate_malformed_after_unread_update(self):
+        self.assertEqual(self.config['inner/foo'], 'bar')
+        self.config._invalidate(LazyMapping('{"inner": {"foo": "baz"}}', json.loads))
+
+        self.config._invalidate(LazyMapping('{"inner":', json.loads))
+
+        self.assertEqual(self.config['inner/foo'], 'bar')
+
+    def test_invalidate_malformed_with_inner_config(self):
+        inner = self.config.get_config('inner')
+
+        with self.assertRaises(ValueError):
+            self.config._invalidate(LazyMapping('{"inner":', json.loads))
+
+        self.assertEqual(self.config['inner/foo'], 'bar')
+        self.assertEqual(inner['foo'], 'bar')
+
+    def test_invalidate_with_inner_config(self):
+        inner = self.config.get_config('inner')
+
+        changes = self.config._invalidate(LazyMapping('{"inner": {"foo": "baz"}}', json.loads))
+
+        self.assertEqual(changes, frozenset(['inner/foo']))
+        self.assertEqual(inner['foo'], 'baz')
+
+
+class SnapshotTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Config({'a': {'x': 0}, 'b': {'x': 0}}, index=True)
+
+    def test_snapshot_pinned(self):
+        snapshot = self.config.snapshot()
+
+        self.config._invalidate({'a': {'x': 1}, 'b': {'x': 1}})
+
+        self.assertEqual(snapshot.get('a/x'), 0)
+        self.assertEqual(snapshot.get_config('b')['x'], 0)
+        self.assertEqual(self.config.get('a/x'), 1)
+
+    def test_snapshot_shares_data(self):
+        snapshot = self.config.snapshot()
+
+        self.assertIs(snapshot._data, self.config._data)
+        self.assertIs(snapshot._index, self.config._index)
+
+    def test_version(self):
+        self.assertEqual(self.config.version, 0)
+
+        self.config._invalidate({'a': {'x': 1}, 'b': {'x': 0}})
+        self.config._invalidate({'a': {'x': 1}, 'b': {'x': 0}})
+
+        self.assertEqual(self.config.version, 1)
+        self.assertEqual(self.config.snapshot().version, 1)
+
+    def test_snapshot_inner_config_reuse_live_index(self):
+        live = self.config.get_config('a')
+
+        with mock.patch('distconfig.config._build_index') as build_index:
+            inner = self.config.snapshot().get_config('a')
+
+        self.assertIs(inner._snapshot, live._snapshot)
+        self.assertFalse(build_index.called)
+
+    def test_snapshot_inner_config_index_shared_by_version(self):
+        with mock.patch('distconfig.config._build_index', wraps=_build_index) as build_index:
+            first = self.config.snapshot().get_config('b')
+            second = self.config.snapshot().get_config('b')
+
+            self.assertEqual(build_index.call_count, 1)
+            self.assertIs(first._index, second._index)
+
+            self.config._invalidate({'a': {'x': 0}, 'b': {'x': 1}})
+            third = self.config.snapshot().get_config('b')
+
+        self.assertEqual(first['x'], 0)
+        self.assertEqual(third['x'], 1)
+
+    def test_snapshot_inner_config_default_not_shared(self):
+        self.assertEqual(self.config.snapshot().get_config('c', default={'x': 1}), {'x': 1})
+        self.assertEqual(self.config.snapshot().get_config('c', default={'x': 2}), {'x': 2})
+
+    def test_snapshot_nested_inner_config(self):
+        config = Config({'a': {'b': {'x': 0}}}, index=True)
+        outer = config.get_config('a')
+        live = outer.get_config('b')
+        snapshot = config.snapshot()
+
+        config._invalidate({'a': {'b': {'x': 1}}})
+
+        self.assertEqual(snapshot.get_config('a').get_config('b')['x'], 0)
+        self.assertIsNot(snapshot.get_config('a').get_config('b')._snapshot, live._snapshot)
+        self.assertIs(config.snapshot().get_config('a').get_config('b')._snapshot, live._snapshot)
+
+    def test_snapshot_consistent_during_updates(self):
+        self.config.get_config('a')
+        stop = threading.Event()
+
+        def update():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                self.config._invalidate({'a': {'x': i}, 'b': {'x': i}})
+
+        thread = threading.Thread(target=update)
+        thread.start()
+        try:
+            for _ in range(10000):
+                snapshot = self.config.snapshot()
+                self.assertEqual(snapshot.get('a/x'), snapshot.get_config('b').get('x'))
+        finally:
+            stop.set()
+            thread.join()
+
+
+class PathCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = _PathCache(maxsize=2)
+
+    def test_compile_path(self):
+        self.assertEqual(self.cache.get('a/b/c'), ('a', 'b', 'c'))
+
+    def test_compile_escaped_path(self):
+        self.assertEqual(self.cache.get('a\\/b/c'), ('a/b', 'c'))
+
+    def test_compiled_path_is_memoized(self):
+        self.assertIs(self.cache.get('a/b/c'), self.cache.get('a/b/c'))
+
+    def test_cache_is_bounded(self):
+        self.cache.get('a')
+        self.cache.get('b')
+        self.cache.get('c')
+
+        self.assertEqual(len(self.cache), 1)
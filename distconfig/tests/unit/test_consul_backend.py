@@ -0,0 +1,249 @@
+import unittest
+
+import mock
+
+from distconfig.backends.consul import ConsulBackend
+
+
+class StopWatching(BaseException):
+    pass
+
+
+def kv_item(key, value, modify_index):
+    return {'Key': key, 'Value': value, 'ModifyIndex': modify_index}
+
+
+class ConsulBackendTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.client = mock.Mock()
+        self.execution_context = mock.Mock()
+        self.backend = ConsulBackend(
+            self.client, execution_context=self.execution_context, watch_prefixes=['service/', 'service/inner/'])
+
+    def test_watch_key(self):
+        self.client.kv.get.return_value = (1, None)
+
+        self.backend.get_raw('other/key')
+
+        self.execution_context.run.assert_called_once_with(self.backend._watch_for_changes, 'other/key')
+
+    def test_watch_prefix(self):
+        self.client.kv.get.return_value = (1, None)
+
+        self.backend.get_raw('service/a')
+        self.backend.get_raw('service/b')
+
+        self.execution_context.run.assert_called_once_with(self.backend._watch_prefix_for_changes, 'service/')
+
+    def test_watch_longest_prefix(self):
+        self.client.kv.get.return_value = (1, None)
+
+        self.backend.get_raw('service/inner/a')
+
+        self.execution_context.run.assert_called_once_with(self.backend._watch_prefix_for_changes, 'service/inner/')
+
+    def test_watch_key_retried_when_watcher_not_started(self):
+        self.client.kv.get.return_value = (1, None)
+        self.execution_context.run.side_effect = [RuntimeError('saturated'), None]
+
+        with self.assertRaises(RuntimeError):
+            self.backend.get_raw('other/key')
+        self.backend.get_raw('other/key')
+
+        self.assertEqual(self.execution_context.run.call_count, 2)
+        self.assertEqual(self.backend._watching, set(['other/key']))
+
+    def test_watch_prefix_retried_when_watcher_not_started(self):
+        self.client.kv.get.return_value = (1, None)
+        self.execution_context.run.side_effect = [RuntimeError('saturated'), None]
+
+        with self.assertRaises(RuntimeError):
+            self.backend.get_raw('service/a')
+        self.assertNotIn('service/', self.backend._prefix_keys)
+        self.backend.get_raw('service/a')
+
+        self.assertEqual(self.execution_context.run.call_count, 2)
+        self.assertEqual(self.backend._prefix_keys['service/'], set(['service/a']))
+
+    def test_get_raw_many(self):
+        self.client.kv.get.side_effect = [
+            (1, [kv_item('service/a', '1', 1), kv_item('service/c', '3', 1)]),
+            (1, {'Value': '4'}),
+        ]
+
+        values = self.backend.get_raw_many(['service/a', 'service/b', 'other/key'])
+
+        self.assertEqual(values, {'service/a': '1', 'service/b': None, 'other/key': '4'})
+        self.assertEqual(self.client.kv.get.call_args_list, [
+            mock.call('service/', recurse=True),
+            mock.call('other/key'),
+        ])
+        self.assertEqual(self.execution_context.run.call_count, 2)
+
+    def test_get_raw_many_single_key_under_prefix(self):
+        self.client.kv.get.return_value = (1, {'Value': '1'})
+
+        self.assertEqual(self.backend.get_raw_many(['service/a']), {'service/a': '1'})
+        self.client.kv.get.assert_called_once_with('service/a')
+
+    def test_prefix_watcher_notify_changed_keys(self):
+        self.client.kv.get.return_value = (1, None)
+        self.backend.get_raw('service/a')
+        self.backend.get_raw('service/b')
+        self.backend.get_raw('service/c')
+
+        self.client.kv.get.side_effect = [
+            (1, [kv_item('service/a', '1', 1), kv_item('service/b', '1', 1), kv_item('service/c', '1', 1)]),
+            (2, [kv_item('service/a', '2', 2), kv_item('service/b', '1', 1)]),
+            StopWatching(),
+        ]
+        with mock.patch.object(self.backend, '_notify_listeners') as notify:
+            with self.assertRaises(StopWatching):
+                self.backend._watch_prefix_for_changes('service/')
+
+        self.assertEqual(notify.call_args_list[3:], [
+            mock.call('2', 'service/a', 2),
+            mock.call(None, 'service/c', None),
+        ])
+        self.client.kv.get.assert_called_with('service/', index=2, recurse=True)
+
+    def test_prefix_watcher_ignore_unwatched_keys(self):
+        self.client.kv.get.side_effect = [
+            (1, [kv_item('service/unwatched', '1', 1)]),
+            StopWatching(),
+        ]
+        with mock.patch.object(self.backend, '_notify_listeners') as notify:
+            with self.assertRaises(StopWatching):
+                self.backend._watch_prefix_for_changes('service/')
+
+        self.assertEqual(notify.call_count, 0)
+
+    def test_prefix_watcher_ignore_keys_of_longer_prefix(self):
+        self.client.kv.get.return_value = (1, None)
+        self.backend.get_raw('service/inner/a')
+
+        self.client.kv.get.side_effect = [
+            (1, [kv_item('service/inner/a', '1', 1)]),
+            StopWatching(),
+        ]
+        with mock.patch.object(self.backend, '_notify_listeners') as notify:
+            with self.assertRaises(StopWatching):
+                self.backend._watch_prefix_for_changes('service/')
+
+        self.assertEqual(notify.call_count, 0)
+
+    def test_prefix_watcher_survive_listener_exception(self):
+        self.client.kv.get.return_value = (1, None)
+        self.backend.get_raw('service/a')
+        self.backend.get_raw('service/b')
+
+        self.client.kv.get.side_effect = [
+            (1, [kv_item('service/a', '1', 1), kv_item('service/b', '1', 1)]),
+            StopWatching(),
+        ]
+        with mock.patch.object(self.backend, '_notify_listeners', side_effect=Exception) as notify:
+            with self.assertRaises(StopWatching):
+                self.backend._watch_prefix_for_changes('service/')
+
+        self.assertEqual(notify.call_count, 2)
+
+    def test_watcher_stop_on_shutdown(self):
+        self.execution_context.running = False
+
+        self.backend._watch_for_changes('other/key')
+        self.backend._watch_prefix_for_changes('service/')
+
+        self.assertEqual(self.client.kv.get.call_count, 0)
+
+
+class ConsulBackendConsistencyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.client = mock.Mock()
+        self.client.kv.get.return_value = (1, {'Value': '1'})
+        self.execution_context = mock.Mock()
+        self.backend = ConsulBackend(
+            self.client, execution_context=self.execution_context, watch_prefixes=['service/'],
+            consistency='stale', wait=30, key_options={'critical/': {'consistency': 'consistent', 'wait': '1m'}})
+
+    def test_invalid_consistency(self):
+        with self.assertRaises(ValueError):
+            ConsulBackend(self.client, consistency='eventual')
+        with self.assertRaises(ValueError):
+            ConsulBackend(self.client, key_options={'key': {'consistency': 'eventual'}})
+
+    def test_default_options(self):
+        backend = ConsulBackend(self.client, execution_context=self.execution_context)
+
+        backend.get_raw('key')
+
+        self.client.kv.get.assert_called_once_with('key')
+
+    def test_get_raw_consistency(self):
+        self.backend.get_raw('key')
+        self.backend.get_raw('critical/key')
+
+        self.assertEqual(self.client.kv.get.call_args_list, [
+            mock.call('key', consistency='stale'),
+            mock.call('critical/key', consistency='consistent'),
+        ])
+
+    def test_watch_wait(self):
+        self.client.kv.get.side_effect = [(2, None), StopWatching(), (2, None), StopWatching()]
+
+        with self.assertRaises(StopWatching):
+            self.backend._watch_for_changes('key')
+        with self.assertRaises(StopWatching):
+            self.backend._watch_for_changes('critical/key')
+
+        self.assertEqual(self.client.kv.get.call_args_list, [
+            mock.call('key', index=None, wait='30s', consistency='stale'),
+            mock.call('key', index=2, wait='30s', consistency='stale'),
+            mock.call('critical/key', index=None, wait='1m', consistency='consistent'),
+            mock.call('critical/key', index=2, wait='1m', consistency='consistent'),
+        ])
+
+    def test_watch_prefix_wait(self):
+        self.client.kv.get.side_effect = [(2, []), StopWatching()]
+
+        with self.assertRaises(StopWatching):
+            self.backend._watch_prefix_for_changes('service/')
+
+        self.client.kv.get.assert_called_with('service/', index=2, wait='30s', recurse=True, consistency='stale')
+
+    def test_stale_read_older_index_read_again(self):
+        self.client.kv.get.side_effect = [(5, {'Value': '2'}), (3, {'Value': '1'}), (6, {'Value': '3'})]
+
+        self.assertEqual(self.backend.get_raw('key'), '2')
+        self.assertEqual(self.backend.get_raw('key'), '3')
+
+        self.assertEqual(self.client.kv.get.call_args_list[1:], [
+            mock.call('key', consistency='stale'),
+            mock.call('key', consistency='default'),
+        ])
+
+    def test_stale_watch_older_index_read_again(self):
+        self.client.kv.get.side_effect = [
+            (5, {'Value': '2'}), (3, kv_item('key', '1', 3)), (5, kv_item('key', '2', 5)), StopWatching()]
+        self.backend.get_raw('key')
+
+        with mock.patch.object(self.backend, '_notify_listeners') as notify:
+            with self.assertRaises(StopWatching):
+                self.backend._watch_for_changes('key')
+
+        notify.assert_called_once_with('2', 'key', 5)
+
+        self.assertEqual(self.client.kv.get.call_args_list[1:], [
+            mock.call('key', index=None, wait='30s', consistency='stale'),
+            mock.call('key', consistency='default'),
+            mock.call('key', index=5, wait='30s', consistency='stale'),
+        ])
+
+    def test_consistent_read_older_index_not_read_again(self):
+        self.client.kv.get.side_effect = [(5, {'Value': '2'}), (3, {'Value': '1'})]
+
+        self.backend.get_raw('critical/key')
+
+        self.assertEqual(self.backend.get_raw('critical/key'), '1')
+        self.assertEqual(self.client.kv.get.call_count, 2)
@@ -0,0 +1,143 @@
+import unittest
+
+import mock
+from etcd import EtcdEventIndexCleared, EtcdKeyNotFound
+
+from distconfig.backends.etcd import EtcdBackend
+
+
+class StopWatching(BaseException):
+    pass
+
+
+def etcd_node(key, value, action='set', modified_index=1):
+    return mock.Mock(key=key, value=value, action=action, modifiedIndex=modified_index)
+
+
+def etcd_directory(nodes, etcd_index):
+    return mock.Mock(leaves=nodes, etcd_index=etcd_index)
+
+
+class EtcdBackendTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.client = mock.Mock()
+        self.client.get.side_effect = EtcdKeyNotFound
+        self.execution_context = mock.Mock()
+        self.backend = EtcdBackend(
+            self.client, execution_context=self.execution_context, watch_directories=['/service', '/service/inner/'])
+
+    def test_watch_key(self):
+        self.backend.get_raw('/other/key')
+
+        self.execution_context.run.assert_called_once_with(self.backend._watch_for_changes, '/other/key')
+
+    def test_watch_directory(self):
+        self.backend.get_raw('/service/a')
+        self.backend.get_raw('service/b')
+
+        self.execution_context.run.assert_called_once_with(self.backend._watch_directory_for_changes, '/service')
+
+    def test_watch_deepest_directory(self):
+        self.backend.get_raw('/service/inner/a')
+
+        self.execution_context.run.assert_called_once_with(self.backend._watch_directory_for_changes, '/service/inner')
+
+    def test_watch_key_retried_when_watcher_not_started(self):
+        self.execution_context.run.side_effect = [RuntimeError('saturated'), None]
+
+        with self.assertRaises(RuntimeError):
+            self.backend.get_raw('/other/key')
+        self.backend.get_raw('/other/key')
+
+        self.assertEqual(self.execution_context.run.call_count, 2)
+        self.assertEqual(self.backend._watching, set(['/other/key']))
+
+    def test_watch_directory_retried_when_watcher_not_started(self):
+        self.execution_context.run.side_effect = [RuntimeError('saturated'), None]
+
+        with self.assertRaises(RuntimeError):
+            self.backend.get_raw('/service/a')
+        self.assertNotIn('/service', self.backend._directory_keys)
+        self.backend.get_raw('/service/a')
+
+        self.assertEqual(self.execution_context.run.call_count, 2)
+        self.assertIn('/service', self.backend._directory_keys)
+
+    def test_get_raw_many(self):
+        self.client.read.return_value = etcd_directory([etcd_node('/service/a', '1')], etcd_index=10)
+
+        values = self.backend.get_raw_many(['/service/a', 'service/b', '/other/key'])
+
+        self.assertEqual(values, {'/service/a': '1', 'service/b': None, '/other/key': None})
+        self.client.read.assert_called_once_with('/service', recursive=True)
+        self.client.get.assert_called_once_with('/other/key')
+        self.assertEqual(self.execution_context.run.call_count, 2)
+
+    def test_get_raw_many_missing_directory(self):
+        self.client.read.side_effect = EtcdKeyNotFound
+
+        values = self.backend.get_raw_many(['/service/a', '/service/b'])
+
+        self.assertEqual(values, {'/service/a': None, '/service/b': None})
+
+    def test_directory_watcher_route_events(self):
+        self.backend.get_raw('/service/a')
+        self.backend.get_raw('service/b')
+        self.backend.get_raw('/service/inner/c')
+
+        self.client.read.return_value = etcd_directory([etcd_node('/service/a', '1')], etcd_index=10)
+        self.client.watch.side_effect = [
+            etcd_node('/service/b', '2', modified_index=12),
+            etcd_node('/service/a', None, action='delete', modified_index=15),
+            etcd_node('/service/inner/c', '3', modified_index=16),
+            StopWatching(),
+        ]
+        with mock.patch.object(self.backend, '_notify_listeners') as notify:
+            with self.assertRaises(StopWatching):
+                self.backend._watch_directory_for_changes('/service')
+
+        self.assertEqual(len(notify.call_args_list), 4)
+        self.assertIn(mock.call('1', '/service/a', None), notify.call_args_list[:2])
+        self.assertIn(mock.call(None, 'service/b', None), notify.call_args_list[:2])
+        self.assertEqual(notify.call_args_list[2:], [
+            mock.call('2', 'service/b', 12),
+            mock.call(None, '/service/a', 15),
+        ])
+        self.assertEqual(self.client.watch.call_args_list, [
+            mock.call('/service', index=11, recursive=True),
+            mock.call('/service', index=13, recursive=True),
+            mock.call('/service', index=16, recursive=True),
+            mock.call('/service', index=17, recursive=True),
+        ])
+
+    def test_directory_watcher_keep_index_on_error(self):
+        self.client.read.return_value = etcd_directory([], etcd_index=10)
+        self.client.watch.side_effect = [Exception('connection lost'), StopWatching()]
+
+        with self.assertRaises(StopWatching):
+            self.backend._watch_directory_for_changes('/service')
+
+        self.assertEqual(self.client.watch.call_args_list, [
+            mock.call('/service', index=11, recursive=True),
+            mock.call('/service', index=11, recursive=True),
+        ])
+
+    def test_directory_watcher_resync_on_index_cleared(self):
+        self.backend.get_raw('/service/a')
+
+        self.client.read.side_effect = [
+            etcd_directory([etcd_node('/service/a', '1')], etcd_index=10),
+            etcd_directory([etcd_node('/service/a', '2')], etcd_index=2000),
+        ]
+        self.client.watch.side_effect = [EtcdEventIndexCleared('cleared'), StopWatching()]
+
+        with mock.patch.object(self.backend, '_notify_listeners') as notify:
+            with self.assertRaises(StopWatching):
+                self.backend._watch_directory_for_changes('/service')
+
+        self.assertEqual(notify.call_args_list, [
+            mock.call('1', '/service/a', None),
+            mock.call('2', '/service/a', None),
+        ])
+        self.client.watch.assert_called_with('/service', index=2001, recursive=True)
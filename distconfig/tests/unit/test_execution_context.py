@@ -0,0 +1,132 @@
+import threading
+import unittest
+
+import mock
+
+from distconfig.backends.base import BaseBackend
+from distconfig.backends.execution_context import ThreadPoolExecutionContext, ThreadingExecutionContext
+from distconfig.tests.unit.utils import wait_for
+
+
+class ThreadPoolExecutionContextTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = mock.Mock()
+        self.execution_context = ThreadPoolExecutionContext(max_workers=2, logger=self.logger)
+        self.release = threading.Event()
+        self.addCleanup(self.execution_context.shutdown)
+        self.addCleanup(self.release.set)
+
+    def run_blocking(self, count):
+        started = [threading.Event() for _ in range(count)]
+        for event in started:
+            self.execution_context.run(self._block, event)
+        return started
+
+    def _block(self, started):
+        started.set()
+        self.release.wait(5)
+
+    def test_wrong_max_workers(self):
+        with self.assertRaises(ValueError):
+            ThreadPoolExecutionContext(max_workers=0)
+
+    def test_run(self):
+        done = threading.Event()
+
+        self.execution_context.run(done.set)
+
+        self.assertTrue(done.wait(5))
+
+    def test_reuse_idle_worker(self):
+        for _ in range(3):
+            done = threading.Event()
+            self.execution_context.run(done.set)
+            done.wait(5)
+
+        self.assertEqual(self.execution_context.workers, 1)
+
+    def test_workers_bounded(self):
+        started = self.run_blocking(2)
+
+        self.assertTrue(started[0].wait(5))
+        self.assertTrue(started[1].wait(5))
+        self.assertTrue(self.execution_context.saturated)
+        with self.assertRaises(RuntimeError):
+            self.execution_context.run(mock.Mock())
+        self.assertEqual(self.execution_context.workers, 2)
+        self.assertTrue(self.logger.error.called)
+
+    def test_worker_reused_when_function_returns(self):
+        self.run_blocking(2)
+        self.release.set()
+        done = threading.Event()
+
+        self.assertTrue(wait_for(lambda: not self.execution_context.saturated))
+        self.execution_context.run(done.set)
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(self.execution_context.workers, 2)
+
+    def test_function_exception_logged(self):
+        done = threading.Event()
+
+        self.execution_context.run(mock.Mock(side_effect=Exception('foo')))
+        self.execution_context.run(done.set)
+
+        self.assertTrue(done.wait(5))
+        self.assertTrue(self.logger.exception.called)
+
+    def test_run_after_shutdown(self):
+        self.execution_context.shutdown()
+
+        self.assertFalse(self.execution_context.running)
+        with self.assertRaises(RuntimeError):
+            self.execution_context.run(mock.Mock())
+
+
+class ExecutionContextShutdownTestCase(unittest.TestCase):
+
+    def test_shutdown(self):
+        execution_context = ThreadingExecutionContext()
+        self.assertTrue(execution_context.running)
+
+        execution_context.shutdown()
+
+        self.assertFalse(execution_context.running)
+
+    def test_sleep(self):
+        execution_context = ThreadingExecutionContext()
+
+        self.assertTrue(execution_context.sleep(0.01))
+
+    def test_sleep_interrupted_by_shutdown(self):
+        execution_context = ThreadingExecutionContext()
+        results = []
+        execution_context.run(lambda: results.append(execution_context.sleep(60)))
+
+        execution_context.shutdown()
+
+        self.assertTrue(wait_for(lambda: results == [False]), results)
+
+    def test_sleep_subclass_without_init(self):
+        class Context(ThreadingExecutionContext):
+            def __init__(self):
+                pass
+
+        execution_context = Context()
+        self.assertTrue(execution_context.sleep(0))
+
+        execution_context.shutdown()
+
+        self.assertFalse(execution_context.sleep(60))
+
+    def test_backends_own_default_execution_context(self):
+        class Backend(BaseBackend):
+            get_raw = None
+
+        backend, other = Backend(), Backend()
+        backend._execution_context.shutdown()
+
+        self.assertIsInstance(other._execution_context, ThreadingExecutionContext)
+        self.assertTrue(other._execution_context.running)
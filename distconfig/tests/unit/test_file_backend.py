@@ -0,0 +1,181 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from distconfig.backends import file as file_backend
+from distconfig.backends.execution_context import ThreadingExecutionContext
+from distconfig.backends.file import FileBackend
+from distconfig.tests.unit.utils import wait_for
+
+
+try:
+    file_backend._Inotify().close()
+except OSError:
+    HAS_INOTIFY = False
+else:
+    HAS_INOTIFY = True
+
+
+class FileBackendTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.execution_context = ThreadingExecutionContext()
+        self.addCleanup(self.execution_context.shutdown)
+        self.backend = FileBackend(self.directory, execution_context=self.execution_context)
+        self.backend.watch_timeout = 0.1
+
+    def write(self, path, value):
+        filename = os.path.join(self.directory, path)
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        with open(filename, 'w') as f:
+            json.dump(value, f)
+
+    def listen(self, path):
+        values = []
+        self.backend.add_listener(values.append, path)
+        return values
+
+    def test_get(self):
+        self.write('service/config', {'foo': 'bar'})
+
+        self.assertEqual(self.backend.get('/service/config'), {'foo': 'bar'})
+
+    def test_get_missing(self):
+        self.assertEqual(self.backend.get('/service/config'), {})
+
+    def test_get_outside_directory(self):
+        with self.assertRaises(ValueError):
+            self.backend.get('../config')
+
+    def test_get_many(self):
+        self.write('foo', {'foo': 1})
+
+        self.assertEqual(self.backend.get_many(['foo', 'bar']), {'foo': {'foo': 1}, 'bar': {}})
+
+    @unittest.skipUnless(HAS_INOTIFY, 'inotify is not available')
+    def test_watch_retried_when_watcher_not_started(self):
+        execution_context = mock.Mock()
+        execution_context.run.side_effect = [RuntimeError('saturated'), None]
+        backend = FileBackend(self.directory, execution_context=execution_context)
+
+        close = file_backend._Inotify.close
+        with mock.patch.object(file_backend._Inotify, 'close', autospec=True, side_effect=close) as inotify_close:
+            with self.assertRaises(RuntimeError):
+                backend.get('config')
+        self.assertEqual(inotify_close.call_count, 1)
+        self.assertIsNone(backend._inotify)
+        backend.get('config')
+
+        execution_context.run.assert_called_with(backend._watch_for_changes)
+        self.assertEqual(execution_context.run.call_count, 2)
+        self.assertIsNotNone(backend._inotify)
+        backend._inotify.close()
+
+    @unittest.skipUnless(HAS_INOTIFY, 'inotify is not available')
+    def test_watch_write(self):
+        self.write('config', {'foo': 1})
+        self.backend.get('config')
+        values = self.listen('config')
+
+        self.write('config', {'foo': 2})
+
+        self.assertTrue(wait_for(lambda: values == [{'foo': 2}]), values)
+
+    @unittest.skipUnless(HAS_INOTIFY, 'inotify is not available')
+    def test_watch_delete(self):
+        self.write('config', {'foo': 1})
+        self.backend.get('config')
+        values = self.listen('config')
+
+        os.unlink(os.path.join(self.directory, 'config'))
+
+        self.assertTrue(wait_for(lambda: values == [{}]), values)
+
+    @unittest.skipUnless(HAS_INOTIFY, 'inotify is not available')
+    def test_watch_missing_directory(self):
+        self.backend.get('service/nested/config')
+        values = self.listen('service/nested/config')
+
+        self.write('service/nested/config', {'foo': 1})
+
+        self.assertTrue(wait_for(lambda: values == [{'foo': 1}]), values)
+
+        shutil.rmtree(os.path.join(self.directory, 'service'))
+        self.assertTrue(wait_for(lambda: values == [{'foo': 1}, {}]), values)
+
+        self.write('service/nested/config', {'foo': 2})
+        self.assertTrue(wait_for(lambda: values == [{'foo': 1}, {}, {'foo': 2}]), values)
+
+    @unittest.skipUnless(HAS_INOTIFY, 'inotify is not available')
+    def test_watch_symlink_swap(self):
+        # Layout of Kubernetes ConfigMap volumes.
+        def update(version, value):
+            self.write('..%d/config' % version, value)
+            os.symlink('..%d' % version, os.path.join(self.directory, '..data_tmp'))
+            os.rename(os.path.join(self.directory, '..data_tmp'), os.path.join(self.directory, '..data'))
+            if version > 1:
+                shutil.rmtree(os.path.join(self.directory, '..%d' % (version - 1)))
+
+        update(1, {'foo': 1})
+        os.symlink('..data/config', os.path.join(self.directory, 'config'))
+        self.assertEqual(self.backend.get('config'), {'foo': 1})
+        values = self.listen('config')
+
+        update(2, {'foo': 2})
+
+        self.assertTrue(wait_for(lambda: values == [{'foo': 2}]), values)
+
+    def test_poll_without_inotify(self):
+        self.backend = FileBackend(self.directory, execution_context=self.execution_context, poll_interval=0.01)
+        self.write('config', {'foo': 1})
+        with mock.patch('distconfig.backends.file._Inotify', side_effect=OSError('not available')):
+            self.backend.get('config')
+        values = self.listen('config')
+
+        self.write('config', {'foo': 2})
+
+        self.assertTrue(wait_for(lambda: values == [{'foo': 2}]), values)
+
+    @unittest.skipUnless(HAS_INOTIFY, 'inotify is not available')
+    def test_close(self):
+        self.write('config', {'foo': 1})
+        self.backend.get('config')
+        values = self.listen('config')
+        inotify = self.backend._inotify
+
+        with mock.patch.object(inotify, 'close', wraps=inotify.close) as close:
+            self.backend.close()
+            self.assertTrue(wait_for(lambda: close.called))
+        self.write('config', {'foo': 2})
+
+        self.assertEqual(self.backend.get('config'), {'foo': 2})
+        self.assertIsNone(self.backend._inotify)
+        self.assertEqual(values, [])
+
+    @unittest.skipUnless(HAS_INOTIFY, 'inotify is not available')
+    def test_close_on_shutdown(self):
+        self.backend.get('config')
+        inotify = self.backend._inotify
+
+        with mock.patch.object(inotify, 'close', wraps=inotify.close) as close:
+            self.execution_context.shutdown()
+            self.assertTrue(wait_for(lambda: close.called))
+
+    def test_close_poll_without_inotify(self):
+        self.backend = FileBackend(self.directory, execution_context=self.execution_context, poll_interval=0.01)
+        self.write('config', {'foo': 1})
+        with mock.patch('distconfig.backends.file._Inotify', side_effect=OSError('not available')):
+            self.backend.get('config')
+        values = self.listen('config')
+
+        self.backend.close()
+        self.write('config', {'foo': 2})
+
+        self.assertFalse(wait_for(lambda: values, timeout=0.1), values)
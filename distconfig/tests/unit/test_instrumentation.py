@@ -0,0 +1,112 @@
+import json
+import unittest
+
+import mock
+
+from distconfig import instrumentation
+from distconfig.backends.consul import ConsulBackend
+from distconfig.config import Config
+from distconfig.instrumentation import Instrumentation, MemoryInstrumentation
+from distconfig.tests.unit.test_backend import FakeBackend
+
+
+class MemoryInstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.instrumentation = MemoryInstrumentation()
+
+    def test_timings(self):
+        self.instrumentation.parse('/foo', 1.0)
+        self.instrumentation.parse('/bar', 3.0)
+
+        self.assertEqual(self.instrumentation.timings(), {
+            'parse': {'count': 2, 'total': 4.0, 'min': 1.0, 'max': 3.0, 'mean': 2.0},
+        })
+
+    def test_counters(self):
+        self.instrumentation.notify('/foo', 10, 1.0)
+        self.instrumentation.callback('/foo', None, 1.0, ValueError())
+        self.instrumentation.watch_error('/foo', ValueError())
+
+        self.assertEqual(self.instrumentation.counters(), {
+            'notified_listeners': 10,
+            'callback_errors': 1,
+            'watch_errors': 1,
+        })
+
+    def test_reset(self):
+        self.instrumentation.lookup('foo', False)
+
+        self.instrumentation.reset()
+
+        self.assertEqual(self.instrumentation.counters(), {})
+        self.assertEqual(self.instrumentation.timings(), {})
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.instrumentation = MemoryInstrumentation()
+        previous = instrumentation.set_instrumentation(self.instrumentation)
+        self.addCleanup(instrumentation.set_instrumentation, previous)
+        self.backend = FakeBackend({'/foo': json.dumps({'foo': 1})})
+
+    def test_set_none(self):
+        instrumentation.set_instrumentation(None)
+
+        self.assertIs(type(instrumentation.get_instrumentation()), Instrumentation)
+
+    def test_backend_get(self):
+        self.backend.get('/foo')
+
+        timings = self.instrumentation.timings()
+        self.assertEqual(timings['get_raw']['count'], 1)
+        self.assertEqual(timings['parse']['count'], 1)
+
+    def test_backend_get_many(self):
+        self.backend.get_many(['/foo', '/bar'])
+
+        timings = self.instrumentation.timings()
+        self.assertEqual(timings['get_raw_many']['count'], 1)
+        self.assertEqual(timings['parse']['count'], 1)
+
+    def test_backend_lazy_parse(self):
+        backend = FakeBackend({'/foo': json.dumps({'foo': 1})}, lazy=True)
+
+        data = backend.get('/foo')
+        self.assertNotIn('parse', self.instrumentation.timings())
+        self.assertEqual(data['foo'], 1)
+
+        self.assertEqual(self.instrumentation.timings()['parse']['count'], 1)
+
+    def test_backend_notify(self):
+        self.backend.add_listener(mock.Mock(), '/foo')
+        self.backend.add_listener(mock.Mock(side_effect=ValueError), '/foo')
+
+        with self.assertRaises(Exception):
+            self.backend._notify_listeners(json.dumps({'foo': 2}), '/foo')
+
+        self.assertEqual(self.instrumentation.timings()['callback']['count'], 2)
+        self.assertEqual(self.instrumentation.timings()['notify']['count'], 1)
+        self.assertEqual(self.instrumentation.counters(), {'notified_listeners': 2, 'callback_errors': 1})
+
+    def test_config_lookup(self):
+        config = Config({'foo': {'bar': 1}})
+
+        config.get('foo/bar')
+        config.get('foo/baz')
+        with self.assertRaises(KeyError):
+            config['baz']
+
+        self.assertEqual(self.instrumentation.counters(), {'lookups': 3, 'lookup_misses': 2})
+
+    def test_watch_error(self):
+        execution_context = mock.Mock()
+        type(execution_context).running = mock.PropertyMock(side_effect=[True, False])
+        client = mock.Mock()
+        client.kv.get.side_effect = ValueError
+        backend = ConsulBackend(client, execution_context=execution_context)
+
+        backend._watch_for_changes('foo')
+
+        self.assertEqual(self.instrumentation.counters(), {'watch_errors': 1})
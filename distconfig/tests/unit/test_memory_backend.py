@@ -0,0 +1,143 @@
+import unittest
+
+import mock
+
+from distconfig.api import Proxy
+from distconfig.backends.memory import MemoryBackend
+from distconfig.config import Config
+from distconfig.tests.unit.utils import SyncExecutionContext
+
+
+class MemoryBackendTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = MemoryBackend({'/foo': '{"foo": 1}'}, execution_context=SyncExecutionContext())
+        self.listener = mock.Mock()
+        self.backend.add_listener(self.listener, '/foo')
+
+    def test_get(self):
+        self.assertEqual(self.backend.get('/foo'), {'foo': 1})
+        self.assertEqual(self.backend.get('/bar'), {})
+
+    def test_get_many(self):
+        self.assertEqual(self.backend.get_many(['/foo', '/bar']), {'/foo': {'foo': 1}, '/bar': {}})
+
+    def test_set(self):
+        version = self.backend.set('/foo', '{"foo": 2}')
+
+        self.assertEqual(version, 2)
+        self.assertEqual(self.backend.version('/foo'), 2)
+        self.assertEqual(self.backend.get('/foo'), {'foo': 2})
+        self.listener.assert_called_once_with({'foo': 2})
+
+    def test_set_same_value(self):
+        self.backend.set('/foo', '{"foo": 2}')
+        self.listener.reset_mock()
+
+        self.backend.set('/foo', '{"foo": 2}')
+
+        self.assertFalse(self.listener.called)
+
+    def test_set_value_read_before_listener(self):
+        backend = MemoryBackend({'/foo': '{"foo": 1}'}, execution_context=SyncExecutionContext())
+        backend.get('/foo')
+        backend.add_listener(self.listener, '/foo')
+
+        backend.set('/foo', '{"foo": 1}')
+
+        self.assertFalse(self.listener.called)
+
+    def test_update(self):
+        bar_listener = mock.Mock()
+        self.backend.add_listener(bar_listener, '/bar')
+
+        version = self.backend.update({'/foo': '{"foo": 2}', '/bar': '{"bar": 1}'})
+
+        self.assertEqual(self.backend.version('/foo'), version)
+        self.assertEqual(self.backend.version('/bar'), version)
+        self.listener.assert_called_once_with({'foo': 2})
+        bar_listener.assert_called_once_with({'bar': 1})
+
+    def test_delete(self):
+        version = self.backend.delete('/foo')
+
+        self.assertEqual(version, self.backend.index)
+        self.assertIsNone(self.backend.version('/foo'))
+        self.listener.assert_called_once_with({})
+
+    def test_delete_missing(self):
+        with self.assertRaises(KeyError):
+            self.backend.delete('/bar')
+
+    def test_notify_current_value(self):
+        backend = MemoryBackend(execution_context=mock.Mock())
+        backend.add_listener(self.listener, '/foo')
+        backend.set('/foo', '{"foo": 1}')
+        backend.set('/foo', '{"foo": 2}')
+        notifications = backend._execution_context.run.call_args_list
+
+        # Deliver notifications out of order.
+        for (func, paths), _ in reversed(notifications):
+            func(paths)
+
+        self.listener.assert_called_once_with({'foo': 2})
+
+    def test_update_notify_once(self):
+        backend = MemoryBackend(execution_context=mock.Mock())
+        backend.add_listener(self.listener, '/foo')
+        backend.add_listener(self.listener, '/bar')
+
+        backend.update({'/foo': '{"foo": 1}', '/bar': '{"bar": 1}'})
+
+        self.assertEqual(backend._execution_context.run.call_count, 1)
+        (func, paths), _ = backend._execution_context.run.call_args
+        func(paths)
+        self.assertEqual(self.listener.call_count, 2)
+        self.listener.assert_any_call({'foo': 1})
+        self.listener.assert_any_call({'bar': 1})
+
+    def test_update_listener_error(self):
+        backend = MemoryBackend(execution_context=SyncExecutionContext())
+        backend.add_listener(mock.Mock(side_effect=ValueError('boom')), '/foo')
+        backend.add_listener(self.listener, '/bar')
+
+        backend.update({'/foo': '{"foo": 1}', '/bar': '{"bar": 1}'})
+
+        self.listener.assert_called_once_with({'bar': 1})
+
+    @mock.patch('distconfig.backends.memory.time.sleep')
+    def test_latency(self, sleep):
+        backend = MemoryBackend(latency=0.01, jitter=0.01, seed=42, execution_context=SyncExecutionContext())
+
+        backend.get_many(['/foo', '/bar'])
+        backend.set('/foo', '{}')
+
+        self.assertEqual(sleep.call_count, 2)
+        for (delay,), _ in sleep.call_args_list:
+            self.assertTrue(0.01 <= delay <= 0.02)
+
+    def test_proxy_read_before_notification(self):
+        class Other(Config):
+            pass
+
+        backend = MemoryBackend({'/foo': '{"foo": 1}'}, execution_context=mock.Mock())
+        proxy = Proxy(backend)
+        config = proxy.get_config('/foo')
+
+        backend.set('/foo', '{"foo": 2}')
+        other = proxy.get_config('/foo', config_cls=Other)
+        for (func, paths), _ in backend._execution_context.run.call_args_list:
+            func(paths)
+
+        self.assertEqual(config['foo'], 2)
+        self.assertEqual(other['foo'], 2)
+
+    def test_proxy(self):
+        proxy = Proxy(self.backend)
+        config = proxy.get_config('/foo')
+
+        self.backend.set('/foo', '{"foo": 2}')
+        self.assertEqual(config['foo'], 2)
+
+        self.backend.delete('/foo')
+        self.assertEqual(dict(config), {})
@@ -0,0 +1,95 @@
+import json
+import unittest
+
+import mock
+
+from distconfig import parsers
+from distconfig.parsers import ParserRegistry, default_registry
+from distconfig.tests.unit.test_backend import FakeBackend
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+class ParserRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.default = mock.Mock(return_value={'parser': 'default'})
+        self.registry = ParserRegistry(default=self.default)
+        self.registry.register('foo', mock.Mock(return_value={'parser': 'foo'}), sniff=b'FOO')
+        self.registry.register('bar', mock.Mock(return_value={'parser': 'bar'}))
+
+    def test_default_parser(self):
+        self.assertEqual(self.registry.parse(b'data'), {'parser': 'default'})
+
+    def test_sniff_parser(self):
+        self.assertEqual(self.registry.parse(b'FOO data'), {'parser': 'foo'})
+
+    def test_sniff_callable(self):
+        self.registry.register('bar', self.registry.get('bar'), sniff=lambda data: data.endswith(b'BAR'))
+
+        self.assertEqual(self.registry.parse(b'data BAR'), {'parser': 'bar'})
+
+    def test_path_parser(self):
+        self.registry.register_path('/bar/*', 'bar')
+
+        self.assertEqual(self.registry.parse(b'FOO data', '/bar/config'), {'parser': 'bar'})
+        self.assertEqual(self.registry.parse(b'FOO data', '/other/config'), {'parser': 'foo'})
+
+    def test_path_unknown_parser(self):
+        with self.assertRaises(KeyError):
+            self.registry.register_path('/baz/*', 'baz')
+
+    def test_registry_as_callable(self):
+        self.assertEqual(self.registry(b'FOO data'), {'parser': 'foo'})
+
+    def test_backend_parse_by_path(self):
+        self.registry.register_path('/bar/*', 'bar')
+        backend = FakeBackend({'/bar/config': b'data', '/other/config': b'data'}, parser=self.registry)
+
+        self.assertEqual(backend.get('/bar/config'), {'parser': 'bar'})
+        self.assertEqual(backend.get('/other/config'), {'parser': 'default'})
+
+    def test_lazy_backend_parse_by_path(self):
+        self.registry.register_path('/bar/*', 'bar')
+        backend = FakeBackend({'/bar/config': b'data'}, parser=self.registry, lazy=True)
+
+        self.assertEqual(backend.get('/bar/config')['parser'], 'bar')
+
+
+class DefaultRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = default_registry()
+        self.value = {'foo': ['bar', 1, 1.5, True, None]}
+
+    def test_parse_json(self):
+        self.assertEqual(self.registry.parse(json.dumps(self.value)), self.value)
+        self.assertEqual(self.registry.parse(json.dumps(self.value).encode('utf8')), self.value)
+
+    @unittest.skipUnless(msgpack, 'msgpack is not installed')
+    def test_parse_msgpack(self):
+        self.assertEqual(self.registry.parse(msgpack.packb(self.value, use_bin_type=True)), self.value)
+
+    @unittest.skipUnless(cbor2, 'cbor2 is not installed')
+    def test_parse_cbor(self):
+        self.assertEqual(self.registry.parse(cbor2.dumps(self.value)), self.value)
+
+    def test_sniffers_disjoint(self):
+        payloads = [b'{"a": 1}', b'\x81\xa1a\x01', b'\xa1aa\x01', b'\xd9\xd9\xf7\xa0']
+        matches = [[sniff(payload) for sniff in (parsers.is_json, parsers.is_msgpack, parsers.is_cbor)]
+                   for payload in payloads]
+
+        self.assertEqual(matches, [
+            [True, False, False],
+            [False, True, False],
+            [False, False, True],
+            [False, False, True],
+        ])
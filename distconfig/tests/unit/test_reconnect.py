@@ -0,0 +1,77 @@
+import unittest
+
+import mock
+
+from distconfig.backends.consul import ConsulBackend
+from distconfig.backends.reconnect import ReconnectPolicy
+
+
+class StopWatching(BaseException):
+    pass
+
+
+class ReconnectPolicyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = ReconnectPolicy(initial_delay=1, max_delay=5, jitter=0, failure_threshold=3)
+
+    def test_exponential_backoff(self):
+        delays = [self.policy.failure('/foo') for _ in range(5)]
+
+        self.assertEqual(delays, [1, 2, 4, 5, 5])
+
+    def test_backoff_by_path(self):
+        self.policy.failure('/foo')
+        self.policy.failure('/foo')
+
+        self.assertEqual(self.policy.failure('/bar'), 1)
+
+    def test_reset_on_success(self):
+        self.policy.failure('/foo')
+        self.policy.failure('/foo')
+
+        self.policy.success('/foo')
+
+        self.assertEqual(self.policy.failure('/foo'), 1)
+
+    def test_jitter(self):
+        policy = ReconnectPolicy(initial_delay=1, jitter=0.5, seed=42)
+
+        delays = [policy.failure('/foo') for _ in range(3)]
+
+        for delay, base in zip(delays, [1, 2, 4]):
+            self.assertTrue(base / 2.0 <= delay <= base, (delay, base))
+
+    def test_circuit_breaker(self):
+        self.assertEqual(self.policy.state, ReconnectPolicy.CLOSED)
+
+        self.policy.failure('/foo')
+        self.policy.failure('/bar')
+        self.assertFalse(self.policy.is_open)
+        self.policy.failure('/baz')
+
+        self.assertEqual(self.policy.state, ReconnectPolicy.OPEN)
+        self.assertIsNotNone(self.policy.opened_at)
+        self.assertEqual(self.policy.failures, 3)
+
+        self.policy.success('/bar')
+
+        self.assertEqual(self.policy.state, ReconnectPolicy.CLOSED)
+        self.assertIsNone(self.policy.opened_at)
+        self.assertEqual(self.policy.failures, 0)
+
+
+class WatcherReconnectTestCase(unittest.TestCase):
+
+    def test_backoff_until_success(self):
+        client = mock.Mock()
+        client.kv.get.side_effect = [Exception('down'), Exception('down'), (1, None), StopWatching()]
+        policy = ReconnectPolicy(initial_delay=1, jitter=0)
+        backend = ConsulBackend(client, execution_context=mock.Mock(), reconnect_policy=policy)
+
+        with self.assertRaises(StopWatching):
+            backend._watch_for_changes('foo')
+
+        self.assertEqual(backend._execution_context.sleep.call_args_list, [mock.call(1), mock.call(2)])
+        self.assertIs(backend.reconnect_policy, policy)
+        self.assertEqual(policy.failures, 0)
@@ -0,0 +1,99 @@
+import unittest
+
+from distconfig.config import Config
+from distconfig.settings import Field, Settings
+
+
+class HttpSettings(Settings):
+    timeout = Field('http/timeout', float, default=1.0)
+    retries = Field('http/retries', int)
+    hosts = Field('http/hosts')
+
+
+class ExtendedSettings(HttpSettings):
+    debug = Field('debug', bool, default=False)
+
+
+class SettingsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Config({'http': {'retries': 3, 'hosts': ['a', 'b']}, 'debug': True})
+
+    def test_from_config(self):
+        settings = HttpSettings.from_config(self.config)
+
+        self.assertEqual(settings.timeout, 1.0)
+        self.assertEqual(settings.retries, 3)
+        self.assertEqual(settings.hosts, ['a', 'b'])
+
+    def test_slots(self):
+        settings = HttpSettings.from_config(self.config)
+
+        self.assertFalse(hasattr(settings, '__dict__'))
+        self.assertEqual(HttpSettings.__slots__, ('timeout', 'retries', 'hosts'))
+
+    def test_immutable(self):
+        settings = HttpSettings.from_config(self.config)
+
+        with self.assertRaises(AttributeError):
+            settings.retries = 5
+
+    def test_inheritance(self):
+        settings = ExtendedSettings.from_config(self.config)
+
+        self.assertEqual(settings.retries, 3)
+        self.assertIs(settings.debug, True)
+        self.assertEqual(ExtendedSettings.__slots__, ('debug',))
+
+    def test_missing_path(self):
+        with self.assertRaises(KeyError):
+            HttpSettings.from_config(Config({}))
+
+    def test_wrong_type(self):
+        with self.assertRaises(TypeError):
+            HttpSettings.from_config(Config({'http': {'retries': '3', 'hosts': []}}))
+
+    def test_equality(self):
+        self.assertEqual(HttpSettings.from_config(self.config), HttpSettings.from_config(self.config))
+        self.assertNotEqual(HttpSettings.from_config(self.config), ExtendedSettings.from_config(self.config))
+
+    def test_repr(self):
+        self.assertEqual(repr(HttpSettings.from_config(self.config)),
+                         "HttpSettings(timeout=1.0, retries=3, hosts=['a', 'b'])")
+
+
+class BoundSettingsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Config({'http': {'retries': 3, 'hosts': []}})
+        self.settings = HttpSettings.bind(self.config)
+
+    def test_update_on_change(self):
+        previous = self.settings.current
+
+        self.config._invalidate({'http': {'retries': 5, 'hosts': []}})
+
+        self.assertEqual(self.settings.current.retries, 5)
+        self.assertEqual(previous.retries, 3)
+
+    def test_keep_unchanged(self):
+        previous = self.settings.current
+
+        self.config._invalidate({'http': {'retries': 3, 'hosts': []}, 'other': 1})
+
+        self.assertIs(self.settings.current, previous)
+
+    def test_keep_previous_on_error(self):
+        previous = self.settings.current
+
+        with self.assertRaises(TypeError):
+            self.config._invalidate({'http': {'retries': 'five', 'hosts': []}})
+
+        self.assertIs(self.settings.current, previous)
+
+    def test_unbind(self):
+        self.settings.unbind()
+
+        self.config._invalidate({'http': {'retries': 5, 'hosts': []}})
+
+        self.assertEqual(self.settings.current.retries, 3)
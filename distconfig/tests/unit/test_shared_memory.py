@@ -0,0 +1,139 @@
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from distconfig.api import Proxy
+from distconfig.backends.execution_context import ThreadingExecutionContext
+from distconfig.backends.memory import MemoryBackend
+from distconfig.backends.shared_memory import SharedMemoryBackend, SharedSnapshotStore
+from distconfig.tests.unit.utils import SyncExecutionContext, wait_for
+
+
+class SharedSnapshotStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = SharedSnapshotStore(self.directory)
+
+    def test_save_load(self):
+        self.store.save('/foo', b'{"foo": 1}', version=3)
+        self.store.save('/bar', u'{"bar": 1}')
+
+        self.assertEqual(self.store.load('/foo'), (b'{"foo": 1}', 3))
+        self.assertEqual(self.store.load('/bar'), (u'{"bar": 1}', None))
+
+    def test_save_many(self):
+        self.store.save_many({'/foo': b'{"foo": 1}', '/bar': None}, {'/foo': 3})
+
+        self.assertEqual(self.store.load('/foo'), (b'{"foo": 1}', 3))
+        self.assertEqual(self.store.load('/bar'), (None, None))
+        self.assertEqual(self.store._generation, 1)
+
+    def test_save_many_unchanged(self):
+        self.store.save_many({'/foo': b'{"foo": 1}', '/bar': None}, {'/foo': 3})
+
+        self.store.save_many({'/foo': b'{"foo": 1}', '/bar': None}, {'/foo': 3})
+
+        self.assertEqual(self.store._generation, 1)
+
+    def test_save_unchanged(self):
+        self.store.save('/foo', b'{"foo": 1}', version=3)
+
+        self.store.save('/foo', b'{"foo": 1}', version=3)
+
+        self.assertEqual(self.store._generation, 1)
+
+    def test_backend_get_many_publish_once(self):
+        backend = MemoryBackend(dict(('/%d' % i, '{}') for i in range(10)),
+                                execution_context=SyncExecutionContext(), snapshot=self.store)
+
+        backend.get_many(['/%d' % i for i in range(10)])
+
+        self.assertEqual(self.store._generation, 1)
+        self.assertEqual(self.store.load('/9'), ('{}', None))
+
+    def test_load_missing(self):
+        with self.assertRaises(KeyError):
+            self.store.load('/foo')
+
+    def test_delete(self):
+        self.store.save('/foo', b'{}')
+
+        self.store.delete('/foo')
+
+        with self.assertRaises(KeyError):
+            self.store.load('/foo')
+
+    def test_restart(self):
+        self.store.save('/foo', b'{"foo": 1}', version=3)
+        self.store.save('/bar', None)
+
+        store = SharedSnapshotStore(self.directory)
+
+        self.assertEqual(store.load('/foo'), (b'{"foo": 1}', 3))
+        self.assertEqual(store.load('/bar'), (None, None))
+        self.assertEqual(store._generation, 2)
+
+
+class SharedMemoryBackendTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = SharedSnapshotStore(self.directory)
+        self.execution_context = ThreadingExecutionContext()
+        self.addCleanup(self.execution_context.shutdown)
+        self.backend = SharedMemoryBackend(self.directory, execution_context=self.execution_context, poll_interval=0.01)
+
+    def test_get_nothing_published(self):
+        backend = SharedMemoryBackend(tempfile.mkdtemp(dir=self.directory), execution_context=self.execution_context)
+
+        self.assertEqual(backend.get('/foo'), {})
+
+    def test_get(self):
+        self.store.save('/foo', b'{"foo": 1}', version=3)
+
+        self.assertEqual(self.backend.get('/foo'), {'foo': 1})
+        self.assertEqual(self.backend.get_many(['/foo', '/bar']), {'/foo': {'foo': 1}, '/bar': {}})
+
+    def test_watch_retried_when_watcher_not_started(self):
+        execution_context = mock.Mock()
+        execution_context.run.side_effect = [RuntimeError('saturated'), None]
+        backend = SharedMemoryBackend(self.directory, execution_context=execution_context)
+
+        with self.assertRaises(RuntimeError):
+            backend.get('/foo')
+        backend.get('/foo')
+
+        self.assertEqual(execution_context.run.call_count, 2)
+
+    def test_get_new_generation(self):
+        self.store.save('/foo', b'{"foo": 1}')
+        self.backend.get('/foo')
+
+        self.store.save('/foo', b'{"foo": 2}')
+
+        self.assertEqual(self.backend.get('/foo'), {'foo': 2})
+
+    def test_watch(self):
+        self.store.save('/foo', b'{"foo": 1}', version=1)
+        self.backend.get('/foo')
+        values = []
+        self.backend.add_listener(values.append, '/foo')
+
+        self.store.save('/bar', b'{"bar": 1}', version=2)
+        self.store.save('/foo', b'{"foo": 2}', version=3)
+
+        self.assertTrue(wait_for(lambda: values == [{'foo': 2}]), values)
+
+    def test_publish_from_backend(self):
+        source = MemoryBackend({'/foo': '{"foo": 1}'}, execution_context=SyncExecutionContext(), snapshot=self.store)
+        Proxy(source).get_config('/foo')
+        config = Proxy(self.backend).get_config('/foo')
+
+        source.set('/foo', '{"foo": 2}')
+
+        self.assertTrue(wait_for(lambda: config.get('foo') == 2), dict(config))
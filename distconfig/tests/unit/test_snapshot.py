@@ -0,0 +1,177 @@
+# -*- encoding: utf8 -*-
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from distconfig.api import Proxy
+from distconfig.backends.snapshot import SnapshotStore
+from distconfig.config import Config
+from distconfig.tests.unit.test_backend import FakeBackend
+from distconfig.tests.unit.utils import SyncExecutionContext
+
+
+class SnapshotStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = SnapshotStore(self.directory)
+
+    def test_save_load_bytes(self):
+        self.store.save('/some/path', b'{"foo": "bar"}', version=42)
+
+        self.assertEqual(self.store.load('/some/path'), (b'{"foo": "bar"}', 42))
+
+    def test_save_load_text(self):
+        self.store.save('/some/path', u'{"foo": "Straße"}')
+
+        self.assertEqual(self.store.load('/some/path'), (u'{"foo": "Straße"}', None))
+
+    def test_save_load_none(self):
+        self.store.save('/some/path', None)
+
+        self.assertEqual(self.store.load('/some/path'), (None, None))
+
+    def test_save_replace(self):
+        self.store.save('/some/path', b'old')
+        self.store.save('/some/path', b'new')
+
+        self.assertEqual(self.store.load('/some/path'), (b'new', None))
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    def test_load_missing(self):
+        with self.assertRaises(KeyError):
+            self.store.load('/some/path')
+
+    def test_load_corrupted(self):
+        self.store.save('/some/path', b'{"foo": "bar"}')
+        filename = os.path.join(self.directory, os.listdir(self.directory)[0])
+        with open(filename, 'r+b') as f:
+            f.truncate(10)
+
+        with self.assertRaises(KeyError):
+            self.store.load('/some/path')
+
+    def test_delete(self):
+        self.store.save('/some/path', b'value')
+
+        self.store.delete('/some/path')
+        self.store.delete('/some/path')
+
+        with self.assertRaises(KeyError):
+            self.store.load('/some/path')
+
+
+class BackendSnapshotTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = SnapshotStore(self.directory)
+        self.value = {'foo': 'bar'}
+        self.raw_value = json.dumps(self.value)
+        self.backend = FakeBackend(
+            {'/some/path': self.raw_value},
+            snapshot=self.store,
+            execution_context=SyncExecutionContext())
+
+    def test_get_save_snapshot(self):
+        self.assertEqual(self.backend.get('/some/path'), self.value)
+
+        self.assertEqual(self.store.load('/some/path'), (self.raw_value, None))
+
+    def test_get_from_snapshot(self):
+        self.store.save('/some/path', self.raw_value)
+        backend = FakeBackend({}, snapshot=self.store, execution_context=mock.Mock())
+
+        self.assertEqual(backend.get('/some/path'), self.value)
+        backend._execution_context.run.assert_called_once_with(
+            backend._reconcile_snapshots, {'/some/path': self.raw_value}, {'/some/path': None})
+
+    def test_get_from_snapshot_reconcile_not_started(self):
+        self.store.save('/some/path', self.raw_value)
+        backend = FakeBackend({}, snapshot=self.store, execution_context=mock.Mock())
+        backend._execution_context.run.side_effect = RuntimeError('saturated')
+
+        self.assertEqual(backend.get('/some/path'), self.value)
+
+    def test_reconcile_notify_changed_value(self):
+        self.store.save('/some/path', json.dumps({'foo': 'old'}))
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.assertEqual(self.backend.get('/some/path'), {'foo': 'old'})
+
+        callback.assert_called_once_with(self.value)
+        self.assertEqual(self.store.load('/some/path'), (self.raw_value, None))
+
+    def test_reconcile_before_proxy_listener(self):
+        self.store.save('/some/path', json.dumps({'foo': 'old'}))
+
+        # The sync execution context reconciles before get returns, i.e. before
+        # the proxy adds the listener of the config.
+        config = Proxy(self.backend).get_config('/some/path')
+
+        self.assertEqual(config, Config(self.value))
+
+    def test_reconcile_older_than_watcher_value(self):
+        self.store.save('/some/path', json.dumps({'foo': 'old'}))
+        backend = FakeBackend({'/some/path': json.dumps({'foo': 'reconciled'})},
+                              snapshot=self.store, execution_context=mock.Mock())
+        config = Proxy(backend).get_config('/some/path')
+        (reconcile, snapshots, receipts), _ = backend._execution_context.run.call_args
+
+        # The watcher started by the reconcile read delivers a newer value first.
+        backend._notify_listeners(json.dumps({'foo': 'newer'}), '/some/path', 2)
+        reconcile(snapshots, receipts)
+
+        self.assertEqual(config['foo'], 'newer')
+
+    def test_reconcile_unchanged_value(self):
+        self.store.save('/some/path', self.raw_value)
+        callback = mock.Mock(return_value=None)
+        self.backend.add_listener(callback, '/some/path')
+
+        self.backend.get('/some/path')
+
+        self.assertEqual(callback.call_count, 0)
+
+    def test_reconcile_retry_on_error(self):
+        self.store.save('/some/path', self.raw_value)
+        policy = self.backend.reconnect_policy
+
+        with mock.patch.object(self.backend, 'get_raw', side_effect=[IOError, self.raw_value]) as get_raw, \
+                mock.patch.object(self.backend._execution_context, 'sleep') as sleep, \
+                mock.patch.object(policy, 'delay', return_value=0.5):
+            self.backend.get('/some/path')
+
+        self.assertEqual(get_raw.call_count, 2)
+        sleep.assert_called_once_with(0.5)
+        self.assertEqual(policy.failures, 0)
+
+    def test_reconcile_stop_on_shutdown(self):
+        self.store.save('/some/path', self.raw_value)
+        self.backend._execution_context.shutdown()
+
+        with mock.patch.object(self.backend, 'get_raw', side_effect=IOError) as get_raw:
+            self.backend.get('/some/path')
+
+        self.assertEqual(get_raw.call_count, 0)
+
+    def test_get_many_from_snapshot(self):
+        self.store.save('/some/path', self.raw_value)
+
+        self.assertEqual(self.backend.get_many(['/some/path', '/no/existing/path']), {
+            '/some/path': self.value,
+            '/no/existing/path': {},
+        })
+        self.assertEqual(self.store.load('/no/existing/path'), (None, None))
+
+    def test_notify_save_snapshot(self):
+        self.backend._notify_listeners(self.raw_value, '/some/path', 5)
+
+        self.assertEqual(self.store.load('/some/path'), (self.raw_value, 5))
@@ -0,0 +1,16 @@
+import time
+
+from distconfig.backends.execution_context import ExecutionContext
+
+
+class SyncExecutionContext(ExecutionContext):
+
+    def run(self, func, *args, **kwargs):
+        func(*args, **kwargs)
+
+
+def wait_for(predicate, timeout=5):
+    start = time.time()
+    while not predicate() and time.time() - start < timeout:
+        time.sleep(0.01)
+    return predicate()
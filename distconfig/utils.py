@@ -1,3 +1,7 @@
+import sys
+import threading
+
+import six
 
 
 def resolve_dotted_name(name):
@@ -27,3 +31,46 @@ def resolve_dotted_name(name):
         except AttributeError:
             found = __import__(current, fromlist=part)
     return found
+
+
+def parallel_map(func, items, max_workers):
+    """Call ``func`` on each item using at most ``max_workers`` threads.
+
+    :param func: Callable that accept one item.
+    :param items: Iterable of items.
+    :param max_workers: Maximum number of concurrent calls.
+    :return: List of results in the same order as ``items``.
+    :raises: First exception raised by ``func``.
+
+    Examples:
+
+        >>> parallel_map(abs, [-1, 2, -3], max_workers=2)
+        [1, 2, 3]
+
+    """
+    items = list(items)
+    results = [None] * len(items)
+    errors = []
+    indexes = iter(range(len(items)))
+    lock = threading.Lock()
+
+    def work():
+        while not errors:
+            with lock:
+                i = next(indexes, None)
+            if i is None:
+                return
+            try:
+                results[i] = func(items[i])
+            except Exception:
+                errors.append(sys.exc_info())
+
+    threads = [threading.Thread(target=work) for _ in range(min(max_workers, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        six.reraise(*errors[0])
+    return results
@@ -26,7 +26,12 @@ setup(
         'zookeeper': ['kazoo>=2.0'],
         'etcd': ['python-etcd>=0.3.3'],
         'consul': ['python-consul>=0.3.15'],
+        'consul-asyncio': ['python-consul>=0.6.0', 'aiohttp'],
+        'etcd-asyncio': ['aio_etcd'],
         'gevent': ['gevent>=1.0.1'],
+        'orjson': ['orjson'],
+        'msgpack': ['msgpack'],
+        'cbor': ['cbor2'],
     },
     license='Apache License, Version 2.0',
     classifiers=[
@@ -38,6 +43,7 @@ setup(
         "Programming Language :: Python :: 3",
         "Programming Language :: Python :: 3.3",
         "Programming Language :: Python :: 3.4",
+        "Programming Language :: Python :: 3.6",
         "Topic :: Internet",
         "Topic :: Software Development :: Libraries :: Python Modules",
         "Intended Audience :: Developers",